@@ -9,17 +9,158 @@ VOICE_MODEL_PATH = os.path.join(MODELS_DIR, "voice_model.h5")
 VOICENET_MODEL_PATH = os.path.join(MODELS_DIR, "voice_model_grid.h5")
 YOLO_MODEL_PATH = "yolo11n.pt"
 
+# Inference Engines
+SIGN_ENGINE = os.environ.get("SIGN_ENGINE", "numpy") # "numpy" (no TensorFlow) or "keras"
+# Modes this node serves ("sign", "voice", "lip"); engines for other modes are never imported
+ENABLED_MODES = [m.strip() for m in os.environ.get("ENABLED_MODES", "sign,voice").split(",") if m.strip()]
+ENGINE_WARMUP = True # Run one dummy inference per engine at load so the first frame skips graph setup
+ENGINE_LOADING_POLL_INTERVAL = 1 # Seconds between "loading" status messages to a stream opened during startup
+
 # Constants
 SEQUENCE_LENGTH = 15
 VOICENET_SEQUENCE_LENGTH = 75
+VOICENET_SEGMENT_MAX_FRAMES = 200 # Recording stops after this many mouth frames (only the last 75 are decoded)
 SIGN_CLASSES = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'SPACE']
 NUMBER_CLASSES = SIGN_CLASSES[:10]
 ALPHABET_CLASSES = SIGN_CLASSES[10:]
 VOICE_CLASSES = ["blue", "green", "red", "white"] # Legacy
 VOICENET_CLASSES = list('abcdefghijklmnopqrstuvwxyz ') # 27 chars
 
+# Phrase vocabulary: the only outputs the voice pipeline emits
+TARGET_PHRASES = [
+    "HELLO", "HI", "GOOD MORNING", "HOW ARE YOU", "WHAT IS YOUR NAME", "MY NAME IS",
+    "THANK YOU", "WELCOME", "YES", "NO", "RAYYAN", "ANGEL",
+    "ARDRA", "NITHYA", "SUJITHRA", "RENJINI"
+]
+# Alternative spellings that map onto a phrase (lip-reading output, compared without spaces)
+PHRASE_VARIANTS = {
+    "HELLO": ["HALLO"],
+    "THANK YOU": ["THANKS"],
+    "YES": ["YEA", "YEP"],
+    "NO": ["NAH"],
+}
+# Speech recognition cues, first match wins: every fragment must appear in the transcript
+PHRASE_CUES = [
+    ("WHAT IS YOUR NAME", ["WHAT IS", "NAME"]),
+    ("MY NAME IS", ["MY NAME"]),
+    ("HOW ARE YOU", ["HOW ARE"]),
+    ("GOOD MORNING", ["GOOD MORNING"]),
+    ("HELLO", ["HELLO"]),
+    ("HELLO", ["HALLO"]),
+]
+PROPER_NOUNS = ["Rayyan", "Angel", "Ardra", "Nithya", "Sujithra", "Renjini"]
+GIBBERISH_CLUSTERS = ["EBEB", "BUEB", "DEDBD", "QVLEB", "BTEN", "BUTEW", "WIAA", "AAAA", "SLA", "SLN", "AIAI", "NANA", "LALA"]
+PHRASE_MAX_RAW_LENGTH = 15 # Longer unmatched lip-reading output is treated as noise
+# Fuzzy edits allowed = floor(len(raw) * ratio), counted on the compacted raw text, not the phrase:
+# raws under 4 chars never fuzzy-match, 4-7 chars allow 1 edit (HELO -> HELLO, YESS -> YES), 8-11 allow 2
+PHRASE_FUZZY_RATIO = 0.25
+CTC_BEAM_WIDTH = 16 # Prefix beam width for VoiceNet decoding
+VOICENET_PHRASE_CONFIDENCE = 0.6 # Vocabulary-constrained decodes at or above this skip smart_correct and the LLM
+
 # Vision Config
 HAND_CONFIDENCE = 0.3
 FACE_CONFIDENCE = 0.5
 MAX_HANDS = 1
 MAX_FACES = 1
+HAND_LANDMARK_COUNT = 21
+# Standard VoiceNet 21 lip indices into the 468-point FaceMesh
+LIP_LANDMARKS = [61, 146, 91, 181, 84, 17, 314, 405, 321, 375, 291, 308, 324, 318, 402, 317, 14, 87, 178, 88, 95]
+
+# Session Config (per-client temporal state)
+SESSION_MAX_COUNT = 32 # Least recently used sessions are evicted past this
+SESSION_IDLE_TIMEOUT = 120 # Seconds without a frame before a session is dropped
+SESSION_MAX_MEMORY_MB = 512 # Budget for all per-session frame/audio buffers
+TRACKER_POOL_SIZE = 4 # Idle MediaPipe graphs kept for reuse
+DEFAULT_SESSION_ID = "default"
+
+# Sign Classifier Batching (across concurrent sessions)
+SIGN_BATCH_MAX_SIZE = 16 # 1 disables batching (direct model call)
+SIGN_BATCH_MAX_WAIT_MS = 4 # Longest a frame waits for others to join its batch
+
+# Inference Dispatch (keeps CV/ML work off the event loop)
+INFERENCE_WORKERS = os.cpu_count() or 4 # Threads running decode/tracking/model calls
+INFERENCE_QUEUE_SIZE = 64 # Frames queued or running before new ones are dropped
+
+# Background Finalization (VoiceNet + LLM / speech recognition per finished utterance)
+FINALIZE_WORKERS = 4 # Threads shared by every session's finalization jobs
+FINALIZE_MAX_IN_FLIGHT = 1 # Jobs running at once per session
+FINALIZE_MAX_QUEUED = 2 # Jobs waiting per session; the oldest waiting job is superseded beyond this
+FINALIZE_JOB_TIMEOUT = 15 # Seconds; results of slower (or longer queued) jobs are discarded
+CORRECTION_QUEUE_SIZE = 8 # Finished results kept per session until the client collects them
+CORRECTION_POLL_INTERVAL = 1 # Seconds between push checks without a wake-up (re-attaches to a re-created session)
+CORRECTION_RETRY_DELAY = 0.2 # Seconds before retrying a push the dispatcher was too busy to run
+
+# Voice Activity Detection (per session, 16 kHz float32 audio)
+VAD_FRAME_MS = 10 # Sub-window the detector decides on
+VAD_START_MS = 30 # Consecutive voiced audio needed to open a segment
+VAD_HANGOVER_MS = 300 # Quiet audio before a segment is closed (endpointing latency)
+VAD_PREROLL_MS = 400 # Audio kept from before the onset so word starts aren't clipped
+VAD_MIN_SPEECH_MS = 120 # Segments with less voiced audio are phantom triggers and dropped
+VAD_START_SNR_DB = 9 # Voiced: this far above the noise floor
+VAD_STOP_SNR_DB = 5 # Still speaking: this far above the noise floor (hysteresis)
+VAD_MIN_ENERGY = 0.005 # RMS that never counts as speech, however quiet the room
+VAD_FLOOR_INIT = 0.002 # Noise floor RMS assumed until the room has been heard
+VAD_FLOOR_RISE_S = 2.0 # Time constant for the floor to rise toward a louder room
+VAD_FLOOR_WINDOW_S = 1.5 # Steady sound with no dip this long is noise, even mid-segment
+
+# Streaming Audio Features (LipInference and AudioInference's keyword spotter, per session)
+AUDIO_FEATURE_RING_S = 10 # Seconds of MFCC + delta frames kept (about 31 frames per second at hop 512)
+
+# Offline Keyword Spotting (AudioInference; MFCC templates matched by DTW)
+AUDIO_RECOGNIZER = os.environ.get("AUDIO_RECOGNIZER", "hybrid") # "hybrid" (local, remote ASR below threshold), "local" or "remote"
+KWS_TEMPLATES_PATH = os.path.join(MODELS_DIR, "kws_templates.npz") # Written by backend/training/enroll_keywords.py
+KWS_CONFIDENCE = 0.3 # Margin between the best and runner-up phrase needed to skip remote ASR
+KWS_MAX_DISTANCE = 4.0 # Mean per-frame DTW distance above which nothing is close enough (tune with enroll_keywords.py)
+KWS_DTW_BAND = 0.25 # Sakoe-Chiba band, as a fraction of the sequence length
+
+# LLM Correction Client (Gemini REST; point LLM_BASE_URL at backend/evaluation/llm_stub_server.py to test offline)
+LLM_BASE_URL = os.environ.get("LLM_BASE_URL", "https://generativelanguage.googleapis.com")
+LLM_MODEL = os.environ.get("LLM_MODEL", "gemini-flash-latest")
+LLM_DEADLINE = 8 # Seconds from submission until a correction is abandoned (kept under FINALIZE_JOB_TIMEOUT)
+LLM_MAX_CONNECTIONS = 8 # Pooled HTTP connections to the API
+LLM_BATCH_MAX = 4 # Pending segments merged into one prompt
+LLM_BATCH_WAIT_MS = 30 # Longest a segment waits for others to join its prompt
+LLM_RATE_PER_MIN = 15 # Token bucket refill (requests per minute, batched prompts count once)
+LLM_RATE_BURST = 5 # Requests allowed back to back before the refill rate applies
+LLM_BREAKER_FAILURES = 3 # Consecutive failures before the LLM is skipped (a 429 trips it at once)
+LLM_BREAKER_COOLDOWN = 30 # Seconds skipped before one probe request is let through
+
+# LLM Correction Cache (same raw text + similar audio -> same answer)
+LLM_CACHE_SIZE = 1024 # Entries kept, least recently used evicted first
+LLM_CACHE_TTL = 6 * 3600 # Seconds a phrase answer stays valid
+LLM_CACHE_NEGATIVE_TTL = 600 # Seconds an empty (rejected) answer stays valid
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH") # SQLite file that survives restarts; unset keeps the cache in memory
+LLM_CACHE_FINGERPRINT_BANDS = 8 # Loudness envelope slices in the audio part of the key
+
+# Live Lip-Reading Partials (VoiceNet over the sliding window while recording)
+VOICENET_PARTIAL_STRIDE = 10 # New frames between partial decodes; 0 disables partials
+VOICENET_PARTIAL_MIN_FRAMES = 15 # Frames recorded before the first partial
+VOICENET_PARTIAL_REUSE_FRAMES = 3 # Non-silent frames a final may add past the latest partial and still reuse its decode
+
+# Worker Processes (0 = run trackers/models in this process)
+TRACKER_PROCESSES = int(os.environ.get("TRACKER_PROCESSES", "0"))
+FRAME_RING_SLOTS = 4 # Frames in flight per worker
+FRAME_SLOT_BYTES = 1920 * 1080 * 3 # Largest decoded BGR frame passed through shared memory
+WORKER_CALL_TIMEOUT = 10 # Seconds before a worker call is abandoned
+WORKER_POLL_INTERVAL = 1 # Seconds between liveness checks of an idle worker
+
+# Sign Frame Path
+SIGN_DECODE_MAX_DIM = 640 # Frames at least 2x larger are decoded at reduced scale
+# Track inside a crop around the previous hand. Off by default: crops run palm detection on every
+# frame (static graph), which the full-frame video graph skips while it follows a hand; compare
+# replay_benchmark.py sign --roi on/off on a recording before enabling
+SIGN_ROI_ENABLED = os.environ.get("SIGN_ROI_ENABLED", "0") == "1"
+SIGN_ROI_MARGIN = 0.6 # Crop margin on each side, as a fraction of the hand box size
+SIGN_ROI_MIN_SIZE = 0.25 # Smallest crop side, as a fraction of the shorter frame side
+
+# Adaptive Capture (hints returned to the client with every result)
+CAPTURE_MAX_FPS = 25
+CAPTURE_MIN_FPS = 4
+CAPTURE_IDLE_AFTER = 10 # Consecutive idle results before stepping down
+CAPTURE_PROFILES = {
+    # MediaPipe's palm detector runs at 192px and the landmark model at 224px,
+    # so nothing beyond ~640px on the long side reaches the models.
+    "sign": {"active": {"fps": 25, "max_dim": 640, "quality": 0.8}, "idle": {"fps": 8, "max_dim": 320, "quality": 0.6}},
+    # Mouth crops are resized to 100x50; keep enough pixels around the lips while speaking
+    "voice": {"active": {"fps": 25, "max_dim": 640, "quality": 0.8}, "idle": {"fps": 10, "max_dim": 480, "quality": 0.6}},
+}
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+import numpy as np
+from tensorflow.keras.models import load_model
+
+# Ensure backend path is in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from backend.config import SIGN_MODEL_PATH
+from backend.inference.numpy_mlp import NumpyMLP
+
+TOLERANCE = 1e-5
+
+def main():
+    print("=" * 60)
+    print("Sign Model Parity Check (Keras vs NumPy engine)")
+    print("=" * 60)
+
+    if not os.path.exists(SIGN_MODEL_PATH):
+        print(f"Error: Model not found at {SIGN_MODEL_PATH}")
+        return 1
+
+    keras_model = load_model(SIGN_MODEL_PATH)
+    numpy_model = NumpyMLP.from_h5(SIGN_MODEL_PATH)
+
+    # Normalized landmarks live in [-1, 1] (see extract_hand_landmarks)
+    rng = np.random.default_rng(0)
+    X = rng.uniform(-1.0, 1.0, size=(512, numpy_model.input_dim)).astype(np.float32)
+
+    expected = keras_model.predict(X, verbose=0)
+    actual = numpy_model.predict_on_batch(X)
+
+    max_diff = float(np.max(np.abs(expected - actual)))
+    argmax_agreement = float(np.mean(np.argmax(expected, axis=1) == np.argmax(actual, axis=1)))
+    single_diff = float(np.max(np.abs(keras_model.predict(X[:1], verbose=0) - numpy_model.predict_on_batch(X[:1]))))
+
+    start = time.perf_counter()
+    for row in X[:200]:
+        numpy_model.predict_on_batch(row[None])
+    numpy_ms = (time.perf_counter() - start) / 200 * 1000
+
+    start = time.perf_counter()
+    for row in X[:200]:
+        keras_model.predict_on_batch(row[None])
+    keras_ms = (time.perf_counter() - start) / 200 * 1000
+
+    print(f"Max abs difference (batch):  {max_diff:.2e}")
+    print(f"Max abs difference (single): {single_diff:.2e}")
+    print(f"Argmax agreement:            {argmax_agreement * 100:.2f}%")
+    print(f"Per-frame latency:           NumPy {numpy_ms:.3f} ms | Keras {keras_ms:.3f} ms")
+
+    ok = max(max_diff, single_diff) < TOLERANCE and argmax_agreement == 1.0
+    print("PASS" if ok else "FAIL")
+    print("=" * 60)
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
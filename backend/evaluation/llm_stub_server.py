@@ -0,0 +1,111 @@
+"""
+Local stand-in for the Gemini generateContent endpoint, for exercising the
+correction client (batching, coalescing, deadlines, rate limiting, the circuit
+breaker) without network access or quota.
+
+Answers come from the phrase matcher: a segment whose RAW VOICE DATA matches a
+target phrase gets that phrase, anything else gets "". Batched prompts get a
+JSON array, as the real API does with responseMimeType application/json.
+
+Usage:
+    python backend/evaluation/llm_stub_server.py --port 8765 --latency 0.4 --quota-every 10
+    LLM_BASE_URL=http://127.0.0.1:8765 GEMINI_API_KEY=stub python -m uvicorn backend.main:app
+"""
+
+import os
+import sys
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Ensure backend path is in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from backend.inference.phrase_matcher import phrase_matcher
+
+SEGMENT_RE = re.compile(r'SEGMENT \d+: RAW VOICE DATA: "([^"]*)"')
+RAW_RE = re.compile(r'RAW VOICE DATA: "([^"]*)"')
+
+
+def answer(raw_text):
+    match = phrase_matcher.correct(raw_text)
+    return match if phrase_matcher.is_phrase(match) else ""
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    options = None
+    requests = 0
+    lock = threading.Lock()
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.split("?")[0].endswith(":generateContent"):
+            self._send(404, {"error": {"code": 404, "message": "Not found"}})
+            return
+        with self.lock:
+            StubHandler.requests += 1
+            count = StubHandler.requests
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        if self.options.quota_every and count % self.options.quota_every == 0:
+            self._send(429, {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota)."}},
+                       {"Retry-After": str(self.options.retry_after)})
+            return
+        if random.random() < self.options.fail_rate:
+            self._send(503, {"error": {"code": 503, "message": "The model is overloaded."}})
+            return
+        time.sleep(self.options.latency)
+
+        texts = [p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []) if "text" in p]
+        prompt = "\n".join(texts)
+        segments = SEGMENT_RE.findall(prompt)
+        if body.get("generationConfig", {}).get("responseMimeType") == "application/json":
+            text = json.dumps([answer(raw) for raw in segments])
+        else:
+            raws = RAW_RE.findall(prompt)
+            text = answer(raws[0]) if raws else ""
+        print(f"stub #{count}: {len(segments) or 1} segment(s) -> {text}")
+        self._send(200, {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]})
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(options):
+    StubHandler.options = options
+    server = ThreadingHTTPServer((options.host, options.port), StubHandler)
+    print(f"LLM stub listening on http://{options.host}:{server.server_address[1]}")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini generateContent endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds per answered request")
+    parser.add_argument("--quota-every", type=int, default=0, help="Answer every Nth request with HTTP 429 (0 = never)")
+    parser.add_argument("--retry-after", type=int, default=30, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 503")
+    options = parser.parse_args()
+    server = serve(options)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
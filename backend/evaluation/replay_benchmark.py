@@ -0,0 +1,273 @@
+"""
+Replays a fixed frame / landmark / audio sequence through one inference engine
+and reports throughput, per-frame latency, time-to-stable-gesture (sign) and
+time-to-final-utterance (voice, lip) as JSON.
+
+The engines run on a ManualClock that advances 1/fps per frame, so stabilizer
+cooldowns and finalize throttles behave the same on every run regardless of
+how fast the machine is.
+
+Recorded input is an .npz with any of:
+    landmarks   (N, 21, 3) float32, NaN rows where no hand was tracked (sign)
+    handedness  (N,) uint8, codes as in HANDEDNESS_CODES (sign, with landmarks)
+    frames      (N, H, W, 3) uint8 BGR camera frames
+    audio       (N, samples) float32 PCM @ 16kHz, one chunk per frame (voice, lip)
+    fps         scalar, replay rate (defaults to --fps)
+
+Usage:
+    python backend/evaluation/replay_benchmark.py sign
+    python backend/evaluation/replay_benchmark.py voice --input session.npz --output voice.json
+    python backend/evaluation/replay_benchmark.py sign --input frames.npz --roi on  (vs. --roi off)
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import threading
+import numpy as np
+
+# Ensure backend path is in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from backend.preprocessing.landmark_array import HANDEDNESS_CODES
+from backend.inference.telemetry import STAGE_SECONDS, JOB_SECONDS
+
+AUDIO_RATE = 16000
+
+
+class ManualClock:
+    """Drop-in for time.time() that only moves when told to."""
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+# --- Synthetic inputs ---
+
+FINGER_X = [0.44, 0.48, 0.52, 0.56] # Index, middle, ring, pinky
+EXTENDED_Y = [0.65, 0.55, 0.50, 0.45] # MCP, PIP, DIP, TIP
+FOLDED_Y = [0.65, 0.58, 0.63, 0.66]
+
+def synthetic_hand(extended, thumb_out):
+    """(21, 3) MediaPipe-style hand with the given fingers (index..pinky) extended."""
+    lms = np.zeros((21, 3), dtype=np.float32)
+    lms[0] = (0.5, 0.8, 0.0)
+    thumb_end = 0.36 if thumb_out else 0.47
+    for i, t in enumerate(np.linspace(0.25, 1.0, 4)):
+        lms[1 + i] = (0.46 + (thumb_end - 0.46) * t, 0.76 - 0.12 * t, -0.01 * t)
+    for f, x in enumerate(FINGER_X):
+        ys = EXTENDED_Y if extended[f] else FOLDED_Y
+        for j, y in enumerate(ys):
+            lms[5 + 4 * f + j] = (x, y, -0.02 * j)
+    return lms
+
+SYNTHETIC_POSES = [
+    synthetic_hand([True, True, True, True], thumb_out=True),     # Open palm
+    synthetic_hand([False, False, False, False], thumb_out=False), # Fist
+    synthetic_hand([False, False, False, True], thumb_out=True),   # Pinky + thumb
+]
+
+def synthetic_sign(rng, hold=60, gap=10):
+    """Each pose held for `hold` frames (with tracking jitter), separated by `gap` frames without a hand."""
+    landmarks, handedness = [], []
+    for pose in SYNTHETIC_POSES:
+        landmarks += [np.full((21, 3), np.nan, dtype=np.float32)] * gap
+        landmarks += [pose + rng.normal(0, 0.003, pose.shape).astype(np.float32) for _ in range(hold)]
+        handedness += [0] * (gap + hold) # "Left": physical right hand
+    return {"landmarks": np.stack(landmarks), "handedness": np.array(handedness, dtype=np.uint8)}
+
+def synthetic_voice(rng, fps, utterances=3, speech_s=1.2, silence_s=1.5, size=(480, 640)):
+    """Silence / noise-burst utterances as PCM chunks, alongside plain gray frames."""
+    chunk = AUDIO_RATE // fps
+    audio = []
+    for _ in range(utterances):
+        audio += [rng.normal(0, 0.001, chunk) for _ in range(int(silence_s * fps))]
+        audio += [rng.normal(0, 0.08, chunk) for _ in range(int(speech_s * fps))]
+    audio += [rng.normal(0, 0.001, chunk) for _ in range(int(silence_s * fps))]
+    frames = np.full((1,) + size + (3,), 128, dtype=np.uint8) # A single frame is reused for every step
+    return {"audio": np.stack(audio).astype(np.float32), "frames": frames}
+
+
+# --- Replay ---
+
+def percentile_ms(latencies, q):
+    return float(np.percentile(latencies, q) * 1000.0) if latencies else None
+
+def frame_at(frames, i):
+    return frames[i if len(frames) > 1 else 0]
+
+def replay_sign(engine, data, clock, fps):
+    latencies, time_to_stable = [], []
+    hand_since = None # Replay time the current hand segment started
+    landmarks, frames = data.get("landmarks"), data.get("frames")
+    n = len(landmarks) if landmarks is not None else len(frames)
+
+    for i in range(n):
+        start = time.perf_counter()
+        if landmarks is not None:
+            points = landmarks[i]
+            has_hand = not np.isnan(points).any()
+            hand_label = HANDEDNESS_CODES.get(int(data["handedness"][i])) if "handedness" in data else "Left"
+            text, status, _, _ = engine.predict_landmarks(points if has_hand else None, hand_label)
+        else:
+            text, status, _, _ = engine.predict(frame_at(frames, i))
+            has_hand = status != "NO HAND DETECTED"
+        latencies.append(time.perf_counter() - start)
+
+        if not has_hand:
+            hand_since = None
+        elif hand_since is None:
+            hand_since = clock()
+        if text and hand_since is not None:
+            time_to_stable.append(clock() - hand_since)
+            hand_since = float("inf") # Count the first stable output per segment only
+        clock.advance(1.0 / fps)
+
+    return latencies, {"time_to_stable_s": time_to_stable}
+
+def replay_voice(engine, data, clock, fps, final_timeout):
+    """Shared by AudioInference and LipInference: both segment on is_recording."""
+    latencies, segments, finals = [], [], []
+    lock = threading.Lock()
+    closed_at = [] # Wall time each segment was handed to a background job
+
+    def on_final():
+        with lock:
+            finals.append(time.perf_counter())
+    engine.correction_listener = on_final
+
+    audio, frames = data.get("audio"), data.get("frames")
+    n = len(audio) if audio is not None else len(frames)
+    started = None
+    for i in range(n):
+        frame = frame_at(frames, i) if frames is not None else None
+        chunk = audio[i].astype(np.float32).tobytes() if audio is not None else None
+        was_recording = engine.is_recording
+
+        start = time.perf_counter()
+        engine.predict(frame, chunk)
+        latencies.append(time.perf_counter() - start)
+
+        if engine.is_recording and not was_recording:
+            started = clock()
+        elif was_recording and not engine.is_recording:
+            segments.append(clock() - started if started is not None else None)
+            closed_at.append(time.perf_counter())
+        clock.advance(1.0 / fps)
+
+    # Background jobs finish on their own threads; give them a bounded time to land
+    deadline = time.perf_counter() + final_timeout
+    while time.perf_counter() < deadline:
+        with lock:
+            if len(finals) >= len(closed_at):
+                break
+        time.sleep(0.05)
+    engine.correction_listener = None
+
+    with lock:
+        # Paired in order; a segment whose job produced nothing shows up in finals_missing
+        time_to_final = [f - c for c, f in zip(closed_at, finals)]
+    return latencies, {
+        "segment_s": segments,
+        # Wall time from the engine closing a segment to its final result being queued
+        "time_to_final_s": time_to_final,
+        "finals_missing": len(closed_at) - len(time_to_final),
+    }
+
+
+def build_engine(mode, clock, roi=None):
+    if mode == "sign":
+        from backend.inference.sign_inference import SignInference
+        return SignInference(clock=clock) if roi is None else SignInference(clock=clock, roi=roi)
+    if mode == "voice":
+        from backend.inference.audio_inference import AudioInference
+        return AudioInference(clock=clock)
+    if mode == "lip":
+        from backend.inference.voice_inference import LipInference
+        return LipInference(clock=clock)
+    raise ValueError(f"Unknown mode '{mode}'")
+
+def load_input(mode, path, fps, seed):
+    if path:
+        with np.load(path) as npz:
+            data = {key: npz[key] for key in npz.files}
+        return data, float(data.pop("fps", fps))
+    rng = np.random.default_rng(seed)
+    return (synthetic_sign(rng) if mode == "sign" else synthetic_voice(rng, int(fps))), fps
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+def summarize(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return {"count": 0}
+    return {"count": len(values), "mean": float(np.mean(values)), "p50": float(np.median(values)), "max": float(np.max(values))}
+
+def run(mode, path=None, fps=25.0, seed=0, final_timeout=15.0, roi=None):
+    clock = ManualClock()
+    data, fps = load_input(mode, path, fps, seed)
+    engine = build_engine(mode, clock, roi)
+
+    wall_start = time.perf_counter()
+    if mode == "sign":
+        latencies, extra = replay_sign(engine, data, clock, fps)
+    else:
+        latencies, extra = replay_voice(engine, data, clock, fps, final_timeout)
+    wall = time.perf_counter() - wall_start
+
+    report = {
+        "mode": mode,
+        "input": path or f"synthetic(seed={seed})",
+        "revision": git_revision(),
+        "frames": len(latencies),
+        "replay_fps": fps,
+        "roi": getattr(engine, "roi_enabled", None),
+        "fps": len(latencies) / sum(latencies) if latencies else 0.0,
+        "latency_ms": {
+            "p50": percentile_ms(latencies, 50),
+            "p95": percentile_ms(latencies, 95),
+            "p99": percentile_ms(latencies, 99),
+            "mean": float(np.mean(latencies) * 1000.0) if latencies else None,
+        },
+        "wall_s": wall,
+        "stages_ms": {labels[0]: {"count": count, "mean": mean * 1000.0} for labels, (count, mean) in STAGE_SECONDS.summary().items()},
+        "jobs_ms": {labels[0]: {"count": count, "mean": mean * 1000.0} for labels, (count, mean) in JOB_SECONDS.summary().items()},
+    }
+    for key, values in extra.items():
+        report[key] = summarize(values) if isinstance(values, list) else values
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic replay benchmark for the inference engines.")
+    parser.add_argument("mode", choices=["sign", "voice", "lip"])
+    parser.add_argument("--input", help=".npz recording (synthetic input when omitted)")
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    parser.add_argument("--fps", type=float, default=25.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--final-timeout", type=float, default=15.0, help="Seconds to wait for background finals")
+    parser.add_argument("--roi", choices=["on", "off"], help="Sign ROI tracking (frames input only; default SIGN_ROI_ENABLED)")
+    args = parser.parse_args()
+
+    roi = None if args.roi is None else args.roi == "on"
+    report = run(args.mode, args.input, args.fps, args.seed, args.final_timeout, roi)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,44 @@
 import mediapipe as mp
+import numpy as np
 mp_hands = mp.solutions.hands
-from backend.config import HAND_CONFIDENCE, MAX_HANDS
+from backend.config import HAND_CONFIDENCE, MAX_HANDS, HAND_LANDMARK_COUNT, SIGN_ROI_ENABLED
+from backend.preprocessing.landmark_array import fill_landmarks
 
 class HandTracker:
-    def __init__(self):
+    def __init__(self, crops=SIGN_ROI_ENABLED):
         self.hands = mp_hands.Hands(
             static_image_mode=False, 
             max_num_hands=MAX_HANDS, 
             min_detection_confidence=HAND_CONFIDENCE
         )
+        # ROI crops move and rescale every frame, which would leave the video graph's
+        # tracking state in the wrong coordinates; they go through a stateless graph
+        self.crop_hands = mp_hands.Hands(
+            static_image_mode=True,
+            max_num_hands=MAX_HANDS,
+            min_detection_confidence=HAND_CONFIDENCE
+        ) if crops else None
+        # Reused every frame: callers must copy if they keep points past the next process()
+        self.points = np.zeros((HAND_LANDMARK_COUNT, 3), dtype=np.float32)
 
     def process(self, image_rgb):
+        """Full frames only: the video graph tracks between consecutive calls."""
         return self.hands.process(image_rgb)
+
+    def process_crop(self, image_rgb):
+        """A crop of the frame, detected from scratch."""
+        return self.crop_hands.process(image_rgb)
+
+    def to_array(self, results):
+        """
+        Returns ((21, 3) float32 landmarks, handedness label) for the first hand,
+        or (None, None). Handedness uses MediaPipe's "Left"/"Right" convention.
+        """
+        if not results.multi_hand_landmarks:
+            return None, None
+        fill_landmarks(results.multi_hand_landmarks[0].landmark, self.points)
+        return self.points, results.multi_handedness[0].classification[0].label
+
+    def reset(self):
+        """Drops tracking state so a pooled graph can serve a new session."""
+        self.hands.reset()
@@ -1,17 +1,27 @@
 import speech_recognition as sr
 import threading
 import collections
+import copy
 import time
 import io
 import wave
-import cv2
 import numpy as np
 from backend.inference.nlp_manager import LLMProcessor
-from backend.voice_tracking.mediapipe_face import FaceTracker
+from backend.voice_tracking.face_service import face_service
+from backend.config import CORRECTION_QUEUE_SIZE, FINALIZE_JOB_TIMEOUT, TARGET_PHRASES
+from backend.config import AUDIO_RECOGNIZER, KWS_CONFIDENCE
+from backend.inference.telemetry import timed
+from backend.inference.finalize_pool import finalize_pool
+from backend.inference.phrase_matcher import phrase_matcher
+from backend.inference.keyword_spotter import KeywordSpotter, stream_features, segment_features
+from backend.inference.audio_processor import StreamingMFCC
+from backend.inference.vad import VoiceActivityDetector
 
 class AudioInference:
-    def __init__(self):
+    def __init__(self, clock=time.time):
+        """clock: time source for result timestamps (injectable for replay benchmarks)."""
         print("AudioInference: Initializing...")
+        self.clock = clock
         self.recognizer = sr.Recognizer()
         
         # Adjusting recognizer sensitivity for background noise
@@ -19,36 +29,83 @@ class AudioInference:
         self.recognizer.dynamic_energy_threshold = True
         self.recognizer.dynamic_energy_adjustment_damping = 0.15
         self.recognizer.dynamic_energy_ratio = 1.5
-        
-        self.face_tracker = FaceTracker()
+        self.recognizer.operation_timeout = FINALIZE_JOB_TIMEOUT # Don't let one request hold a finalize worker forever
         
         self.llm_processor = LLMProcessor()
+        
+        self.TARGET_LIST = TARGET_PHRASES
+        self.matcher = phrase_matcher
+
+        # Local keyword spotting first; remote ASR only for low-confidence segments
+        self.recognizer_mode = AUDIO_RECOGNIZER
+        self.spotter = KeywordSpotter.load() if self.recognizer_mode != "remote" else None
+        
+        self._init_state(face_service.acquire())
+
+    def _init_state(self, face):
+        """Per-session recording state, buffers and result queue."""
+        self.face = face # FaceSession, shared with the lip engine for the same session id
         self.is_recording = False
         self.audio_frames = []
-        
-        self.silence_counter = 0
+        self.vad = VoiceActivityDetector() # Endpointing, noise floor and pre-roll for this session
+        self.segment_voiced = 0 # vad.voiced_frames when the current recording began
+        # Keyword spotter features, computed per chunk so a finished segment is only read back
+        self.audio_features = StreamingMFCC(sr=16000) if self.spotter is not None else None
+        self.segment_audio_frame = 0 # audio_features.count at the start of the current recording (pre-roll included)
         self.current_energy = 0
         
         self.last_prediction = ""
         self.last_final_time = 0
         
         # Async LLM handling
-        self.pending_corrections = collections.deque()
+        self.pending_corrections = collections.deque(maxlen=CORRECTION_QUEUE_SIZE) # Oldest dropped if never collected
         self.correction_lock = threading.Lock()
-        
-        self.TARGET_LIST = [
-            "HELLO", "HI", "GOOD MORNING", "HOW ARE YOU", "WHAT IS YOUR NAME", "MY NAME IS", 
-            "THANK YOU", "WELCOME", "YES", "NO", "RAYYAN", "ANGEL", 
-            "ARDRA", "NITHYA", "SUJITHRA", "RENJINI"
-        ]
+        self.correction_listener = None # Called from worker threads when a result is queued
+
+    def new_session(self, face):
+        """Returns an engine sharing this one's recognizer but with its own recording state."""
+        session = copy.copy(self)
+        session._init_state(face)
+        return session
 
-    def _process_audio_chunk(self, audio_data):
+    def release(self):
+        """Detaches and returns the face session so it can go back to the service."""
+        face, self.face = self.face, None
+        return face
+
+    def memory_usage(self):
+        """Approximate bytes held by this session's buffers."""
+        features = self.audio_features.nbytes() if self.audio_features is not None else 0
+        return sum(len(b) for b in self.audio_frames) + sum(f.nbytes for f in self.vad.recent) + features
+
+    def warmup(self):
+        """Builds the FaceMesh graph and runs the keyword spotter once."""
+        if self.face is not None:
+            self.face.warmup(np.zeros((240, 320, 3), dtype=np.uint8))
+        if self.spotter is not None:
+            self.spotter.spot(segment_features(np.random.default_rng(0).normal(0, 0.05, 16000)))
+
+    def _process_audio_chunk(self, audio_data, features=None, levels=None):
+        """
+        Finalization job: returns (raw, polished) for pending_corrections, or None.
+        `features` / `levels` are the segment as read back from audio_features.
+        """
         print(f"DEBUG: Background audio thread started with {len(audio_data)} bytes")
         try:
             # The frontend sends RAW 32-bit float PCM at 16000Hz.
             # We must convert it to 16-bit PCM and wrap it in a proper WAV container
             # so that speech_recognition can use it with AudioFile().
             audio_array = np.frombuffer(audio_data, dtype=np.float32)
+
+            if self.spotter is not None:
+                with timed("keyword_spotting"):
+                    phrase, confidence = self.spotter.spot(stream_features(features, levels))
+                print(f"DEBUG: Keyword spotter: '{phrase}' ({confidence:.2f})")
+                if phrase and confidence >= KWS_CONFIDENCE:
+                    raw_text = phrase.capitalize()
+                    return raw_text, self.matcher.proper_case(raw_text)
+                if self.recognizer_mode == "local":
+                    return None # No remote fallback: an unrecognized segment is dropped
             
             audio_int16 = (audio_array * 32767.0).astype(np.int16)
             
@@ -64,33 +121,20 @@ class AudioInference:
                 audio = self.recognizer.record(source)
                     
             # Use Google Web Speech API (Free, no key required)
-            raw_text = self.recognizer.recognize_google(audio)
+            with timed("asr_request"):
+                raw_text = self.recognizer.recognize_google(audio)
             print(f"DEBUG Audio Raw: '{raw_text}'")
             
             # Correct common Google Speech hallucinations or clipped speech matching
-            text_lower = raw_text.lower()
-            if "what is" in text_lower and "name" in text_lower:
-                raw_text = "What is your name"
-            elif "my name" in text_lower:
-                raw_text = "My name is"
-            elif "how are" in text_lower:
-                raw_text = "How are you"
-            elif "good morning" in text_lower:
-                raw_text = "Good morning"
-            elif "hello" in text_lower or "hallo" in text_lower:
-                raw_text = "Hello"
-
-            # Formats "good morning" into "Good morning" so phrases look natural
-            polished = raw_text.capitalize()
-
-            # Ensure proper nouns are capitalized exactly
-            import re
-            for name in ["Rayyan", "Angel", "Ardra", "Nithya", "Sujithra", "Renjini"]:
-                if name.lower() in polished.lower():
-                    polished = re.sub(f"(?i){name}", name, polished)
-
-            with self.correction_lock:
-                self.pending_corrections.append((time.time(), raw_text, polished))
+            phrase = self.matcher.match_cues(raw_text)
+            if phrase:
+                raw_text = phrase.capitalize()
+
+            # Formats "good morning" into "Good morning" so phrases look natural,
+            # with proper nouns capitalized exactly
+            polished = self.matcher.proper_case(raw_text.capitalize())
+
+            return raw_text, polished
                 
         except sr.UnknownValueError:
             print("DEBUG: Google Speech could not understand audio")
@@ -99,77 +143,99 @@ class AudioInference:
         except Exception as e:
             print(f"DEBUG: Audio parsing error: {e}")
 
-    def predict(self, frame_img, audio_bytes):
+    def _finish_segment(self):
+        """Stops recording and queues the segment for recognition unless it is a phantom trigger."""
+        self.is_recording = False
+        if self.vad.is_phantom(self.segment_voiced):
+            print(f"DEBUG: Dropping segment - Phantom Trigger ({self.vad.voiced_ms(self.segment_voiced)} ms voiced)")
+        else:
+            full_audio = b''.join(self.audio_frames)
+            segment = ()
+            if self.audio_features is not None:
+                since = self.segment_audio_frame
+                segment = (self.audio_features.features(since=since), self.audio_features.levels(since=since))
+            finalize_pool.submit(self, "asr_finalize", self._process_audio_chunk, (full_audio,) + segment, self._push_correction)
+        self.audio_frames = []
+
+    def _push_correction(self, raw_text, polished):
+        with self.correction_lock:
+            self.pending_corrections.append((self.clock(), raw_text, polished))
+        if self.correction_listener:
+            self.correction_listener()
+
+    def pop_correction(self):
+        """Returns the oldest finished background result, or None."""
+        with self.correction_lock:
+            if self.pending_corrections:
+                return self.pending_corrections.popleft()
+        return None
+
+    def format_correction(self, correction, lms_display=None, visual_conf=0):
+        """Builds the predict() style response for a finished background result."""
+        _, orig, polished = correction
+        if polished:
+            self.last_prediction = polished
+            return polished, "Recognized Word", lms_display or [], {"visual_confidence": visual_conf, "audio_confidence": 1.0, "noise_level": 0}, True
+        return "", "Filtered (Noise)", lms_display or [], {"visual_confidence": visual_conf, "audio_confidence": 0.5, "noise_level": 1.0}, True
+
+    def next_correction(self):
+        """pop_correction() + format_correction(), or None when nothing is queued."""
+        correction = self.pop_correction()
+        return self.format_correction(correction) if correction else None
+
+    def predict(self, frame_img, audio_bytes, frame_key=None):
         # Calculate visual landmarks for returning to the frontend (blue UI tracker)
         lms_display = []
         visual_conf = 0
         if frame_img is not None:
-             mp_results = self.face_tracker.process(cv2.cvtColor(frame_img, cv2.COLOR_BGR2RGB))
-             if mp_results.multi_face_landmarks:
-                 # Standard VoiceNet 21 indices
-                 LIPS = [61, 146, 91, 181, 84, 17, 314, 405, 321, 375, 291, 308, 324, 318, 402, 317, 14, 87, 178, 88, 95]
-                 all_lms = mp_results.multi_face_landmarks[0].landmark
-                 lms_raw = [all_lms[i] for i in LIPS]
-                 lms_display = [{'x': lm.x, 'y': lm.y, 'z': lm.z} for lm in lms_raw]
+             face = self.face.track(frame_img, frame_key)
+             if face is not None:
+                 lms_display = face.landmarks
                  visual_conf = 1.0
                  
         # 0. Check for background results to relay to frontend
-        with self.correction_lock:
-            if self.pending_corrections:
-                _, orig, polished = self.pending_corrections.popleft()
-                if polished:
-                    self.last_prediction = polished
-                    return polished, "Recognized Word", lms_display, {"visual_confidence": visual_conf, "audio_confidence": 1.0, "noise_level": 0}, True
-                else: 
-                     return "", "Filtered (Noise)", lms_display, {"visual_confidence": visual_conf, "audio_confidence": 0.5, "noise_level": 1.0}, True
+        correction = self.pop_correction()
+        if correction:
+            return self.format_correction(correction, lms_display, visual_conf)
                      
         if not audio_bytes or len(audio_bytes) == 0:
             return "", "WAITING FOR SPEECH...", lms_display, {"visual_confidence": visual_conf, "audio_confidence": 0, "noise_level": 0}, False
             
-        import numpy as np
         try:
-            # Calculate live energy for UI display
             audio_data = np.frombuffer(audio_bytes, dtype=np.float32)
-            energy = np.sqrt(np.mean(audio_data**2)) if len(audio_data) > 0 else 0
-            
-            if not hasattr(self, 'rolling_buffer'):
-                import collections
-                self.rolling_buffer = collections.deque(maxlen=15)
-            self.rolling_buffer.append(audio_bytes)
-
-            # Use a slightly complex absolute noise gate so quiet rooms don't trigger recording
-            if energy < 0.005:
-                self.silence_counter += 1
-                
-                # Wait 15 frames (~600ms) to ensure words aren't cut off mid-sentence
-                if self.is_recording and self.silence_counter > 15:
-                    # End of speech segment
+            energy = self.vad.process(audio_data) # Chunk RMS, for the UI meters
+            self.current_energy = energy
+            if self.audio_features is not None:
+                with timed("audio_features"):
+                    self.audio_features.push(audio_data)
+
+            if not self.vad.in_speech:
+                if self.is_recording:
+                    # Endpoint: VAD_HANGOVER_MS of quiet after speech
                     print(f"DEBUG: Silence reached, stopping recording. frames={len(self.audio_frames)}")
-                    self.is_recording = False
-                    if len(self.audio_frames) > 5:
-                        # Combine frames and process
-                        full_audio = b''.join(self.audio_frames)
-                        threading.Thread(target=self._process_audio_chunk, args=(full_audio,), daemon=True).start()
-                    self.audio_frames = []
-                
-                status = "WAITING FOR SPEECH..." if not self.is_recording else "Processing..."
+                    self.audio_frames.append(audio_bytes)
+                    self._finish_segment()
+                    status = "Processing..."
+                else:
+                    status = "WAITING FOR SPEECH..."
                 # Return empty string for text here so we don't display `self.last_prediction` as a draft label
                 return "", status, lms_display, {"visual_confidence": visual_conf, "audio_confidence": min(1.0, energy/0.05), "noise_level": min(1.0, energy/0.05)}, False
             else:
-                self.silence_counter = 0
                 if not self.is_recording:
-                     print(f"DEBUG: Speech detected (energy={energy:.4f}), starting recording")
+                     print(f"DEBUG: Speech detected (energy={energy:.4f}, floor={self.vad.noise_floor:.4f}), starting recording")
                      self.is_recording = True
-                     self.audio_frames = list(self.rolling_buffer)
-                self.audio_frames.append(audio_bytes)
+                     self.segment_voiced = self.vad.onset_voiced
+                     self.audio_frames = [self.vad.preroll_audio().tobytes()] # Includes this chunk
+                     if self.audio_features is not None:
+                         preroll = len(self.audio_frames[0]) // 4 # float32 samples
+                         self.segment_audio_frame = max(0, self.audio_features.count - preroll // self.audio_features.hop)
+                else:
+                     self.audio_frames.append(audio_bytes)
                 
                 # Prevent infinitely long recordings (e.g., continuous background music)
                 if len(self.audio_frames) > 150: # roughly 5 seconds of chunks
                      print(f"DEBUG: Max timeout reached, stopping recording. frames={len(self.audio_frames)}")
-                     self.is_recording = False
-                     full_audio = b''.join(self.audio_frames)
-                     threading.Thread(target=self._process_audio_chunk, args=(full_audio,), daemon=True).start()
-                     self.audio_frames = []
+                     self._finish_segment()
                      
                 return "", "LISTENING...", lms_display, {"visual_confidence": visual_conf, "audio_confidence": min(1.0, energy/0.05), "noise_level": 0}, False
         except Exception as e:
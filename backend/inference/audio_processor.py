@@ -1,5 +1,11 @@
+import math
+import functools
 import librosa
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from backend.config import AUDIO_FEATURE_RING_S
+
+DELTA_WIDTH = 9 # librosa.feature.delta default window
 
 class AudioProcessor:
     def __init__(self, samplerate=22050):
@@ -39,3 +45,161 @@ class AudioProcessor:
         # Ensure audio is (Time, Features) and matching length
         # For simplicity, we'll return visual for now until we retrain
         return visual_features
+
+
+# --- STREAMING FEATURES ---
+
+def _hz_to_mel(hz):
+    """Slaney mel scale (librosa's default): linear below 1 kHz, logarithmic above."""
+    hz = np.asarray(hz, dtype=np.float64)
+    mel = hz / (200.0 / 3)
+    log_region = hz >= 1000.0
+    mel = np.where(log_region, 15.0 + np.log(np.maximum(hz, 1e-10) / 1000.0) / (np.log(6.4) / 27.0), mel)
+    return mel
+
+def _mel_to_hz(mel):
+    mel = np.asarray(mel, dtype=np.float64)
+    hz = mel * (200.0 / 3)
+    return np.where(mel >= 15.0, 1000.0 * np.exp((np.log(6.4) / 27.0) * (mel - 15.0)), hz)
+
+def mel_filterbank(sr, n_fft, n_mels=128):
+    """(n_mels, 1 + n_fft // 2) Slaney-normalized triangular filters, as librosa.filters.mel."""
+    fft_freqs = np.linspace(0, sr / 2, 1 + n_fft // 2)
+    mel_freqs = _mel_to_hz(np.linspace(_hz_to_mel(0.0), _hz_to_mel(sr / 2), n_mels + 2))
+    fdiff = np.diff(mel_freqs)
+    ramps = mel_freqs[:, None] - fft_freqs[None, :]
+    lower = -ramps[:-2] / fdiff[:-1, None]
+    upper = ramps[2:] / fdiff[1:, None]
+    weights = np.maximum(0, np.minimum(lower, upper))
+    weights *= (2.0 / (mel_freqs[2:n_mels + 2] - mel_freqs[:n_mels]))[:, None]
+    return weights
+
+def dct_matrix(n_out, n_in):
+    """(n_out, n_in) orthonormal DCT-II, as scipy.fft.dct(norm='ortho')."""
+    k = np.arange(n_out)[:, None]
+    n = np.arange(n_in)[None, :]
+    basis = np.cos(np.pi * k * (2 * n + 1) / (2 * n_in)) * np.sqrt(2.0 / n_in)
+    basis[0] /= np.sqrt(2.0)
+    return basis
+
+def savgol_weights(width, polyorder, deriv):
+    """
+    (width, width) Savitzky-Golay weights: row p evaluates the `deriv`-th derivative
+    of the polynomial fitted to a window at position p. The middle row is the
+    centered filter; the others reproduce scipy's mode='interp' at the edges.
+    """
+    x = np.arange(width) - width // 2
+    fit = np.linalg.pinv(np.vander(x, polyorder + 1, increasing=True)) # (polyorder + 1, width)
+    weights = np.zeros((width, width))
+    for p, x0 in enumerate(x):
+        for i in range(deriv, polyorder + 1):
+            weights[p] += fit[i] * math.factorial(i) / math.factorial(i - deriv) * x0 ** (i - deriv)
+    return weights
+
+@functools.lru_cache(maxsize=None)
+def streaming_bases(sr, n_fft, n_mels, n_mfcc):
+    """float32 (window, mel basis, DCT, delta weights, delta-delta weights), built once per configuration."""
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft) # Periodic Hann
+    bases = (window, mel_filterbank(sr, n_fft, n_mels), dct_matrix(n_mfcc, n_mels),
+             savgol_weights(DELTA_WIDTH, 1, 1), savgol_weights(DELTA_WIDTH, 2, 2))
+    return tuple(b.astype(np.float32) for b in bases)
+
+
+class StreamingMFCC:
+    """
+    Per-session MFCC + delta + delta-delta features over a live audio stream,
+    matching AudioProcessor.extract_features (librosa defaults: 2048-point
+    centered STFT, hop 512, 128 Slaney mels, orthonormal DCT, 9-frame deltas),
+    except that the log-mel floor is absolute (no top_db clip against the
+    utterance maximum, which a stream doesn't know yet).
+
+    push() only transforms the frames completed by the new samples: the STFT
+    overlap tail is carried between chunks, the mel and DCT matrices are built
+    once, and centered deltas are written as soon as a frame has 4 frames of
+    context on each side. Frames live in a ring of AUDIO_FEATURE_RING_S seconds;
+    features(since=...) reads a segment back without touching its audio again.
+    """
+    def __init__(self, sr=16000, n_mfcc=13, n_fft=2048, hop_length=512, n_mels=128, ring_s=AUDIO_FEATURE_RING_S):
+        self.sr = sr
+        self.n_mfcc = n_mfcc
+        self.n_fft = n_fft
+        self.hop = hop_length
+        # Shared read-only across sessions
+        self.window, self.mel_basis, self.dct, self.delta_weights, self.delta2_weights = streaming_bases(sr, n_fft, n_mels, n_mfcc)
+        self.size = max(DELTA_WIDTH, int(ring_s * sr / hop_length))
+        self.ring = np.zeros((self.size, 3 * n_mfcc), dtype=np.float32) # MFCC | delta | delta-delta
+        self.level_ring = np.zeros(self.size, dtype=np.float32) # Frame power in dB, see levels()
+        self.reset()
+
+    def reset(self):
+        self.tail = np.zeros(self.n_fft // 2, dtype=np.float32) # Centered STFT: zero padding before the first sample
+        self.count = 0 # Frames produced so far; frame t is centered on sample t * hop
+
+    def nbytes(self):
+        return self.ring.nbytes + self.level_ring.nbytes + self.tail.nbytes
+
+    def push(self, samples):
+        """Adds a chunk of float32 audio; returns the number of new frames."""
+        buffer = np.concatenate([self.tail, np.asarray(samples, dtype=np.float32)])
+        if len(buffer) < self.n_fft:
+            self.tail = buffer
+            return 0
+        frames = sliding_window_view(buffer, self.n_fft)[::self.hop]
+        n_new = len(frames)
+        self.tail = buffer[n_new * self.hop:]
+
+        windowed = frames * self.window
+        power = np.abs(np.fft.rfft(windowed, axis=1)) ** 2
+        log_mel = 10.0 * np.log10(np.maximum(power.astype(np.float32) @ self.mel_basis.T, 1e-10))
+        new_mfcc = log_mel @ self.dct.T
+        new_levels = 10.0 * np.log10(np.maximum(np.mean(windowed ** 2, axis=1), 1e-10))
+        if n_new > self.size:
+            new_mfcc, new_levels = new_mfcc[-self.size:], new_levels[-self.size:]
+            self.count += n_new - self.size
+            n_new = self.size
+        rows = np.arange(self.count, self.count + n_new) % self.size
+        self.ring[rows, :self.n_mfcc] = new_mfcc
+        self.level_ring[rows] = new_levels
+        old_count, self.count = self.count, self.count + n_new
+        self._update_deltas(max(DELTA_WIDTH // 2, old_count - DELTA_WIDTH // 2))
+        return n_new
+
+    def _update_deltas(self, first):
+        """Centered deltas for frames first .. count - 5 (those that just got full context)."""
+        half = DELTA_WIDTH // 2
+        last = self.count - half # Exclusive
+        first = max(first, self.count - self.size + half)
+        if first >= last:
+            return
+        rows = np.arange(first - half, last + half) % self.size
+        windows = sliding_window_view(self.ring[rows, :self.n_mfcc], DELTA_WIDTH, axis=0) # (frames, n_mfcc, width)
+        targets = np.arange(first, last) % self.size
+        self.ring[targets, self.n_mfcc:2 * self.n_mfcc] = windows @ self.delta_weights[half]
+        self.ring[targets, 2 * self.n_mfcc:] = windows @ self.delta2_weights[half]
+
+    def levels(self, since=0):
+        """(Time,) power in dB (windowed mean square) of frames `since` .. now, aligned with features()."""
+        start = max(since, self.count - self.size, 0)
+        return self.level_ring[np.arange(start, self.count) % self.size]
+
+    def features(self, since=0):
+        """
+        (Time, 3 * n_mfcc) features for frames `since` .. now (clamped to the ring),
+        like extract_features over that stretch of audio: its first and last 4
+        frames use edge-fitted deltas, and under 9 frames the deltas are zero.
+        """
+        start = max(since, self.count - self.size, 0)
+        n = self.count - start
+        features = self.ring[np.arange(start, self.count) % self.size].copy()
+        if n < DELTA_WIDTH:
+            features[:, self.n_mfcc:] = 0
+            return features
+        half = DELTA_WIDTH // 2
+        mfcc = features[:, :self.n_mfcc]
+        for edge, positions in ((slice(0, DELTA_WIDTH), range(half)), (slice(n - DELTA_WIDTH, n), range(half + 1, DELTA_WIDTH))):
+            window = mfcc[edge]
+            offset = 0 if edge.start == 0 else n - DELTA_WIDTH
+            for p in positions:
+                features[offset + p, self.n_mfcc:2 * self.n_mfcc] = self.delta_weights[p] @ window
+                features[offset + p, 2 * self.n_mfcc:] = self.delta2_weights[p] @ window
+        return features
@@ -0,0 +1,103 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+from backend.config import SIGN_BATCH_MAX_SIZE, SIGN_BATCH_MAX_WAIT_MS
+from backend.inference.telemetry import STAGE_SECONDS, BATCH_QUEUE
+
+
+class MicroBatcher:
+    """
+    Collects single feature vectors from concurrent callers and runs them through
+    the model as one batch.
+
+    Callers block in `predict` until their row is ready. The worker thread waits
+    at most `max_wait_ms` for more requests, and never waits when every caller
+    currently blocked is already in the batch, so a lone client pays no extra latency.
+    """
+    def __init__(self, predict_batch, max_batch_size=SIGN_BATCH_MAX_SIZE, max_wait_ms=SIGN_BATCH_MAX_WAIT_MS):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = queue.Queue()
+        self.outstanding = 0 # Callers blocked in predict()
+        self.lock = threading.Lock()
+
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.model_time = 0.0
+
+        self.worker = None
+        if self.max_batch_size > 1:
+            self.worker = threading.Thread(target=self._run, daemon=True)
+            self.worker.start()
+
+    def predict(self, vector):
+        """Returns the model output row for a single input vector."""
+        if self.worker is None:
+            return self._run_batch(np.expand_dims(vector, axis=0))[0]
+
+        future = Future()
+        with self.lock:
+            self.outstanding += 1
+        self.queue.put((vector, future))
+        try:
+            return future.result()
+        finally:
+            with self.lock:
+                self.outstanding -= 1
+
+    def _run(self):
+        while True:
+            items = [self.queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(items) < self.max_batch_size:
+                try:
+                    items.append(self.queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    pass
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or len(items) >= self.outstanding:
+                    break
+                try:
+                    items.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            BATCH_QUEUE.set(self.queue.qsize(), mp.current_process().name)
+
+            try:
+                outputs = self._run_batch(np.stack([vector for vector, _ in items]))
+                for (_, future), row in zip(items, outputs):
+                    future.set_result(row)
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+
+    def _run_batch(self, batch):
+        start = time.perf_counter()
+        outputs = self.predict_batch(batch.astype(np.float32, copy=False))
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, "sign_model")
+        with self.lock:
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            self.model_time += elapsed
+        return outputs
+
+    def stats(self):
+        with self.lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "mean_batch_ms": 1000.0 * self.model_time / self.batches if self.batches else 0.0,
+                "queued": self.queue.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+            }
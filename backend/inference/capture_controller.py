@@ -0,0 +1,58 @@
+import collections
+import threading
+from backend.config import CAPTURE_MAX_FPS, CAPTURE_MIN_FPS, CAPTURE_IDLE_AFTER, CAPTURE_PROFILES, SESSION_MAX_COUNT
+
+# Engine statuses meaning there is nothing to recognize in the frame
+IDLE_STATUSES = {"NO HAND DETECTED", "WAITING FOR SPEECH...", "Finding Face...", "Waiting for speech..."}
+
+
+class CaptureController:
+    """
+    Decides how often, how large and at what JPEG quality a client should send
+    frames, from the session's measured processing latency, server load and
+    whether anything is being tracked.
+    """
+    def __init__(self, mode):
+        self.profile = CAPTURE_PROFILES[mode]
+        self.latency = None # EWMA of seconds per frame, queueing included
+        self.idle_frames = 0
+
+    def update(self, latency, load, status, busy=False):
+        """
+        latency: seconds this frame took end to end on the server
+        load: pending inference calls per worker thread (> 1 means frames are queueing)
+        """
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self.idle_frames = self.idle_frames + 1 if status in IDLE_STATUSES else 0
+        # Step up immediately on activity, down only after a run of idle frames
+        hints = dict(self.profile["idle"] if self.idle_frames >= CAPTURE_IDLE_AFTER else self.profile["active"])
+
+        # Never ask for more frames than the pipeline can get through
+        sustainable = 1.0 / self.latency if self.latency > 0 else CAPTURE_MAX_FPS
+        if load > 1:
+            sustainable /= load
+        fps = min(hints["fps"], CAPTURE_MAX_FPS, sustainable)
+        if busy:
+            fps = CAPTURE_MIN_FPS
+        hints["fps"] = round(max(CAPTURE_MIN_FPS, fps), 1)
+        return hints
+
+
+class CaptureControllerTable:
+    """Bounded (mode, session id) -> CaptureController map, oldest dropped first."""
+    def __init__(self, max_entries=2 * SESSION_MAX_COUNT):
+        self.max_entries = max_entries
+        self.controllers = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, mode, session_id):
+        key = (mode, session_id)
+        with self.lock:
+            controller = self.controllers.get(key)
+            if controller is None:
+                controller = self.controllers[key] = CaptureController(mode)
+                while len(self.controllers) > self.max_entries:
+                    self.controllers.popitem(last=False)
+            else:
+                self.controllers.move_to_end(key)
+            return controller
@@ -0,0 +1,181 @@
+import collections
+import numpy as np
+
+NEG_INF = -np.inf
+
+
+def _logaddexp(a, b):
+    if a == NEG_INF:
+        return b
+    if b == NEG_INF:
+        return a
+    return max(a, b) + np.log1p(np.exp(-abs(a - b)))
+
+
+class PhraseTrie:
+    """Character trie over a phrase vocabulary, keyed by label-index prefixes."""
+    def __init__(self, phrases, encode):
+        self.children = collections.defaultdict(set) # prefix -> next labels
+        self.terminals = {} # full prefix -> phrase
+        for phrase in phrases:
+            labels = encode(phrase)
+            if not labels:
+                continue
+            for i in range(len(labels)):
+                self.children[labels[:i]].add(labels[i])
+            self.terminals[labels] = phrase
+
+
+class CTCDecoder:
+    """
+    NumPy CTC decoding for VoiceNet outputs: (T, len(classes) + 1) softmax rows
+    with the blank as the last column, as tf.keras.backend.ctc_decode expects.
+
+    - greedy():      best path, repeats merged, blanks removed (same as Keras greedy)
+    - beam_search(): prefix beam search, optionally restricted to a PhraseTrie
+    - decode_phrase(): best in-vocabulary phrase with a confidence
+
+    With `merge_space` the space class is folded into the blank, so phrases are
+    matched on their letters alone ("GOOD MORNING" == "goodmorning").
+    """
+    def __init__(self, classes, phrases=(), beam_width=16, merge_space=True, prune_log_prob=np.log(1e-3)):
+        self.classes = list(classes)
+        self.blank = len(self.classes)
+        self.space = self.classes.index(" ") if " " in self.classes else None
+        self.merge_space = merge_space and self.space is not None
+        self.beam_width = beam_width
+        self.prune_log_prob = prune_log_prob
+        self.index = {c: i for i, c in enumerate(self.classes)}
+        self.trie = PhraseTrie(phrases, self.encode) if phrases else None
+        self.child_masks = {} # trie prefix -> allowed next labels, see _child_mask
+
+    def encode(self, text):
+        """Phrase -> tuple of label indices (spaces dropped when merged into blank)."""
+        text = text.lower()
+        if self.merge_space:
+            text = text.replace(" ", "")
+        return tuple(self.index[c] for c in text if c in self.index)
+
+    def labels_to_text(self, labels):
+        return "".join(self.classes[i] for i in labels)
+
+    def greedy(self, probs):
+        best = np.argmax(probs, axis=-1)
+        keep = np.ones(len(best), dtype=bool)
+        keep[1:] = best[1:] != best[:-1]
+        return self.labels_to_text(int(i) for i in best[keep] if i != self.blank)
+
+    def _log_probs(self, probs):
+        log_probs = np.log(np.clip(probs, 1e-12, 1.0))
+        if self.merge_space:
+            log_probs = log_probs.copy()
+            log_probs[:, self.blank] = np.logaddexp(log_probs[:, self.blank], log_probs[:, self.space])
+            log_probs[:, self.space] = NEG_INF
+        return log_probs
+
+    def _child_mask(self, prefix):
+        """(blank,) bool: labels the trie allows after `prefix` (cached per prefix)."""
+        mask = self.child_masks.get(prefix)
+        if mask is None:
+            mask = np.zeros(self.blank, dtype=bool)
+            mask[list(self.trie.children.get(prefix, ()))] = True
+            self.child_masks[prefix] = mask
+        return mask
+
+    def beam_search(self, probs, constrained=False):
+        """
+        Prefix beam search. Returns [(text, log score)] best first; when
+        `constrained`, only complete vocabulary phrases are returned.
+
+        Each step scores every (beam, label) extension at once as a
+        (beams, labels) array; only merging extensions into prefixes already
+        in the beam and building the survivors' prefixes is per-beam Python.
+        """
+        log_probs = self._log_probs(probs)
+        trie = self.trie if constrained else None
+        blank = self.blank
+        labels_range = np.arange(blank)
+        prefixes = [()]
+        pb = np.array([0.0]) # log P(prefix, ending in blank)
+        pnb = np.array([NEG_INF]) # log P(prefix, ending in a label)
+
+        for lp in log_probs:
+            label_lp = lp[:blank]
+            total = np.logaddexp(pb, pnb)
+            last = np.array([prefix[-1] if prefix else -1 for prefix in prefixes])
+
+            # Staying on the same prefix: a blank, or a repeated label without a blank
+            stay_b = total + lp[blank]
+            stay_nb = np.where(last >= 0, pnb + label_lp[np.maximum(last, 0)], NEG_INF)
+
+            # Extending by one label; a repeat needs a blank in between
+            extend = np.where(labels_range[None, :] == last[:, None], pb[:, None], total[:, None]) + label_lp[None, :]
+            # Labels too unlikely at this step to start or extend anything
+            allowed = np.broadcast_to(label_lp > self.prune_log_prob, extend.shape)
+            if trie is not None:
+                allowed = allowed & np.array([self._child_mask(prefix) for prefix in prefixes])
+            extend = np.where(allowed, extend, NEG_INF)
+
+            # Extensions that land on a prefix already in the beam merge into its entry
+            position = {prefix: i for i, prefix in enumerate(prefixes)}
+            for i, prefix in enumerate(prefixes):
+                parent = position.get(prefix[:-1]) if prefix else None
+                if parent is not None:
+                    stay_nb[i] = np.logaddexp(stay_nb[i], extend[parent, prefix[-1]])
+                    extend[parent, prefix[-1]] = NEG_INF
+
+            scores = np.concatenate([np.logaddexp(stay_b, stay_nb), extend.ravel()])
+            order = np.argsort(-scores, kind="stable")[:self.beam_width]
+            order = order[np.isfinite(scores[order])]
+            beams = len(prefixes)
+            next_prefixes, next_pb, next_pnb = [], [], []
+            for k in order:
+                if k < beams:
+                    next_prefixes.append(prefixes[k])
+                    next_pb.append(stay_b[k])
+                    next_pnb.append(stay_nb[k])
+                else:
+                    parent, label = divmod(int(k) - beams, blank)
+                    next_prefixes.append(prefixes[parent] + (label,))
+                    next_pb.append(NEG_INF)
+                    next_pnb.append(extend[parent, label])
+            prefixes, pb, pnb = next_prefixes, np.array(next_pb), np.array(next_pnb)
+
+        results = []
+        for prefix, score in zip(prefixes, np.logaddexp(pb, pnb)):
+            if trie is not None and prefix not in trie.terminals:
+                continue
+            text = trie.terminals[prefix] if trie is not None else self.labels_to_text(prefix)
+            results.append((text, float(score)))
+        results.sort(key=lambda r: r[1], reverse=True)
+        return results
+
+    def decode_phrase(self, probs, min_confidence=None):
+        """
+        Returns (phrase, confidence, {phrase: log score}) for the vocabulary phrases
+        that survived the constrained beam. Confidence is the best phrase's share
+        of probability against the other phrases and the best unconstrained
+        decoding when that is out of vocabulary; ("", 0.0, {}) when none survive.
+
+        A competitor can only lower the confidence, so when the phrases alone
+        already leave it under `min_confidence` the unconstrained search is
+        skipped and that (upper bound) confidence is returned.
+        """
+        if self.trie is None:
+            raise ValueError("CTCDecoder was built without a phrase vocabulary")
+        scores = dict(self.beam_search(probs, constrained=True))
+        if not scores:
+            return "", 0.0, {}
+
+        competitors = list(scores.values())
+        phrase = max(scores, key=scores.get)
+        settled = min_confidence is not None and np.exp(scores[phrase] - np.logaddexp.reduce(competitors)) < min_confidence
+        if not settled:
+            free = self.beam_search(probs)
+            if free and self.encode(free[0][0]) not in self.trie.terminals:
+                competitors.append(free[0][1])
+
+        norm = competitors[0]
+        for score in competitors[1:]:
+            norm = _logaddexp(norm, score)
+        return phrase, float(np.exp(scores[phrase] - norm)), scores
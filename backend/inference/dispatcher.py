@@ -0,0 +1,60 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from backend.config import INFERENCE_WORKERS, INFERENCE_QUEUE_SIZE
+
+
+class DispatcherBusy(Exception):
+    """Raised when the inference backlog is full and a frame has to be dropped."""
+
+
+class InferenceDispatcher:
+    """
+    Runs blocking engine calls (decode, MediaPipe, model, feature extraction)
+    on a thread pool so the event loop stays responsive.
+
+    Calls for the same session key run one at a time and in arrival order, so a
+    session's MediaPipe graph and buffers are only ever touched by one thread.
+    Different sessions run in parallel. At most `max_pending` calls may be
+    queued or running; beyond that `run` raises DispatcherBusy.
+    """
+    def __init__(self, max_workers=INFERENCE_WORKERS, max_pending=INFERENCE_QUEUE_SIZE):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        # session key -> [asyncio.Lock, number of calls holding or waiting on it]
+        self.session_locks = {}
+
+    async def run(self, session_key, fn, *args):
+        # Only touched from the event loop thread, so no extra locking needed
+        if self.pending >= self.max_pending:
+            raise DispatcherBusy(f"{self.pending} inference calls already pending")
+
+        self.pending += 1
+        entry = self.session_locks.setdefault(session_key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, functools.partial(fn, *args))
+        finally:
+            self.pending -= 1
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.session_locks[session_key]
+
+    def load(self):
+        """Pending calls per worker thread; above 1 means frames are waiting."""
+        return self.pending / self.max_workers
+
+    def stats(self):
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "workers": self.max_workers,
+            "active_sessions": len(self.session_locks),
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,109 @@
+import threading
+import time
+from backend.config import ENABLED_MODES, TRACKER_PROCESSES
+
+MODES = ("sign", "voice", "lip")
+
+
+class EngineNotReady(Exception):
+    """Raised when a mode's engine is disabled on this node or still loading."""
+
+
+class EngineRegistry:
+    """
+    Loads engines per mode on first use (or when `start()` is called at startup),
+    so a node only imports the stacks for the modes it serves. Each mode moves
+    through pending -> loading -> ready (or failed); disabled modes never load.
+    """
+    def __init__(self, modes=ENABLED_MODES, processes=TRACKER_PROCESSES):
+        self.processes = processes
+        self.lock = threading.Lock()
+        self.entries = {}
+        for mode in MODES:
+            self.entries[mode] = {
+                "state": "pending" if mode in modes else "disabled",
+                "sessions": None,
+                "error": None,
+                "load_seconds": None,
+            }
+
+    def start(self):
+        """Loads every enabled mode in the background; returns immediately."""
+        for mode, entry in self.entries.items():
+            if entry["state"] == "pending":
+                self._start(mode)
+
+    def _start(self, mode):
+        with self.lock:
+            entry = self.entries[mode]
+            if entry["state"] != "pending":
+                return
+            entry["state"] = "loading"
+        threading.Thread(target=self._load, args=(mode,), daemon=True, name=f"load-{mode}").start()
+
+    def _load(self, mode):
+        entry = self.entries[mode]
+        start = time.perf_counter()
+        try:
+            print(f"EngineRegistry: Loading '{mode}' engine...")
+            if self.processes > 0:
+                from backend.inference.process_pool import WorkerProcessPool
+                sessions = WorkerProcessPool(mode, self.processes)
+                try:
+                    sessions.wait_loaded()
+                except Exception:
+                    sessions.close()
+                    raise
+            else:
+                from backend.inference.session_manager import build_session_manager
+                sessions = build_session_manager(mode)
+        except Exception as e:
+            print(f"EngineRegistry: '{mode}' engine failed to load: {e}")
+            with self.lock:
+                entry.update(state="failed", error=repr(e))
+            return
+        with self.lock:
+            entry.update(state="ready", sessions=sessions, load_seconds=time.perf_counter() - start)
+        print(f"EngineRegistry: '{mode}' engine ready in {entry['load_seconds']:.1f}s.")
+
+    def sessions(self, mode):
+        """The SessionManager / WorkerProcessPool for `mode`; kicks off loading on first use."""
+        entry = self.entries.get(mode)
+        if entry is None or entry["state"] == "disabled":
+            raise EngineNotReady(f"Mode '{mode}' is not enabled on this node")
+        if entry["state"] == "pending":
+            self._start(mode)
+        if entry["state"] != "ready":
+            raise EngineNotReady(f"'{mode}' engine is {entry['state']}")
+        return entry["sessions"]
+
+    def loaded(self):
+        """{mode: sessions} for every mode that finished loading."""
+        with self.lock:
+            return {mode: entry["sessions"] for mode, entry in self.entries.items() if entry["state"] == "ready"}
+
+    def enabled(self, mode):
+        entry = self.entries.get(mode)
+        return entry is not None and entry["state"] != "disabled"
+
+    def status(self):
+        with self.lock:
+            return {
+                mode: {key: entry[key] for key in ("state", "error", "load_seconds")}
+                for mode, entry in self.entries.items()
+            }
+
+    def ready(self):
+        """True once every enabled mode has loaded."""
+        with self.lock:
+            return all(entry["state"] in ("ready", "disabled") for entry in self.entries.values())
+
+    def close(self):
+        from backend.inference.process_pool import WorkerProcessPool
+        for sessions in self.loaded().values():
+            if isinstance(sessions, WorkerProcessPool):
+                sessions.close()
+
+
+# One per process, shared by every route so a node never builds the same engine twice
+engines = EngineRegistry()
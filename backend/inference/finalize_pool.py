@@ -0,0 +1,95 @@
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from backend.config import FINALIZE_WORKERS, FINALIZE_MAX_IN_FLIGHT, FINALIZE_MAX_QUEUED, FINALIZE_JOB_TIMEOUT
+from backend.inference.telemetry import REGISTRY, timed_job
+
+FINALIZE_JOBS = REGISTRY.counter("talkify_finalize_jobs_total", "Finalization jobs by outcome.", ("job", "outcome"))
+
+
+class FinalizationPool:
+    """
+    Shared, bounded executor for per-utterance background jobs (VoiceNet + LLM,
+    speech recognition).
+
+    Each session runs at most `max_in_flight` jobs at once and keeps at most
+    `max_queued` waiting; a newer segment supersedes the oldest waiting one.
+    A job's `fn` returns a result tuple (or None), which is handed to its
+    `on_result` callback unless the job took longer than `timeout` seconds from
+    submission; running threads can't be interrupted, so the network calls inside
+    jobs carry their own timeouts and late results are simply discarded.
+    """
+    def __init__(self, max_workers=FINALIZE_WORKERS, max_in_flight=FINALIZE_MAX_IN_FLIGHT,
+                 max_queued=FINALIZE_MAX_QUEUED, timeout=FINALIZE_JOB_TIMEOUT):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="finalize")
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.timeout = timeout
+        # session key -> [jobs running, deque of waiting jobs]
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def submit(self, session_key, job, fn, args=(), on_result=None, if_idle=False):
+        """
+        Queues a job; returns False without queuing when `if_idle` is set and the
+        session already has work running or waiting (used for optional jobs).
+        """
+        with self.lock:
+            if if_idle and session_key in self.sessions:
+                return False
+            state = self.sessions.setdefault(session_key, [0, collections.deque()])
+            waiting = state[1]
+            while len(waiting) >= self.max_queued:
+                stale = waiting.popleft()
+                FINALIZE_JOBS.inc(stale[0], "superseded")
+            waiting.append((job, fn, args, on_result, time.monotonic()))
+            self._start_ready(session_key, state)
+        return True
+
+    def _start_ready(self, session_key, state):
+        """Moves waiting jobs onto the executor while the session has free slots. Caller holds the lock."""
+        while state[0] < self.max_in_flight and state[1]:
+            state[0] += 1
+            self.executor.submit(self._run, session_key, state, state[1].popleft())
+
+    def _run(self, session_key, state, item):
+        job, fn, args, on_result, submitted = item
+        outcome = "completed"
+        try:
+            if time.monotonic() - submitted > self.timeout:
+                outcome = "expired" # Waited out its deadline in the queue
+                return
+            result = timed_job(job, fn)(*args)
+            if time.monotonic() - submitted > self.timeout:
+                outcome = "timed_out"
+            elif result is not None and on_result is not None:
+                on_result(*result)
+        except Exception as e:
+            outcome = "failed"
+            print(f"FinalizationPool: '{job}' job failed: {e}")
+        finally:
+            FINALIZE_JOBS.inc(job, outcome)
+            with self.lock:
+                state[0] -= 1
+                self._start_ready(session_key, state)
+                if state[0] == 0 and not state[1]:
+                    self.sessions.pop(session_key, None)
+
+    def running(self):
+        with self.lock:
+            return sum(state[0] for state in self.sessions.values())
+
+    def queued(self):
+        with self.lock:
+            return sum(len(state[1]) for state in self.sessions.values())
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+# One per process, shared by LipInference and AudioInference
+finalize_pool = FinalizationPool()
+
+REGISTRY.gauge("talkify_finalize_running", "Finalization jobs currently running.", finalize_pool.running)
+REGISTRY.gauge("talkify_finalize_queued", "Finalization jobs waiting for a free slot.", finalize_pool.queued)
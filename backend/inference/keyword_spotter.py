@@ -0,0 +1,135 @@
+import os
+import numpy as np
+from backend.config import KWS_TEMPLATES_PATH, KWS_MAX_DISTANCE, KWS_DTW_BAND
+from backend.inference.audio_processor import StreamingMFCC
+
+AUDIO_RATE = 16000
+TRIM_TOP_DB = 30 # Frames this far below the loudest one count as silence
+MIN_FRAMES = 4 # Fewer frames (hop 512) left after trimming: too short to spot
+
+
+def trim_frames(levels, top_db=TRIM_TOP_DB):
+    """(first, end) of the frames between the first and last within `top_db` of the loudest one."""
+    if len(levels) == 0:
+        return 0, 0
+    loud = np.nonzero(levels > levels.max() - top_db)[0]
+    return int(loud[0]), int(loud[-1]) + 1
+
+
+def normalize_features(features):
+    """Per-utterance mean/variance normalization, so templates survive mic and gain changes."""
+    std = features.std(axis=0)
+    std[std == 0] = 1
+    return ((features - features.mean(axis=0)) / std).astype(np.float32)
+
+
+def stream_features(features, levels):
+    """
+    A segment read back from a StreamingMFCC (features(since), levels(since)) ->
+    normalized (T, 39) features with leading/trailing silence trimmed, or None
+    when too short/silent.
+    """
+    first, end = trim_frames(levels)
+    if end - first < MIN_FRAMES:
+        return None
+    return normalize_features(features[first:end])
+
+
+def segment_features(samples):
+    """
+    float32 16 kHz clip -> stream_features() through the same extractor as a live
+    session, so enrolled templates and spotted segments are computed alike.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    extractor = StreamingMFCC(sr=AUDIO_RATE, ring_s=len(samples) / AUDIO_RATE + 1)
+    extractor.push(samples)
+    extractor.push(np.zeros(extractor.n_fft // 2, dtype=np.float32)) # Centered frames up to the last sample
+    return stream_features(extractor.features(), extractor.levels())
+
+
+def dtw_distances(query, templates, lengths, band=KWS_DTW_BAND):
+    """
+    DTW between one (n, d) query and K templates zero-padded to (K, M, d), all at
+    once: cells on each anti-diagonal depend only on the previous two, so every
+    step updates one diagonal of every template in a single NumPy expression.
+    Returns the (K,) path costs divided by n + length (mean per-step distance);
+    np.inf where the band leaves no path.
+    """
+    n, K, M = len(query), len(templates), templates.shape[1]
+    # Euclidean frame distances, (K, n, M)
+    q2 = (query ** 2).sum(axis=1)[None, :, None]
+    t2 = (templates ** 2).sum(axis=2)[:, None, :]
+    cost = np.sqrt(np.maximum(q2 + t2 - 2 * np.einsum('nd,kmd->knm', query, templates), 0))
+
+    # Outside a template or its Sakoe-Chiba band: unreachable
+    i = np.arange(n)[None, :, None] / max(n - 1, 1)
+    j = np.arange(M)[None, None, :] / np.maximum(lengths - 1, 1)[:, None, None]
+    outside = (np.arange(M)[None, None, :] >= lengths[:, None, None]) | (np.abs(i - j) > band)
+    cost[outside] = np.inf
+
+    D = np.full((K, n + 1, M + 1), np.inf)
+    D[:, 0, 0] = 0
+    for k in range(2, n + M + 1):
+        rows = np.arange(max(1, k - M), min(n, k - 1) + 1)
+        cols = k - rows
+        best = np.minimum(np.minimum(D[:, rows - 1, cols], D[:, rows, cols - 1]), D[:, rows - 1, cols - 1])
+        D[:, rows, cols] = cost[:, rows - 1, cols - 1] + best
+    return D[np.arange(K), n, lengths] / (n + lengths)
+
+
+class KeywordSpotter:
+    """
+    Local recognizer for the fixed phrase vocabulary: MFCC + delta features
+    (StreamingMFCC, see stream_features) matched against enrolled templates by DTW.
+
+    spot() takes normalized segment features (or None) and returns (phrase, confidence). Confidence is the relative margin between
+    the closest phrase and the runner-up, and 0 when even the closest phrase is
+    beyond `max_distance`; callers fall back to remote ASR below their threshold.
+    """
+    def __init__(self, labels, templates, max_distance=KWS_MAX_DISTANCE, band=KWS_DTW_BAND):
+        self.max_distance = max_distance
+        self.band = band
+        self.labels = list(labels)
+        self.phrases = sorted(set(self.labels))
+        self.phrase_index = np.array([self.phrases.index(l) for l in self.labels])
+        self.lengths = np.array([len(t) for t in templates])
+        # Zero-padded (K, M, d) stack; padding is masked out inside dtw_distances
+        self.templates = np.zeros((len(templates), self.lengths.max(), templates[0].shape[1]), dtype=np.float32)
+        for k, template in enumerate(templates):
+            self.templates[k, :len(template)] = template
+
+    @classmethod
+    def load(cls, path=KWS_TEMPLATES_PATH, **kwargs):
+        """Reads the .npz written by enroll_keywords.py; None if nothing is enrolled."""
+        if not os.path.exists(path):
+            print(f"KeywordSpotter: No templates at {path}. Local recognition disabled.")
+            return None
+        data = np.load(path)
+        templates = np.split(data["features"], np.cumsum(data["lengths"])[:-1])
+        spotter = cls([str(l) for l in data["labels"]], templates, **kwargs)
+        print(f"KeywordSpotter: {len(templates)} templates for {len(spotter.phrases)} phrases loaded from {path}")
+        return spotter
+
+    @staticmethod
+    def save(path, labels, templates):
+        np.savez(path, labels=np.array(labels), lengths=np.array([len(t) for t in templates]),
+                 features=np.concatenate(templates).astype(np.float32))
+
+    def phrase_distances(self, features):
+        """(len(phrases),) distance of the closest template of each phrase."""
+        distances = dtw_distances(features, self.templates, self.lengths, self.band)
+        best = np.full(len(self.phrases), np.inf)
+        np.minimum.at(best, self.phrase_index, distances)
+        return best
+
+    def spot(self, features):
+        if features is None:
+            return None, 0.0
+        distances = self.phrase_distances(features)
+        order = np.argsort(distances)
+        best = distances[order[0]]
+        if not np.isfinite(best) or best > self.max_distance:
+            return None, 0.0
+        runner_up = distances[order[1]] if len(order) > 1 else np.inf
+        confidence = 1.0 if not np.isfinite(runner_up) else float((runner_up - best) / runner_up)
+        return self.phrases[order[0]], confidence
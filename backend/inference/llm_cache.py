@@ -0,0 +1,114 @@
+import collections
+import sqlite3
+import threading
+import time
+import numpy as np
+from backend.config import LLM_CACHE_SIZE, LLM_CACHE_TTL, LLM_CACHE_NEGATIVE_TTL, LLM_CACHE_PATH, LLM_CACHE_FINGERPRINT_BANDS
+from backend.inference.telemetry import REGISTRY
+
+LLM_CACHE_LOOKUPS = REGISTRY.counter("talkify_llm_cache_lookups_total", "LLM correction cache lookups by outcome.", ("outcome",))
+
+
+def normalize_text(raw_text):
+    """Uppercase with runs of whitespace collapsed, so trivially different raws share a key."""
+    return " ".join(raw_text.upper().split())
+
+
+def audio_fingerprint(levels, frame_s, bands=LLM_CACHE_FINGERPRINT_BANDS):
+    """
+    Coarse identity for an audio segment from its per-frame levels in dB
+    (StreamingMFCC.levels, `frame_s` apart): duration in 250 ms steps plus the
+    loudness envelope over `bands` equal slices in 6 dB steps. Repeats of the
+    same short utterance land on the same fingerprint; different words rarely do.
+    """
+    if levels is None or len(levels) == 0:
+        return ""
+    duration = int(round(len(levels) * frame_s * 4))
+    envelope = [str(int(round(band.mean() / 6))) if len(band) else "-" for band in np.array_split(levels, bands)]
+    return f"{duration}:" + ",".join(envelope)
+
+
+class ResponseCache:
+    """
+    LRU cache of LLM corrections with per-entry expiry. Empty results (the LLM
+    rejecting a segment as gibberish) are cached too, for `negative_ttl`.
+    With `path`, entries are written through to SQLite and reloaded at startup.
+    """
+    def __init__(self, max_entries=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL, negative_ttl=LLM_CACHE_NEGATIVE_TTL,
+                 path=LLM_CACHE_PATH, clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.entries = collections.OrderedDict() # key -> (value, expires at)
+        self.lock = threading.Lock()
+        self.db = None
+        if path:
+            try:
+                self._open(path)
+            except sqlite3.Error as e:
+                self.db = None
+                print(f"ResponseCache: Persistence disabled ({e}).")
+
+    def _open(self, path):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT, expires REAL)")
+        self.db.execute("DELETE FROM llm_cache WHERE expires <= ?", (self.clock(),))
+        rows = self.db.execute("SELECT key, value, expires FROM llm_cache ORDER BY expires DESC LIMIT ?", (self.max_entries,)).fetchall()
+        self.db.commit()
+        for key, value, expires in reversed(rows): # Oldest first, so the LRU order roughly matches insertion
+            self.entries[key] = (value, expires)
+        print(f"ResponseCache: Loaded {len(rows)} entries from {path}")
+
+    @staticmethod
+    def key(raw_text, fingerprint=""):
+        return f"{normalize_text(raw_text)}|{fingerprint}"
+
+    def get(self, key):
+        """Returns (hit, value); value may be "" for a cached rejection."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                LLM_CACHE_LOOKUPS.inc("miss")
+                return False, None
+            value, expires = entry
+            if expires <= self.clock():
+                del self.entries[key]
+                LLM_CACHE_LOOKUPS.inc("expired")
+                return False, None
+            self.entries.move_to_end(key)
+        LLM_CACHE_LOOKUPS.inc("hit" if value else "negative_hit")
+        return True, value
+
+    def put(self, key, value):
+        expires = self.clock() + (self.ttl if value else self.negative_ttl)
+        with self.lock:
+            self.entries[key] = (value, expires)
+            self.entries.move_to_end(key)
+            evicted = []
+            while len(self.entries) > self.max_entries:
+                evicted.append(self.entries.popitem(last=False)[0])
+            if self.db is not None:
+                try:
+                    self.db.execute("INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?)", (key, value, expires))
+                    self.db.executemany("DELETE FROM llm_cache WHERE key = ?", [(k,) for k in evicted])
+                    self.db.commit()
+                except sqlite3.Error as e:
+                    print(f"ResponseCache: Write failed: {e}")
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            if self.db is not None:
+                self.db.execute("DELETE FROM llm_cache")
+                self.db.commit()
+
+
+# One per process, shared by every LLMProcessor
+llm_cache = ResponseCache()
+
+REGISTRY.gauge("talkify_llm_cache_entries", "Entries held in the LLM correction cache.", llm_cache.__len__)
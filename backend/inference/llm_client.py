@@ -0,0 +1,401 @@
+import asyncio
+import base64
+import io
+import json
+import os
+import threading
+import time
+import wave
+import numpy as np
+import httpx
+from backend.config import TARGET_PHRASES, LLM_BASE_URL, LLM_MODEL, LLM_DEADLINE, LLM_MAX_CONNECTIONS
+from backend.config import LLM_BATCH_MAX, LLM_BATCH_WAIT_MS, LLM_RATE_PER_MIN, LLM_RATE_BURST
+from backend.config import LLM_BREAKER_FAILURES, LLM_BREAKER_COOLDOWN
+from backend.inference.telemetry import REGISTRY
+
+LLM_REQUESTS = REGISTRY.counter("talkify_llm_requests_total", "LLM corrections by outcome.", ("outcome",))
+
+# Segments this small carry no usable speech; the raw text is sent alone
+MIN_AUDIO_BYTES = 1000
+
+
+def wav_bytes(samples, sr=16000):
+    """float32 PCM -> in-memory 16-bit mono WAV (what the API accepts as audio/wav)."""
+    audio_int16 = (np.clip(samples, -1.0, 1.0) * 32767.0).astype(np.int16)
+    wav_io = io.BytesIO()
+    with wave.open(wav_io, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sr)
+        wav_file.writeframes(audio_int16.tobytes())
+    return wav_io.getvalue()
+
+
+def single_prompt(raw_voice_text, has_audio):
+    target_str = ", ".join(TARGET_PHRASES)
+    instructions = f"""
+        You are a Robotic Text Echo Script. You have NO intelligence.
+        The user has spoken, and you have two inputs:
+        1. RAW VOICE DATA: "{raw_voice_text}"
+        2. AUDIO FILE: (Recording of the voice)
+
+        STRICT PROTOCOL:
+        1. TARGET DICTIONARY LIMIT: You may ONLY output a phrase EXACTLY matching one from this list: [{target_str}].
+        2. NO REPLIES: You are a mirror. If the user says "HELLO", you output "HELLO".
+        3. GIBBERISH REJECTION: If the RAW VOICE DATA or AUDIO clearly does NOT match ANY phrase in the TARGET DICTIONARY, you MUST output an EMPTY STRING.
+        4. OUPUT: Return ONLY the exact phrase from the dictionary in UPPERCASE. DO NOT include prefixes. DO NOT be conversational.
+        """
+    return instructions if has_audio else instructions + f"\nRAW VOICE DATA: \"{raw_voice_text}\""
+
+
+def batch_prompt(count):
+    target_str = ", ".join(TARGET_PHRASES)
+    return f"""
+        You are a Robotic Text Echo Script. You have NO intelligence.
+        You receive {count} independent SEGMENTS. Each has RAW VOICE DATA and may have an AUDIO FILE.
+
+        STRICT PROTOCOL (apply to every segment on its own):
+        1. TARGET DICTIONARY LIMIT: You may ONLY output a phrase EXACTLY matching one from this list: [{target_str}].
+        2. NO REPLIES: You are a mirror. If the user says "HELLO", you output "HELLO".
+        3. GIBBERISH REJECTION: If a segment clearly does NOT match ANY phrase in the TARGET DICTIONARY, its output is an EMPTY STRING.
+        4. OUTPUT: A JSON array of exactly {count} UPPERCASE strings, one per segment, in order. Nothing else.
+        """
+
+
+def clean_result(text):
+    """Strips the prefixes the model sometimes adds despite the prompt."""
+    result = text.strip().upper()
+    if result.startswith("I HEARD:") or result.startswith("OUTPUT:"):
+        result = result.split(":", 1)[-1].strip()
+    return result
+
+
+# --- HELPER CLASSES ---
+
+class TokenBucket:
+    """Requests per second with a burst allowance; waiters give up at their deadline."""
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return now
+
+    def try_acquire(self):
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self, deadline):
+        """Waits for a token; returns False if none frees up before `deadline` (clock time)."""
+        while True:
+            now = self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failures` consecutive errors (or at once on a quota error),
+    open -> half_open after the cooldown (or the server's Retry-After), letting one
+    probe through; the probe's outcome closes or re-opens the circuit.
+
+    allow() only checks; begin() is called right before the HTTP request and is
+    what takes the probe, so a request dropped earlier (no token, deadline) never
+    holds it. A probe that ends without an outcome must call abandon().
+    """
+    def __init__(self, failures, cooldown, clock=time.monotonic):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = "closed"
+        self.consecutive = 0
+        self.open_until = 0
+        self.probing = False
+
+    def allow(self):
+        if self.state == "open" and self.clock() >= self.open_until:
+            self.state, self.probing = "half_open", False
+        return self.state == "closed" or (self.state == "half_open" and not self.probing)
+
+    def begin(self):
+        """True if a request may go out now; in half_open the caller becomes the probe."""
+        if not self.allow():
+            return False
+        if self.state == "half_open":
+            self.probing = True
+        return True
+
+    def abandon(self):
+        """The probe was cancelled before an outcome: let the next request probe instead."""
+        if self.state == "half_open":
+            self.probing = False
+
+    def record_success(self):
+        self.state, self.consecutive, self.probing = "closed", 0, False
+
+    def record_failure(self, trip=False, retry_after=None):
+        self.consecutive += 1
+        if trip or self.state == "half_open" or self.consecutive >= self.failures:
+            self.state, self.probing = "open", False
+            self.open_until = self.clock() + max(self.cooldown, retry_after or 0)
+
+
+class _Request:
+    __slots__ = ("raw", "wav", "key", "deadline", "future")
+
+    def __init__(self, raw, wav, key, deadline, future):
+        self.raw = raw
+        self.wav = wav
+        self.key = key
+        self.deadline = deadline
+        self.future = future
+
+
+# --- MAIN CLIENT CLASS ---
+
+class CorrectionClient:
+    """
+    Async Gemini REST client for segment corrections, run on its own event loop
+    thread so finalization workers can call it synchronously.
+
+    - one pooled httpx.AsyncClient; audio goes inline as base64 WAV, never to disk
+    - identical in-flight requests (same cache key) share one call
+    - segments pending together are merged into one prompt (up to LLM_BATCH_MAX)
+    - every request has a hard deadline; the token bucket and circuit breaker
+      skip the call instead of waiting past it or hammering an exhausted quota
+
+    correct() returns the cleaned answer, or None when the LLM was skipped or
+    failed (callers treat None as "no correction" and must not cache it).
+    """
+    def __init__(self, api_key=None, base_url=LLM_BASE_URL, model=LLM_MODEL, deadline=LLM_DEADLINE,
+                 max_connections=LLM_MAX_CONNECTIONS, batch_max=LLM_BATCH_MAX, batch_wait_ms=LLM_BATCH_WAIT_MS,
+                 rate_per_min=LLM_RATE_PER_MIN, burst=LLM_RATE_BURST,
+                 breaker_failures=LLM_BREAKER_FAILURES, breaker_cooldown=LLM_BREAKER_COOLDOWN):
+        self.api_key = api_key
+        self.url = f"{base_url.rstrip('/')}/v1beta/models/{model}:generateContent"
+        self.deadline = deadline
+        self.max_connections = max_connections
+        self.batch_max = batch_max
+        self.batch_wait = batch_wait_ms / 1000.0
+        self.bucket = TokenBucket(rate_per_min / 60.0, burst)
+        self.breaker = CircuitBreaker(breaker_failures, breaker_cooldown)
+        self.loop = None
+        self.http = None
+        self.queue = None
+        self.batch_task = None
+        self.inflight = {} # cache key -> future of the call already running for it
+        self.start_lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.api_key)
+
+    def _ensure_started(self):
+        with self.start_lock:
+            if self.loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True, name="llm-client").start()
+            asyncio.run_coroutine_threadsafe(self._start(), loop).result()
+            self.loop = loop
+
+    async def _start(self):
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        self.http = httpx.AsyncClient(limits=limits, headers={"x-goog-api-key": self.api_key or ""})
+        self.queue = asyncio.Queue()
+        self.batch_task = asyncio.get_running_loop().create_task(self._batch_loop())
+
+    async def _stop(self):
+        self.batch_task.cancel()
+        await self.http.aclose()
+
+    def correct(self, raw_voice_text, audio=None, key=None, deadline=None):
+        """
+        Blocking call from a worker thread. audio: float32 16 kHz samples or None;
+        key: coalescing key (normally the cache key); deadline: seconds (default LLM_DEADLINE).
+        """
+        self._ensure_started()
+        deadline = self.deadline if deadline is None else deadline
+        wav = wav_bytes(audio) if audio is not None and len(audio) else None
+        if wav is not None and len(wav) <= MIN_AUDIO_BYTES:
+            wav = None
+        future = asyncio.run_coroutine_threadsafe(self._correct(raw_voice_text, wav, key, deadline), self.loop)
+        try:
+            return future.result(timeout=deadline + 1)
+        except Exception as e:
+            future.cancel()
+            print(f"CorrectionClient: Request failed: {e!r}")
+            return None
+
+    async def _correct(self, raw, wav, key, deadline):
+        loop = asyncio.get_running_loop()
+        coalesce_key = key or (raw, wav)
+        shared = self.inflight.get(coalesce_key)
+        if shared is None:
+            shared = self.inflight[coalesce_key] = loop.create_future()
+            shared.add_done_callback(lambda _: self.inflight.pop(coalesce_key, None))
+            self.queue.put_nowait(_Request(raw, wav, coalesce_key, loop.time() + deadline, shared))
+        else:
+            LLM_REQUESTS.inc("coalesced")
+        try:
+            return await asyncio.wait_for(asyncio.shield(shared), timeout=deadline)
+        except asyncio.TimeoutError:
+            return None # Counted when the batch loop gives up on the request
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            # Give other segments a moment to join this prompt
+            wait_until = loop.time() + self.batch_wait
+            while len(batch) < self.batch_max:
+                remaining = wait_until - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            live = []
+            for request in batch:
+                if request.deadline <= loop.time():
+                    self._finish(request, None, "deadline")
+                else:
+                    live.append(request)
+            if not live:
+                continue
+            if not self.breaker.allow():
+                for request in live:
+                    self._finish(request, None, "circuit_open")
+                continue
+            if not await self.bucket.acquire(min(r.deadline for r in live)):
+                for request in live:
+                    self._finish(request, None, "rate_limited")
+                continue
+            loop.create_task(self._dispatch(live))
+
+    def _finish(self, request, result, outcome):
+        LLM_REQUESTS.inc(outcome)
+        if not request.future.done():
+            request.future.set_result(result)
+
+    async def _dispatch(self, batch):
+        if len(batch) == 1:
+            request = batch[0]
+            parts = [{"text": single_prompt(request.raw, request.wav is not None)}]
+            if request.wav is not None:
+                parts.append(self._audio_part(request.wav))
+            outcome, text = await self._generate(parts, request.deadline)
+            self._finish(request, clean_result(text) if text is not None else None, outcome)
+            return
+
+        parts = [{"text": batch_prompt(len(batch))}]
+        for i, request in enumerate(batch, 1):
+            parts.append({"text": f"SEGMENT {i}: RAW VOICE DATA: \"{request.raw}\""})
+            if request.wav is not None:
+                parts.append(self._audio_part(request.wav))
+        outcome, text = await self._generate(parts, min(r.deadline for r in batch), json_output=True)
+        answers = None
+        if text is not None:
+            try:
+                answers = json.loads(text)
+            except ValueError:
+                pass
+        if isinstance(answers, list) and len(answers) == len(batch):
+            for request, answer in zip(batch, answers):
+                self._finish(request, clean_result(str(answer)), "batched")
+            return
+        if text is not None:
+            # Unusable batch answer: retry one by one while tokens allow
+            print(f"CorrectionClient: Malformed batch answer {text!r}, retrying singly.")
+            for request in batch:
+                if self.breaker.allow() and self.bucket.try_acquire():
+                    asyncio.get_running_loop().create_task(self._dispatch([request]))
+                else:
+                    self._finish(request, None, "rate_limited")
+            return
+        for request in batch:
+            self._finish(request, None, outcome)
+
+    @staticmethod
+    def _audio_part(wav):
+        return {"inlineData": {"mimeType": "audio/wav", "data": base64.b64encode(wav).decode("ascii")}}
+
+    async def _generate(self, parts, deadline, json_output=False):
+        """One generateContent call; returns (outcome, text or None)."""
+        loop = asyncio.get_running_loop()
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return "deadline", None
+        generation_config = {"temperature": 0.0}
+        if json_output:
+            generation_config["responseMimeType"] = "application/json"
+        body = {"contents": [{"role": "user", "parts": parts}], "generationConfig": generation_config}
+        # Another request took the half-open probe since this one was queued
+        if not self.breaker.begin():
+            return "circuit_open", None
+        probe = self.breaker.state == "half_open"
+        try:
+            return await self._post(body, remaining)
+        finally:
+            if probe:
+                self.breaker.abandon() # No-op once the probe recorded its outcome
+
+    async def _post(self, body, remaining):
+        try:
+            response = await self.http.post(self.url, json=body, timeout=remaining)
+        except httpx.TimeoutException:
+            self.breaker.record_failure()
+            return "deadline", None
+        except httpx.HTTPError as e:
+            self.breaker.record_failure()
+            print(f"CorrectionClient: Transport error: {e!r}")
+            return "error", None
+
+        if response.status_code == 429:
+            retry_after = response.headers.get("retry-after")
+            self.breaker.record_failure(trip=True, retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None)
+            print("CorrectionClient: QUOTA EXCEEDED. Skipping the LLM until the cooldown ends.")
+            return "quota", None
+        if response.status_code >= 400:
+            self.breaker.record_failure()
+            print(f"CorrectionClient: HTTP {response.status_code}: {response.text[:200]}")
+            return "error", None
+
+        self.breaker.record_success()
+        try:
+            candidate = response.json()["candidates"][0]
+            text = "".join(part.get("text", "") for part in candidate.get("content", {}).get("parts", []))
+        except (ValueError, KeyError, IndexError):
+            return "error", None
+        return "ok", text
+
+    def breaker_open(self):
+        return 1 if self.breaker.state == "open" else 0
+
+    def close(self):
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._stop(), self.loop).result(timeout=2)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+# One per process (one connection pool and one quota budget), shared by every LLMProcessor
+llm_client = CorrectionClient(api_key=os.environ.get("GEMINI_API_KEY"))
+
+REGISTRY.gauge("talkify_llm_circuit_open", "1 while the LLM is skipped after quota errors or failures.", llm_client.breaker_open)
@@ -0,0 +1,79 @@
+import json
+import numpy as np
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+def _softmax(x):
+    x -= x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+def _linear(x):
+    return x
+
+ACTIVATIONS = {"relu": _relu, "softmax": _softmax, "linear": _linear}
+# Layers that are no-ops at inference time
+PASSTHROUGH_LAYERS = {"InputLayer", "Dropout"}
+
+
+def _decode(value):
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class NumpyMLP:
+    """
+    Evaluates a Dense-only Keras model (see `create_model` in training/train_sign.py)
+    with NumPy, so the sign engine doesn't need TensorFlow at runtime.
+    """
+    def __init__(self, layers):
+        # [(kernel (in, out), bias (out,), activation)] as contiguous float32
+        self.layers = [
+            (np.ascontiguousarray(kernel, dtype=np.float32), np.ascontiguousarray(bias, dtype=np.float32), ACTIVATIONS[activation])
+            for kernel, bias, activation in layers
+        ]
+        self.input_dim = self.layers[0][0].shape[0]
+        self.output_dim = self.layers[-1][0].shape[1]
+
+    @classmethod
+    def from_h5(cls, path):
+        """Reads the layer config and weights from a Keras .h5 file."""
+        import h5py
+        with h5py.File(path, "r") as f:
+            config = json.loads(_decode(f.attrs["model_config"]))["config"]
+            layer_configs = config["layers"] if isinstance(config, dict) else config
+            weights = f["model_weights"] if "model_weights" in f else f
+
+            layers = []
+            for layer in layer_configs:
+                kind, layer_config = layer["class_name"], layer["config"]
+                if kind in PASSTHROUGH_LAYERS:
+                    continue
+                if kind != "Dense":
+                    raise ValueError(f"NumpyMLP: unsupported layer '{kind}'")
+
+                activation = layer_config.get("activation", "linear")
+                if activation not in ACTIVATIONS:
+                    raise ValueError(f"NumpyMLP: unsupported activation '{activation}'")
+
+                group = weights[layer_config["name"]]
+                arrays = [group[_decode(name)][()] for name in group.attrs["weight_names"]]
+                kernel = next(a for a in arrays if a.ndim == 2)
+                bias = next((a for a in arrays if a.ndim == 1), np.zeros(kernel.shape[1], dtype=np.float32))
+                layers.append((kernel, bias, activation))
+        return cls(layers)
+
+    def predict_on_batch(self, batch):
+        """(N, input_dim) -> (N, output_dim) probabilities."""
+        x = np.asarray(batch, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            x = x @ kernel
+            x += bias
+            x = activation(x)
+        return x
+
+    def predict(self, batch, verbose=0):
+        """Same call shape as keras `Model.predict`."""
+        return self.predict_on_batch(batch)
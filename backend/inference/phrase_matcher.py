@@ -0,0 +1,226 @@
+import collections
+import re
+from backend.config import TARGET_PHRASES, PHRASE_VARIANTS, PHRASE_CUES, PROPER_NOUNS
+from backend.config import GIBBERISH_CLUSTERS, PHRASE_MAX_RAW_LENGTH, PHRASE_FUZZY_RATIO
+
+# Stutter collapse: repeated characters (3 or more) and repeated 2-4 char syllables
+_REPEATED_CHARS = re.compile(r'(.)\1{2,}')
+_REPEATED_SYLLABLES = re.compile(r'(.{2,4})\1+')
+
+
+def compact(text):
+    """Uppercase, spaces removed: the form lip-reading output is compared in."""
+    return text.replace(" ", "").upper()
+
+
+def levenshtein(a, b, limit=None):
+    """Edit distance; stops early and returns limit + 1 once every row exceeds `limit`."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+# --- HELPER CLASSES ---
+
+class AhoCorasick:
+    """Multi-pattern substring automaton: one pass over the text finds every key it contains."""
+    def __init__(self, keys):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for key in keys:
+            node = 0
+            for ch in key:
+                if ch not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[node][ch] = len(self.goto) - 1
+                node = self.goto[node][ch]
+            self.output[node].append(key)
+
+        # Breadth-first failure links; outputs inherit their suffix's outputs
+        queue = collections.deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text):
+        """Set of keys occurring anywhere in `text`."""
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            found.update(self.output[node])
+        return found
+
+
+class BKTree:
+    """Burkhard-Keller tree over keys for bounded edit-distance lookups."""
+    def __init__(self, keys):
+        self.root = None
+        for key in keys:
+            self.add(key)
+
+    def add(self, key):
+        if self.root is None:
+            self.root = (key, {})
+            return
+        node = self.root
+        while True:
+            d = levenshtein(key, node[0])
+            if d == 0:
+                return
+            if d not in node[1]:
+                node[1][d] = (key, {})
+                return
+            node = node[1][d]
+
+    def search(self, word, max_dist):
+        """[(distance, key)] for keys within `max_dist` edits, closest first."""
+        if self.root is None:
+            return []
+        results = []
+        stack = [self.root]
+        while stack:
+            key, children = stack.pop()
+            d = levenshtein(word, key)
+            if d <= max_dist:
+                results.append((d, key))
+            for child_dist, child in children.items():
+                if d - max_dist <= child_dist <= d + max_dist:
+                    stack.append(child)
+        results.sort()
+        return results
+
+
+# --- MAIN MATCHER CLASS ---
+
+class PhraseMatcher:
+    """
+    Maps noisy recognizer output onto the phrase vocabulary. Everything is
+    compiled once from the vocabulary; lookups never rescan the phrase list.
+
+    - correct():    lip-reading text (exact, substring, fuzzy, then noise filters)
+    - match_cues(): speech recognition transcripts (PHRASE_CUES fragments)
+    - proper_case(): canonical capitalization of PROPER_NOUNS
+    """
+    def __init__(self, phrases=TARGET_PHRASES, variants=PHRASE_VARIANTS, cues=PHRASE_CUES,
+                 proper_nouns=PROPER_NOUNS, gibberish=GIBBERISH_CLUSTERS,
+                 max_raw_length=PHRASE_MAX_RAW_LENGTH, fuzzy_ratio=PHRASE_FUZZY_RATIO):
+        self.phrases = list(phrases)
+        self.phrase_set = set(self.phrases)
+        self.max_raw_length = max_raw_length
+        self.fuzzy_ratio = fuzzy_ratio
+
+        # Longer phrases win when keys overlap; rank is the tie-breaker for every lookup
+        ranked = sorted(self.phrases, key=len, reverse=True)
+        self.rank = {phrase: i for i, phrase in enumerate(ranked)}
+        self.exact = {} # compact key -> phrase (phrases and variants)
+        self.partial_exact = {} # compact key -> phrase (phrases only, for live partials)
+        for phrase in ranked:
+            self.partial_exact.setdefault(compact(phrase), phrase)
+            for key in [phrase] + list(variants.get(phrase, [])):
+                self.exact.setdefault(compact(key), phrase)
+
+        # Short keys ("NO", "HI") would turn up inside almost any garbled string
+        self.substrings = AhoCorasick(key for key, phrase in self.exact.items() if len(key) > 3 and len(compact(phrase)) > 3)
+        self.fuzzy = BKTree(self.exact)
+
+        self.cues = [(phrase, [f.upper() for f in fragments]) for phrase, fragments in cues]
+        self.cue_fragments = AhoCorasick({f for _, fragments in self.cues for f in fragments})
+
+        self.gibberish = re.compile("|".join(re.escape(c) for c in gibberish)) if gibberish else None
+        self.proper_nouns = {name.lower(): name for name in proper_nouns}
+        self.proper_noun_re = re.compile("|".join(re.escape(n) for n in proper_nouns), re.IGNORECASE) if proper_nouns else None
+
+    def is_phrase(self, text):
+        return text in self.phrase_set
+
+    def clean_stutter(self, text):
+        """Collapses repeating phonetic clusters to stop 'LAYRAIANNANNA'"""
+        text = _REPEATED_CHARS.sub(r'\1', text.upper())
+        return _REPEATED_SYLLABLES.sub(r'\1', text)
+
+    def _best(self, keys):
+        phrases = {self.exact[key] for key in keys}
+        return min(phrases, key=self.rank.get) if phrases else None
+
+    def correct(self, raw_text, is_final=True):
+        """
+        Lip-reading text -> phrase, cleaned raw text for the LLM, or "" for noise.
+        Intermediate (not final) results only snap to exact phrase spellings.
+        """
+        raw = compact(raw_text)
+        if not raw:
+            return ""
+        if not is_final:
+            return self.partial_exact.get(raw) or self.clean_stutter(raw_text)
+
+        # 1. Exact phrase or variant
+        match = self.exact.get(raw)
+        if match:
+            # Variants can differ in length; reject if the gap is implausibly large
+            if abs(len(raw) - len(compact(match))) > 6:
+                print(f"DEBUG: Rejecting '{match}' - gap too large ({len(raw)} vs {len(compact(match))})")
+                return self.clean_stutter(raw)
+            return match
+
+        # 2. Known word buried in garbled output (e.g. "AIHALOON" -> "HELLO")
+        match = self._best(self.substrings.find(raw))
+        if match:
+            print(f"DEBUG: Fuzzy Substring Match: Recovered '{match}' from '{raw}'")
+            return match
+
+        # 3. Within a few edits of a phrase (e.g. "HELO" -> "HELLO")
+        max_edits = int(len(raw) * self.fuzzy_ratio)
+        if max_edits:
+            hits = self.fuzzy.search(raw, max_edits)
+            if hits:
+                closest = [key for d, key in hits if d == hits[0][0]]
+                match = self._best(closest)
+                print(f"DEBUG: Fuzzy Edit Match: Recovered '{match}' from '{raw}' ({hits[0][0]} edits)")
+                return match
+
+        # 4. Strict noise clusters & stutter collapse
+        raw = self.clean_stutter(raw)
+        if (self.gibberish and self.gibberish.search(raw)) or len(raw) > self.max_raw_length:
+            print(f"DEBUG: Killing Gibberish Raw: '{raw}'")
+            return ""
+
+        # No dictionary match: the LLM gets the garbled string plus the audio
+        return raw
+
+    def match_cues(self, transcript):
+        """First phrase whose PHRASE_CUES fragments all occur in the transcript, or None."""
+        found = self.cue_fragments.find(transcript.upper())
+        for phrase, fragments in self.cues:
+            if all(f in found for f in fragments):
+                return phrase
+        return None
+
+    def proper_case(self, text):
+        """Writes every proper noun in its canonical capitalization ("rayyan" -> "Rayyan")."""
+        if self.proper_noun_re is None:
+            return text
+        return self.proper_noun_re.sub(lambda m: self.proper_nouns[m.group(0).lower()], text)
+
+
+# Built once per process from the configured vocabulary, shared by the voice engines
+phrase_matcher = PhraseMatcher()
@@ -0,0 +1,321 @@
+import contextlib
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from multiprocessing import shared_memory
+import numpy as np
+from backend.config import FRAME_RING_SLOTS, FRAME_SLOT_BYTES, WORKER_CALL_TIMEOUT, WORKER_POLL_INTERVAL, SESSION_IDLE_TIMEOUT
+from backend.inference.dispatcher import DispatcherBusy
+from backend.inference.telemetry import REGISTRY
+
+WORKER_RESTARTS = REGISTRY.counter("talkify_worker_restarts_total", "Worker processes respawned after exiting.", ("mode",))
+
+
+class FrameRing:
+    """
+    Fixed-size frame slots in one shared memory block. The parent copies a decoded
+    frame into a free slot and only sends (slot, shape) to the worker, which reads
+    the pixels in place instead of unpickling them.
+    """
+    def __init__(self, slots=FRAME_RING_SLOTS, slot_bytes=FRAME_SLOT_BYTES, name=None):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.free = queue.Queue()
+        for slot in range(slots):
+            self.free.put(slot)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def fits(self, frame):
+        return frame.nbytes <= self.slot_bytes
+
+    def write(self, slot, frame):
+        self.view(slot, frame.shape)[...] = frame
+
+    def view(self, slot, shape):
+        offset = slot * self.slot_bytes
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=offset)
+
+    def close(self, unlink=False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _worker_main(mode, ring_name, slots, slot_bytes, requests, responses):
+    """Worker process: owns its own trackers/models and serves the sessions pinned to it."""
+    from backend.inference.session_manager import build_session_manager
+
+    # Stage timings recorded in this process are shipped back with every response
+    REGISTRY.capture()
+    ring = FrameRing(slots, slot_bytes, name=ring_name)
+    try:
+        sessions = build_session_manager(mode)
+    except Exception as e:
+        responses.put((None, "failed", repr(e), REGISTRY.drain()))
+        ring.close()
+        return
+    responses.put((None, "ready", None, REGISTRY.drain()))
+
+    def notify(session_id):
+        return lambda: responses.put((None, "correction", session_id, REGISTRY.drain()))
+
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+        request_id, op, session_id, slot, frame, args = message
+        try:
+            with sessions.use(session_id) as session:
+                if hasattr(session, "next_correction") and session.correction_listener is None:
+                    session.correction_listener = notify(session_id)
+
+                if op == "predict":
+                    if slot is not None:
+                        # Read in place: the parent keeps the slot reserved until we answer
+                        frame = ring.view(slot, frame)
+                    result = session.predict(frame, *args)
+                elif op in ("predict_landmarks", "next_correction"):
+                    result = getattr(session, op)(*args)
+                else:
+                    raise ValueError(f"Unknown op '{op}'")
+            responses.put((request_id, "ok", result, REGISTRY.drain()))
+        except Exception as e:
+            responses.put((request_id, "error", repr(e), REGISTRY.drain()))
+
+    ring.close()
+
+
+class RemoteSession:
+    """Stand-in for a session engine that lives in a worker process."""
+    def __init__(self, pool, session_id):
+        self.pool = pool
+        self.session_id = session_id
+
+    def predict(self, frame, *args):
+        return self.pool.call(self.session_id, "predict", frame, args)
+
+    def predict_landmarks(self, *args):
+        return self.pool.call(self.session_id, "predict_landmarks", args=args)
+
+    def next_correction(self):
+        return self.pool.call(self.session_id, "next_correction")
+
+    @property
+    def correction_listener(self):
+        return self.pool.listeners.get(self.session_id)
+
+    @correction_listener.setter
+    def correction_listener(self, listener):
+        if listener is None:
+            self.pool.listeners.pop(self.session_id, None)
+        else:
+            self.pool.listeners[self.session_id] = listener
+
+
+class WorkerProcessPool:
+    """
+    Runs engines for one mode in `workers` processes so MediaPipe and the models
+    can use every core. Each session is pinned to one worker (MediaPipe's tracking
+    state lives there); new sessions go to the worker with the fewest sessions.
+
+    A worker that dies after loading is respawned: its pending calls fail, their
+    frame slots go back to the ring and its sessions start over on any worker.
+
+    Exposes the same `get(session_id)` / `use(session_id)` / `peek(session_id)` / `len()` surface as SessionManager.
+    """
+    def __init__(self, mode, workers):
+        self.ctx = mp.get_context("spawn") # Forking a process with TF/MediaPipe threads is unsafe
+        self.mode = mode
+        self.rings = [FrameRing() for _ in range(workers)]
+        self.requests = [None] * workers
+        self.processes = [None] * workers
+        self.started = [False] * workers # Set once a worker's first engine load finished
+        self.serving = [False] * workers # False while a worker loads or is being respawned
+        self.futures = {} # request id -> (Future or None once the caller gave up, worker index, slot)
+        self.listeners = {} # session id -> callback for pushed corrections
+        self.assignment = {} # session id -> [worker index, last seen]
+        self.ids = itertools.count()
+        self.lock = threading.Lock()
+        self.loaded = threading.Semaphore(0) # Released once per worker that finished (or failed) loading
+        self.load_error = None
+        self.closing = False
+
+        for index in range(workers):
+            self._spawn(index)
+        print(f"WorkerProcessPool: Started {workers} '{mode}' worker processes.")
+
+    def _spawn(self, index):
+        ring = self.rings[index]
+        requests, responses = self.ctx.Queue(), self.ctx.Queue()
+        process = self.ctx.Process(
+            target=_worker_main,
+            args=(self.mode, ring.name, ring.slots, ring.slot_bytes, requests, responses),
+            daemon=True,
+            name=f"{self.mode}-worker-{index}"
+        )
+        process.start()
+        self.requests[index] = requests
+        self.processes[index] = process
+        threading.Thread(target=self._read_responses, args=(index, process, responses), daemon=True).start()
+
+    def wait_loaded(self, timeout=None):
+        """Blocks until every worker has built (and warmed up) its engine; raises if one failed."""
+        for _ in self.processes:
+            if not self.loaded.acquire(timeout=timeout):
+                raise TimeoutError(f"{self.mode} workers did not finish loading")
+        if self.load_error:
+            raise RuntimeError(f"{self.mode} worker failed to load: {self.load_error}")
+
+    def get(self, session_id):
+        return RemoteSession(self, session_id)
+
+    def peek(self, session_id):
+        """A handle for `session_id` if it is pinned to a worker, without pinning it."""
+        with self.lock:
+            live = session_id in self.assignment
+        return RemoteSession(self, session_id) if live else None
+
+    @contextlib.contextmanager
+    def use(self, session_id):
+        # Eviction happens inside the worker, under the worker's own session locks
+        yield RemoteSession(self, session_id)
+
+    def __len__(self):
+        return len(self.assignment)
+
+    def _worker_for(self, session_id):
+        now = time.time()
+        with self.lock:
+            entry = self.assignment.get(session_id)
+            if entry is None:
+                # Forget sessions the workers have idled out
+                for stale in [s for s, (_, seen) in self.assignment.items() if now - seen > SESSION_IDLE_TIMEOUT]:
+                    del self.assignment[stale]
+                loads = [0] * len(self.processes)
+                for index, _ in self.assignment.values():
+                    loads[index] += 1
+                entry = self.assignment[session_id] = [loads.index(min(loads)), now]
+            entry[1] = now
+            return entry[0]
+
+    def call(self, session_id, op, frame=None, args=()):
+        index = self._worker_for(session_id)
+        if not self.serving[index]:
+            raise DispatcherBusy(f"{self.mode} worker {index} is restarting")
+        ring = self.rings[index]
+        slot = None
+        if frame is not None and ring.fits(frame):
+            # Blocks while every slot of this worker is in flight (back-pressure)
+            try:
+                slot = ring.free.get(timeout=WORKER_CALL_TIMEOUT)
+            except queue.Empty:
+                raise DispatcherBusy(f"{self.mode} worker {index} has no free frame slot")
+            ring.write(slot, frame)
+            frame = frame.shape
+
+        request_id = next(self.ids)
+        future = Future()
+        with self.lock:
+            self.futures[request_id] = (future, index, slot)
+        self.requests[index].put((request_id, op, session_id, slot, frame, args))
+        try:
+            return future.result(timeout=WORKER_CALL_TIMEOUT)
+        except FutureTimeout:
+            # The worker may still be reading the slot: it stays reserved until the
+            # late response arrives or the worker dies
+            with self.lock:
+                if request_id in self.futures:
+                    self.futures[request_id] = (None, index, slot)
+            raise DispatcherBusy(f"{self.mode} worker {index} did not answer within {WORKER_CALL_TIMEOUT}s")
+
+    def _read_responses(self, index, process, responses):
+        while True:
+            try:
+                request_id, status, result, records = responses.get(timeout=WORKER_POLL_INTERVAL)
+            except queue.Empty:
+                if self.closing:
+                    return
+                if not process.is_alive():
+                    self._worker_died(index, process)
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+            REGISTRY.replay(records)
+            if request_id is None:
+                if status in ("ready", "failed"):
+                    if status == "failed":
+                        self.load_error = self.load_error or result
+                    else:
+                        self.serving[index] = True
+                    if not self.started[index]:
+                        self.started[index] = True
+                        self.loaded.release()
+                    elif status == "failed":
+                        print(f"WorkerProcessPool: Respawned {process.name} failed to load: {result}")
+                    continue
+                # Unsolicited: a background job in the worker queued a correction
+                listener = self.listeners.get(result)
+                if listener:
+                    listener()
+                continue
+
+            with self.lock:
+                entry = self.futures.pop(request_id, None)
+            if entry is None:
+                continue
+            future, _, slot = entry
+            if slot is not None:
+                self.rings[index].free.put(slot)
+            if future is None:
+                continue # The caller timed out; only the slot was still held
+            if status == "ok":
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(f"{self.mode} worker error: {result}"))
+
+    def _worker_died(self, index, process):
+        """Fails the dead worker's pending calls, frees their slots and starts a replacement."""
+        reason = f"{process.name} exited with code {process.exitcode}"
+        print(f"WorkerProcessPool: {reason}.")
+        self.serving[index] = False
+        with self.lock:
+            pending = [(rid, entry) for rid, entry in self.futures.items() if entry[1] == index]
+            for rid, _ in pending:
+                del self.futures[rid]
+            # Their engine state is gone; the next call reassigns them
+            for session_id in [s for s, (i, _) in self.assignment.items() if i == index]:
+                del self.assignment[session_id]
+        for _, (future, _, slot) in pending:
+            if slot is not None:
+                self.rings[index].free.put(slot)
+            if future is not None:
+                future.set_exception(RuntimeError(f"{self.mode} worker error: {reason}"))
+
+        if not self.started[index]:
+            # Died while loading: report it to wait_loaded() instead of looping on respawns
+            self.started[index] = True
+            self.load_error = self.load_error or reason
+            self.loaded.release()
+            return
+        WORKER_RESTARTS.inc(self.mode)
+        self._spawn(index)
+
+    def close(self):
+        self.closing = True
+        for requests in self.requests:
+            requests.put(None)
+        for process in self.processes:
+            process.join(timeout=5)
+        for ring in self.rings:
+            ring.close(unlink=True)
@@ -0,0 +1,160 @@
+import collections
+import contextlib
+import threading
+import time
+from backend.config import SESSION_MAX_COUNT, SESSION_IDLE_TIMEOUT, SESSION_MAX_MEMORY_MB, TRACKER_POOL_SIZE, ENGINE_WARMUP
+
+
+class TrackerPool:
+    """
+    Keeps idle MediaPipe graphs around so new sessions don't pay for building one.
+    """
+    def __init__(self, factory, max_idle=TRACKER_POOL_SIZE):
+        self.factory = factory
+        self.max_idle = max_idle
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def acquire(self, session_id=None):
+        # session_id is only used by FaceTrackingService, which shares graphs per session
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+        return self.factory()
+
+    def release(self, tracker):
+        if tracker is None:
+            return
+        # Forget the previous user's hand/face before anyone else gets this graph
+        tracker.reset()
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append(tracker)
+
+
+class SessionManager:
+    """
+    Maps session ids to per-session engine clones (see `new_session` on each engine).
+
+    Sessions are kept in least-recently-used order and evicted when they have been
+    idle for too long, or when the table exceeds its count or memory budget.
+
+    Engine calls go through `use()`, which holds the session's lock for the call.
+    Eviction runs on whichever thread calls in, so it only takes sessions whose
+    lock is free; a session mid-call elsewhere is left for a later pass.
+    """
+    def __init__(self, engine, tracker_pool, max_sessions=SESSION_MAX_COUNT,
+                 idle_timeout=SESSION_IDLE_TIMEOUT, max_memory_mb=SESSION_MAX_MEMORY_MB):
+        self.engine = engine
+        self.tracker_pool = tracker_pool
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.sessions = collections.OrderedDict() # session_id -> [engine, last_seen, lock]
+        self.lock = threading.Lock()
+
+    def get(self, session_id):
+        """Returns the engine for `session_id`, creating it if needed. Prefer use() for engine calls."""
+        return self._entry(session_id)[0]
+
+    def peek(self, session_id):
+        """Returns the engine for `session_id` if it is live, without creating it or marking it used."""
+        with self.lock:
+            entry = self.sessions.get(session_id)
+        return entry[0] if entry is not None else None
+
+    @contextlib.contextmanager
+    def use(self, session_id):
+        """Yields the engine for `session_id` with its lock held, so it can't be evicted mid-call."""
+        while True:
+            entry = self._entry(session_id)
+            with entry[2]:
+                with self.lock:
+                    current = self.sessions.get(session_id) is entry
+                if current:
+                    yield entry[0]
+                    return
+            # Evicted between lookup and lock: the next lookup creates a fresh session
+
+    def _entry(self, session_id):
+        now = time.time()
+        with self.lock:
+            entry = self.sessions.get(session_id)
+            if entry is not None:
+                entry[1] = now
+                self.sessions.move_to_end(session_id)
+            else:
+                session = self.engine.new_session(self.tracker_pool.acquire(session_id))
+                self.sessions[session_id] = entry = [session, now, threading.Lock()]
+            evicted = self._evict(now)
+        self._release(evicted)
+        return entry
+
+    def close(self, session_id):
+        with self.lock:
+            entry = self.sessions.pop(session_id, None)
+        if entry is not None:
+            entry[2].acquire() # Waits out a call in flight
+            self._release([entry])
+
+    def _evict(self, now):
+        """
+        Pops idle / over-budget sessions (oldest first, never the newest) whose
+        lock is free, returning them with the lock still held. Caller holds self.lock.
+        """
+        evicted = []
+        memory = None # Summed once, on first need, then reduced as sessions go
+        for session_id, entry in list(self.sessions.items())[:-1]:
+            session, last_seen, lock = entry
+            over_count = len(self.sessions) > self.max_sessions
+            idle = now - last_seen > self.idle_timeout
+            if not (over_count or idle):
+                if memory is None:
+                    memory = self._memory_usage()
+                if memory <= self.max_memory:
+                    break
+            if not lock.acquire(blocking=False):
+                continue # Mid-call on another thread
+            print(f"SessionManager: Evicting session '{session_id}' ({'idle' if idle else 'over budget'})")
+            del self.sessions[session_id]
+            evicted.append(entry)
+            if memory is not None:
+                memory -= session.memory_usage()
+        return evicted
+
+    def _release(self, entries):
+        """Returns evicted sessions' trackers to the pool, then unlocks them."""
+        for session, _, lock in entries:
+            try:
+                self.tracker_pool.release(session.release())
+            finally:
+                lock.release()
+
+    def _memory_usage(self):
+        return sum(entry[0].memory_usage() for entry in self.sessions.values())
+
+    def __len__(self):
+        return len(self.sessions)
+
+
+def build_session_manager(mode, warmup=ENGINE_WARMUP):
+    """Loads the engine for `mode` ("sign", "voice" or "lip") and wraps it in a SessionManager."""
+    if mode == "sign":
+        from backend.hand_tracking.mediapipe_hand import HandTracker
+        from backend.inference.sign_inference import SignInference
+        engine, tracker_pool = SignInference(), TrackerPool(HandTracker)
+    elif mode == "voice":
+        from backend.voice_tracking.face_service import face_service
+        from backend.inference.audio_inference import AudioInference
+        engine, tracker_pool = AudioInference(), face_service
+    elif mode == "lip":
+        from backend.voice_tracking.face_service import face_service
+        from backend.inference.voice_inference import LipInference
+        engine, tracker_pool = LipInference(), face_service
+    else:
+        raise ValueError(f"Unknown mode '{mode}'")
+    if warmup:
+        engine.warmup()
+    # The prototype engine only lends its model to sessions; recycle its tracker
+    tracker_pool.release(engine.release())
+    return SessionManager(engine, tracker_pool)
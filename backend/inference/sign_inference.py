@@ -1,12 +1,31 @@
 import cv2
 import numpy as np
 import collections
+import copy
 import time
 import os
-from tensorflow.keras.models import load_model
-from backend.config import SIGN_MODEL_PATH, SIGN_CLASSES, ALPHABET_CLASSES, NUMBER_CLASSES
+from backend.config import SIGN_MODEL_PATH, SIGN_CLASSES, ALPHABET_CLASSES, NUMBER_CLASSES, SIGN_ENGINE
+from backend.config import SIGN_ROI_ENABLED, SIGN_ROI_MARGIN, SIGN_ROI_MIN_SIZE
 from backend.hand_tracking.mediapipe_hand import HandTracker
-from backend.preprocessing.hand_keypoints import extract_hand_landmarks, landmarks_to_list
+from backend.preprocessing.hand_keypoints import normalize_hand_array
+from backend.preprocessing.landmark_array import landmarks_to_dicts, landmark_bounds, X, Y, Z
+from backend.preprocessing.hand_geometry import HandGeometry, INDEX, MIDDLE, RING, PINKY
+from backend.inference.batching import MicroBatcher
+from backend.inference.numpy_mlp import NumpyMLP
+from backend.inference.telemetry import timed
+
+CLASS_INDEX = {cls: idx for idx, cls in enumerate(SIGN_CLASSES)}
+SPACE_IDX = CLASS_INDEX.get("SPACE", -1)
+
+def _class_mask(allowed):
+    return np.array([1.0 if cls in allowed else 0.0 for cls in SIGN_CLASSES], dtype=np.float32)
+
+# Handedness filtering, keyed by MediaPipe label (mirrored: "Left" is the physical right hand)
+HANDEDNESS_MASKS = {
+    "Left": _class_mask(set(ALPHABET_CLASSES) | {"SPACE"}), # Physical Right Hand: A-Z + SPACE
+    "Right": _class_mask(set(NUMBER_CLASSES)),              # Physical Left Hand: numbers only
+}
+NO_MASK = np.ones(len(SIGN_CLASSES), dtype=np.float32)
 
 # --- HELPER CLASSES ---
 
@@ -14,7 +33,8 @@ class GestureStabilizer:
     """
     Stabilizes predictions using a buffer, majority voting, and cooldowns.
     """
-    def __init__(self, buffer_size=10, consensus_threshold=7, cooldown=0.5):
+    def __init__(self, buffer_size=10, consensus_threshold=7, cooldown=0.5, clock=time.time):
+        self.clock = clock # Injectable so replays are reproducible
         self.buffer = collections.deque(maxlen=buffer_size)
         self.consensus_threshold = consensus_threshold
         self.cooldown = cooldown
@@ -35,7 +55,7 @@ class GestureStabilizer:
             if count >= self.consensus_threshold:
                 gesture = SIGN_CLASSES[most_common]
                 
-                current_time = time.time()
+                current_time = self.clock()
                 if gesture != self.last_stable_gesture:
                     if (current_time - self.last_prediction_time) > self.cooldown:
                         self.last_stable_gesture = gesture
@@ -53,20 +73,129 @@ class GestureStabilizer:
 # --- MAIN INFERENCE CLASS ---
 
 class SignInference:
-    def __init__(self):
-        self.hand_tracker = HandTracker()
-        self.stabilizer = GestureStabilizer()
-        
+    def __init__(self, engine=SIGN_ENGINE, clock=time.time, roi=SIGN_ROI_ENABLED):
+        """
+        engine: "numpy" evaluates the MLP with NumPy (no TensorFlow import),
+                "keras" runs it through tf.keras.
+        clock:  time source for the stabilizer cooldown (injectable for replay benchmarks).
+        roi:    track inside a crop around the previous hand (see SIGN_ROI_ENABLED).
+        """
+        self.clock = clock
+        self.roi_enabled = roi
+        self._init_state(HandTracker(crops=roi))
+        self.model = self._load_model(engine)
+
+        # Shared by every session clone so concurrent frames go through one forward pass
+        self.batcher = MicroBatcher(self.model.predict_on_batch) if self.model is not None else None
+
+    def _load_model(self, engine):
+        if engine == "numpy":
+            try:
+                model = NumpyMLP.from_h5(SIGN_MODEL_PATH)
+                print(f"Sign model loaded (NumPy engine) from: {SIGN_MODEL_PATH}")
+                return model
+            except Exception as e:
+                print(f"NumPy sign engine unavailable ({e}), falling back to Keras.")
+
         try:
-            self.model = load_model(SIGN_MODEL_PATH)
-            print(f"Sign model loaded from: {SIGN_MODEL_PATH}")
+            from tensorflow.keras.models import load_model
+            model = load_model(SIGN_MODEL_PATH)
+            print(f"Sign model loaded (Keras engine) from: {SIGN_MODEL_PATH}")
+            return model
         except Exception as e:
-            self.model = None
             print(f"Error loading sign model: {e}")
-
-    def predict(self, frame):
+            return None
+
+    def _init_state(self, hand_tracker):
+        """Per-session temporal state (tracking graph + vote buffer)."""
+        self.hand_tracker = hand_tracker
+        self.stabilizer = GestureStabilizer(clock=self.clock)
+        self.features = np.zeros((21, 3), dtype=np.float32) # Normalized landmarks, reused per frame
+        self.roi = None # Previous hand box (normalized x1, y1, x2, y2) for ROI tracking
+        self.full_frame_stale = False # The video graph missed frames while crops were tracked
+
+    def new_session(self, hand_tracker):
+        """Returns an engine sharing this one's model but with its own temporal state."""
+        session = copy.copy(self)
+        session._init_state(hand_tracker)
+        return session
+
+    def release(self):
+        """Detaches and returns the tracker so it can be pooled."""
+        tracker, self.hand_tracker = self.hand_tracker, None
+        return tracker
+
+    def memory_usage(self):
+        return 0 # Stabilizer holds a handful of ints
+
+    def warmup(self):
+        """One dummy pass through the tracker and model so graph setup isn't paid by the first client."""
+        if self.hand_tracker is not None:
+            self.hand_tracker.process(np.zeros((240, 320, 3), dtype=np.uint8))
+            if self.hand_tracker.crop_hands is not None:
+                self.hand_tracker.process_crop(np.zeros((160, 160, 3), dtype=np.uint8))
+        if self.model is not None:
+            self.model.predict_on_batch(np.zeros((1, 63), dtype=np.float32))
+
+    def _track_region(self, frame, box):
+        """Runs the tracker on frame[box] and maps landmarks back to full-frame coordinates."""
+        h, w = frame.shape[:2]
+        x1, y1, x2, y2 = box
+        with timed("cvtColor"):
+            image_rgb = cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2RGB)
+        full_frame = box == (0, 0, w, h)
+        with timed("hand_tracking"):
+            if full_frame:
+                if self.full_frame_stale:
+                    # Its tracking state is from the last full frame, before the crops
+                    self.hand_tracker.reset()
+                    self.full_frame_stale = False
+                results = self.hand_tracker.process(image_rgb)
+            else:
+                results = self.hand_tracker.process_crop(image_rgb)
+                self.full_frame_stale = True
+            lms, hand_label = self.hand_tracker.to_array(results)
+        if lms is not None and not full_frame:
+            lms[:, X] = (lms[:, X] * (x2 - x1) + x1) / w
+            lms[:, Y] = (lms[:, Y] * (y2 - y1) + y1) / h
+            lms[:, Z] *= (x2 - x1) / w # z shares x's scale in MediaPipe
+        return lms, hand_label
+
+    def _roi_box(self, w, h):
+        """Square pixel box around the previous hand plus margin, clipped to the frame."""
+        x1, y1, x2, y2 = self.roi
+        cx, cy = (x1 + x2) / 2 * w, (y1 + y2) / 2 * h
+        side = max((x2 - x1) * w, (y2 - y1) * h) * (1 + 2 * SIGN_ROI_MARGIN)
+        side = max(side, SIGN_ROI_MIN_SIZE * min(w, h))
+        half = side / 2
+        return (max(0, int(cx - half)), max(0, int(cy - half)), min(w, int(cx + half)), min(h, int(cy + half)))
+
+    def _track(self, frame):
+        """
+        Hand tracking with ROI mode: while a hand is being followed, only the crop
+        around its previous position is converted and searched (on the tracker's
+        static crop graph). Falls back to the full-frame video graph, reset first,
+        when the hand is lost.
         """
-        Runs inference on a single frame.
+        h, w = frame.shape[:2]
+        lms = hand_label = None
+        if self.roi_enabled and self.hand_tracker.crop_hands is not None and self.roi is not None:
+            box = self._roi_box(w, h)
+            # Not worth it when the crop is most of the frame anyway
+            if (box[2] - box[0]) * (box[3] - box[1]) < 0.6 * w * h:
+                lms, hand_label = self._track_region(frame, box)
+        if lms is None:
+            lms, hand_label = self._track_region(frame, (0, 0, w, h))
+
+        self.roi = None
+        if lms is not None:
+            self.roi = (float(lms[:, X].min()), float(lms[:, Y].min()), float(lms[:, X].max()), float(lms[:, Y].max()))
+        return lms, hand_label
+
+    def predict(self, frame, scale=1):
+        """
+        Runs inference on a single frame. `scale` is the decode reduction factor
+        (see decode_frame) so hand_rect is reported in original pixel coordinates.
         """
         if frame is None:
             return "", "No frame", [], None
@@ -74,139 +203,79 @@ class SignInference:
         if self.model is None:
             return "", "Model not loaded", [], None
 
-        image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        mp_res = self.hand_tracker.process(image_rgb)
-        
-        if not mp_res.multi_hand_landmarks:
+        # 1. Get Landmarks & Handedness ((21, 3) float32, filled once per frame)
+        lms_obj, hand_label = self._track(frame) # "Left" or "Right" (MediaPipe convention)
+        h, w = frame.shape[:2]
+        return self.predict_landmarks(lms_obj, hand_label, (w * scale, h * scale))
+
+    def predict_landmarks(self, lms_obj, hand_label, frame_size=None):
+        """
+        Runs everything after hand tracking on already-tracked landmarks: a (21, 3)
+        array in MediaPipe's normalized image coordinates and its MediaPipe
+        handedness label ("Left"/"Right"). `lms_obj=None` means no hand this frame.
+        `frame_size` (width, height) in pixels is only needed for hand_rect.
+        """
+        if self.model is None:
+            return "", "Model not loaded", [], None
+
+        if lms_obj is None:
             self.stabilizer.clear()
             return "", "NO HAND DETECTED", [], None
-
-        # 1. Get Landmarks & Handedness
-        lms_obj = mp_res.multi_hand_landmarks[0].landmark
-        handedness_obj = mp_res.multi_handedness[0].classification[0]
-        hand_label = handedness_obj.label  # "Left" or "Right" (MediaPipe convention)
         
-        landmarks = [{'x': lm.x, 'y': lm.y, 'z': lm.z} for lm in lms_obj]
+        landmarks = landmarks_to_dicts(lms_obj)
 
         # 2. Static Model Prediction
-        norm_lms = extract_hand_landmarks(mp_res)
-        feat = landmarks_to_list(norm_lms)
+        with timed("sign_features"):
+            feat = normalize_hand_array(lms_obj, out=self.features).reshape(-1)
         
         if len(feat) == 63:
-            input_data = np.expand_dims(np.array(feat), axis=0)
-            prediction = self.model.predict(input_data, verbose=0)[0]
-            
-            # --- Space Gesture Heuristic (Right Hand Only) ---
-            is_space = False
-            if hand_label == "Left": # Physical Right Hand
-                is_space = self._is_space_gesture(lms_obj)
+            prediction = self.batcher.predict(feat)
 
             # Pad prediction if model only returns 36 classes (0-9, A-Z)
             if len(prediction) == 36:
                 prediction = np.append(prediction, [0.0])
-            
-            # --- Space Gesture Heuristic (Right Hand Only) ---
 
             # Map raw labels to user-friendly names
             friendly_hand = "Right Hand" if hand_label == "Left" else "Left Hand"
-            
-            # Debug/Status flags for heuristic
-            h_info = ""
-            if hand_label == "Left":
-                f_up, t_ex, vert = self._get_space_debug(lms_obj)
-                h_info = f" [F:{int(f_up)} T:{int(t_ex)} V:{int(vert)}]"
-
-            # SPACE OVERRIDE (Physical Right Hand)
-            space_idx = SIGN_CLASSES.index("SPACE") if "SPACE" in SIGN_CLASSES else -1
-            model_pred_idx = np.argmax(prediction)
-            
-            if hand_label == "Left": # Right Hand
-                 # Check for Space vs B disambiguation
-                 if self._verify_b_gesture(lms_obj):
-                    prediction.fill(0.0)
-                    b_idx = SIGN_CLASSES.index("B") if "B" in SIGN_CLASSES else -1
-                    if b_idx != -1: prediction[b_idx] = 1.0
-                    is_space = False
-                 elif is_space:
-                    prediction.fill(0.0)
-                    if space_idx != -1: prediction[space_idx] = 1.0
+            hand_rect = self._get_hand_rect(frame_size, lms_obj) if frame_size else None
+            with timed("sign_heuristics"):
+                geometry = HandGeometry(lms_obj)
+
+                # --- SPACE vs B Override (Physical Right Hand) ---
+                if hand_label == "Left":
+                    # Check for Space vs B disambiguation
+                    if self._verify_b_gesture(geometry):
+                        prediction = np.zeros_like(prediction)
+                        prediction[CLASS_INDEX["B"]] = 1.0
+                    elif self._is_space_gesture(geometry) and SPACE_IDX != -1:
+                        prediction = np.zeros_like(prediction)
+                        prediction[SPACE_IDX] = 1.0
 
             # --- Handedness Filtering ---
-            mask = np.zeros_like(prediction)
+            masked_prediction = prediction * HANDEDNESS_MASKS.get(hand_label, NO_MASK)
+            total = np.sum(masked_prediction)
             
-            if hand_label == "Left": # Physical Right Hand
-                 # Allow A-Z + SPACE
-                 for idx, cls in enumerate(SIGN_CLASSES):
-                     if cls in ALPHABET_CLASSES or cls == "SPACE":
-                         mask[idx] = 1.0
-            elif hand_label == "Right": # Physical Left Hand
-                # Allow only Numbers
-                for idx, cls in enumerate(SIGN_CLASSES):
-                    if cls in NUMBER_CLASSES:
-                        mask[idx] = 1.0
-            else:
-                mask = np.ones_like(prediction)
-
-            # Apply mask
-            masked_prediction = prediction * mask
-            
-            if np.sum(masked_prediction) == 0:
-                return "", f"Wrong Hand ({friendly_hand})", landmarks, self._get_hand_rect(frame, lms_obj)
+            if total == 0:
+                return "", f"Wrong Hand ({friendly_hand})", landmarks, hand_rect
 
             # Re-normalize
-            masked_prediction /= np.sum(masked_prediction)
+            masked_prediction /= total
 
-            max_idx = np.argmax(masked_prediction)
+            max_idx = int(np.argmax(masked_prediction))
             confidence = float(masked_prediction[max_idx])
             raw_label = SIGN_CLASSES[max_idx]
             
             # 3. Disambiguation Heuristics (Deep Verify)
-            if raw_label == "A":
-                # If model thinks it's 'A', but pinky is extended, it's NOT a fist 'A'
-                is_fist = self._verify_a_gesture(lms_obj)
-                if not is_fist:
-                    # Check if it should be 'Y' instead
-                    if self._verify_y_gesture(lms_obj):
-                        raw_label = "Y"
-                        max_idx = SIGN_CLASSES.index("Y")
-                    else:
-                        return "", f"Analyzing... [{friendly_hand}]", landmarks, hand_rect
-
-            elif raw_label == "Y":
-                # If model thinks it's 'Y', but pinky is folded, it's NOT 'Y'
-                is_y = self._verify_y_gesture(lms_obj)
-                if not is_y:
-                    # Check if it should be 'A' instead
-                    if self._verify_a_gesture(lms_obj):
-                        raw_label = "A"
-                        max_idx = SIGN_CLASSES.index("A")
-                    else:
-                        return "", f"Analyzing... [{friendly_hand}]", landmarks, hand_rect
-
-            elif raw_label in ["M", "N", "T"]:
-                # Professional disambiguation for similar gestures
-                if self._verify_m_gesture(lms_obj):
-                    raw_label = "M"
-                    max_idx = SIGN_CLASSES.index("M")
-                elif self._verify_n_gesture(lms_obj):
-                    raw_label = "N"
-                    max_idx = SIGN_CLASSES.index("N")
-                elif self._verify_t_gesture(lms_obj):
-                    raw_label = "T"
-                    max_idx = SIGN_CLASSES.index("T")
-
-            elif raw_label in ["E", "I"]:
-                if self._verify_e_gesture(lms_obj):
-                    raw_label = "E"
-                    max_idx = SIGN_CLASSES.index("E")
-                elif self._verify_i_gesture(lms_obj):
-                    raw_label = "I"
-                    max_idx = SIGN_CLASSES.index("I")
+            with timed("sign_heuristics"):
+                raw_label = self._refine_label(raw_label, geometry)
+            if raw_label is None:
+                return "", f"Analyzing... [{friendly_hand}]", landmarks, hand_rect
+
+            max_idx = CLASS_INDEX[raw_label]
 
             # 4. Stabilization
-            stable_gesture = self.stabilizer.update(max_idx, confidence)
-            
-            hand_rect = self._get_hand_rect(frame, lms_obj)
+            with timed("stabilizer"):
+                stable_gesture = self.stabilizer.update(max_idx, confidence)
             
             # Map "SPACE" label to actual " " character for transcription
             output_text = stable_gesture
@@ -218,93 +287,97 @@ class SignInference:
         
         return "", "Feature error", landmarks, None
 
-    def _get_space_debug(self, lms):
+    # --- Heuristics (over a precomputed HandGeometry) ---
+
+    def _refine_label(self, raw_label, g):
+        """Resolves look-alike letters; None means the pose fits neither candidate."""
+        if raw_label == "A":
+            # If model thinks it's 'A', but pinky is extended, it's NOT a fist 'A'
+            if not self._verify_a_gesture(g):
+                # Check if it should be 'Y' instead
+                return "Y" if self._verify_y_gesture(g) else None
+
+        elif raw_label == "Y":
+            # If model thinks it's 'Y', but pinky is folded, it's NOT 'Y'
+            if not self._verify_y_gesture(g):
+                # Check if it should be 'A' instead
+                return "A" if self._verify_a_gesture(g) else None
+
+        elif raw_label in ["M", "N", "T"]:
+            # Professional disambiguation for similar gestures
+            if self._verify_m_gesture(g):
+                return "M"
+            elif self._verify_n_gesture(g):
+                return "N"
+            elif self._verify_t_gesture(g):
+                return "T"
+
+        elif raw_label in ["E", "I"]:
+            if self._verify_e_gesture(g):
+                return "E"
+            elif self._verify_i_gesture(g):
+                return "I"
+
+        return raw_label
+
+    def _get_space_debug(self, g):
         """Returns the individual components of the space heuristic for debugging."""
-        f_up = (lms[8].y < lms[6].y and lms[12].y < lms[10].y and lms[16].y < lms[14].y and lms[20].y < lms[18].y)
         # Thumb extended: loosen more
-        t_ex = abs(lms[4].x - lms[5].x) > 0.01 
-        vert = lms[12].y < lms[0].y
-        return f_up, t_ex, vert
+        return g.fingers_up, g.thumb_extended(0.01), g.vertical
 
-    def _is_space_gesture(self, lms):
+    def _is_space_gesture(self, g):
         """Heuristic for 'SPACE' (Wide Open Palm)."""
-        f_up, t_ex, vert = self._get_space_debug(lms)
+        f_up, t_ex, vert = self._get_space_debug(g)
         
         # Additional spread check for Space: Distance between Index and Middle tips
         # Normalize by palm size (0 to 9)
-        palm_size = abs(lms[0].y - lms[9].y)
-        spread = abs(lms[8].x - lms[12].x) / palm_size if palm_size > 0 else 0
+        spread = g.index_middle_spread / g.palm_size if g.palm_size > 0 else 0
         is_spread = spread > 0.4 # Fingers must be apart
         
         return f_up and t_ex and vert and is_spread
 
-    def _verify_b_gesture(self, lms):
+    def _verify_b_gesture(self, g):
         """'B' check: All fingers up but touching each other."""
-        f_up, t_ex, vert = self._get_space_debug(lms)
-        
         # Fingers touching check
-        palm_size = abs(lms[0].y - lms[9].y)
-        total_spread = abs(lms[8].x - lms[20].x) / palm_size if palm_size > 0 else 1.0
+        total_spread = g.index_pinky_spread / g.palm_size if g.palm_size > 0 else 1.0
         is_closed = total_spread < 0.6 # Fingers are held close together
         
-        return f_up and is_closed
+        return g.fingers_up and is_closed
 
-    def _verify_y_gesture(self, lms):
+    def _verify_y_gesture(self, g):
         """'Y' check: Pinky tip (20) must be significantly extended above pinky MCP (17)."""
-        pinky_extended = (lms[20].y < lms[18].y) and (lms[20].y < lms[17].y)
+        pinky_extended = g.tip_minus_pip[PINKY] < 0 and g.pinky_above_mcp
         # Thumb also usually out for 'Y'
-        thumb_out = abs(lms[4].x - lms[5].x) > 0.02
-        return pinky_extended and thumb_out
+        return pinky_extended and g.thumb_extended(0.02)
 
-    def _verify_a_gesture(self, lms):
+    def _verify_a_gesture(self, g):
         """'A' check: All fingers (8, 12, 16, 20) should be below their corresponding MCPs (Fist)."""
-        pinky_folded = lms[20].y > lms[18].y
-        ring_folded = lms[16].y > lms[14].y
-        middle_folded = lms[12].y > lms[10].y
-        index_folded = lms[8].y > lms[6].y
-        return pinky_folded and ring_folded and middle_folded and index_folded
+        return g.folded(INDEX, MIDDLE, RING, PINKY)
 
-    def _verify_e_gesture(self, lms):
+    def _verify_e_gesture(self, g):
         """'E' check: All fingers are folded down toward the palm."""
-        pinky_folded = lms[20].y > lms[18].y - 0.02
-        ring_folded = lms[16].y > lms[14].y
-        middle_folded = lms[12].y > lms[10].y
-        index_folded = lms[8].y > lms[6].y
-        return pinky_folded and ring_folded and middle_folded and index_folded
+        pinky_folded = g.tip_minus_pip[PINKY] > -0.02
+        return pinky_folded and g.folded(INDEX, MIDDLE, RING)
 
-    def _verify_i_gesture(self, lms):
+    def _verify_i_gesture(self, g):
         """'I' check: Pinky is strictly extended upwards, others are folded."""
-        pinky_extended = lms[20].y < lms[18].y - 0.02
-        ring_folded = lms[16].y > lms[14].y
-        middle_folded = lms[12].y > lms[10].y
-        index_folded = lms[8].y > lms[6].y
-        return pinky_extended and ring_folded and middle_folded and index_folded
+        pinky_extended = g.tip_minus_pip[PINKY] < -0.02
+        return pinky_extended and g.folded(INDEX, MIDDLE, RING)
 
-    def _verify_m_gesture(self, lms):
+    def _verify_m_gesture(self, g):
         """'M' check: Thumb tip (4) is near the pinky base/MCP (17/18)."""
         # In 'M', the thumb is deep under index, middle, ring.
         # It's usually horizontally near the ring or pinky MCP.
-        dist_to_ring = abs(lms[4].x - lms[13].x)
-        dist_to_pinky = abs(lms[4].x - lms[17].x)
-        return dist_to_ring < 0.05 or dist_to_pinky < 0.05
+        return g.thumb_gap[RING] < 0.05 or g.thumb_gap[PINKY] < 0.05
 
-    def _verify_n_gesture(self, lms):
+    def _verify_n_gesture(self, g):
         """'N' check: Thumb tip (4) is near the middle/ring gap."""
-        dist_to_middle = abs(lms[4].x - lms[9].x)
-        dist_to_ring = abs(lms[4].x - lms[13].x)
-        return dist_to_middle < 0.05 and not self._verify_m_gesture(lms)
+        return g.thumb_gap[MIDDLE] < 0.05 and not self._verify_m_gesture(g)
 
-    def _verify_t_gesture(self, lms):
+    def _verify_t_gesture(self, g):
         """'T' check: Thumb tip (4) is near the index/middle gap."""
-        dist_to_index = abs(lms[4].x - lms[5].x)
-        dist_to_middle = abs(lms[4].x - lms[9].x)
-        return dist_to_index < 0.05 and not (self._verify_m_gesture(lms) or self._verify_n_gesture(lms))
-
-    def _get_hand_rect(self, frame, lms):
-        h, w, _ = frame.shape
-        x_coords = [lm.x * w for lm in lms]
-        y_coords = [lm.y * h for lm in lms]
-        padding = 20
-        x1, x2 = int(min(x_coords) - padding), int(max(x_coords) + padding)
-        y1, y2 = int(min(y_coords) - padding), int(max(y_coords) + padding)
-        return [max(0, x1), max(0, y1), min(w, x2), min(h, y2)]
+        return g.thumb_gap[INDEX] < 0.05 and not (self._verify_m_gesture(g) or self._verify_n_gesture(g))
+
+    def _get_hand_rect(self, frame_size, lms):
+        w, h = frame_size
+        return landmark_bounds(lms, w, h, padding=20)
@@ -0,0 +1,216 @@
+import bisect
+import threading
+import time
+
+# Seconds; covers microsecond model calls up to multi-second LLM round trips
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, values)) + "}"
+
+
+class Histogram:
+    def __init__(self, registry, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = buckets
+        self.series = {} # label values -> [bucket counts..., sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        if self.registry.forward is not None:
+            self.registry.defer(self.name, labels, value)
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 3)
+            series[index] += 1 # Last slot before sum/count is +Inf
+            series[-2] += value
+            series[-1] += 1
+
+    def summary(self):
+        """{label values: (count, mean)} for quick reports outside Prometheus."""
+        with self.lock:
+            return {labels: (series[-1], series[-2] / series[-1]) for labels, series in self.series.items() if series[-1]}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            items = [(labels, list(series)) for labels, series in self.series.items()]
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                label_str = _format_labels(self.label_names + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            label_str = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_str} {series[-2]}")
+            lines.append(f"{self.name}_count{label_str} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, registry, name, help_text, label_names=()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        if self.registry.forward is not None:
+            self.registry.defer(self.name, labels, amount)
+            return
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    # Lets Registry.replay treat counters and histograms alike
+    def observe(self, value, *labels):
+        self.inc(*labels, amount=value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            items = list(self.values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    """
+    Read at scrape time from `read()`, which returns a number or {label value: number},
+    and/or holding the last value passed to `set()` per label (shipped from worker
+    processes like counters are).
+    """
+    def __init__(self, registry, name, help_text, read=None, label_name=None):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.read = read
+        self.label_name = label_name
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def set(self, value, *labels):
+        if self.registry.forward is not None:
+            self.registry.defer(self.name, labels, value)
+            return
+        with self.lock:
+            self.values[labels] = value
+
+    # Lets Registry.replay treat every metric alike
+    def observe(self, value, *labels):
+        self.set(value, *labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self.lock:
+            items = list(self.values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels((self.label_name,) if self.label_name else (), labels)} {value}")
+        if self.read is None:
+            return lines
+        try:
+            value = self.read()
+        except Exception:
+            return lines
+        if isinstance(value, dict):
+            for label, v in value.items():
+                lines.append(f'{self.name}{{{self.label_name}="{label}"}} {v}')
+        else:
+            lines.append(f"{self.name} {value}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        # When set (worker processes), observations are buffered here and shipped
+        # to the parent with each response instead of being aggregated locally.
+        self.forward = None
+
+    def _register(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def histogram(self, name, help_text, label_names=()):
+        return self._register(Histogram(self, name, help_text, label_names))
+
+    def counter(self, name, help_text, label_names=()):
+        return self._register(Counter(self, name, help_text, label_names))
+
+    def gauge(self, name, help_text, read=None, label_name=None):
+        with self.lock:
+            metric = self.metrics[name] = Gauge(self, name, help_text, read, label_name)
+        return metric
+
+    def capture(self):
+        self.forward = []
+
+    def defer(self, name, labels, value):
+        with self.lock:
+            self.forward.append((name, labels, value))
+
+    def drain(self):
+        """Returns and clears the observations buffered since the last drain."""
+        with self.lock:
+            records, self.forward = self.forward, []
+        return records
+
+    def replay(self, records):
+        for name, labels, value in records:
+            metric = self.metrics.get(name)
+            if metric is not None:
+                metric.observe(value, *labels)
+
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram("talkify_stage_seconds", "Time spent in each inference pipeline stage.", ("stage",))
+JOB_SECONDS = REGISTRY.histogram("talkify_background_job_seconds", "Duration of background finalization jobs.", ("job",))
+FRAMES = REGISTRY.counter("talkify_frames_total", "Frames handled, by mode and outcome.", ("mode", "outcome"))
+# Set by MicroBatcher per process ("MainProcess" or a worker's name); absent while batching is off or sign isn't loaded
+BATCH_QUEUE = REGISTRY.gauge("talkify_sign_batch_queue", "Feature vectors waiting for the sign micro-batcher.", label_name="process")
+
+
+class timed:
+    """`with timed("imdecode"):` records the block's duration under that stage."""
+    __slots__ = ("stage", "histogram", "start")
+
+    def __init__(self, stage, histogram=STAGE_SECONDS):
+        self.stage = stage
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, self.stage)
+        return False
+
+
+def timed_job(job, fn):
+    """Wraps a background job target so each run is recorded in JOB_SECONDS."""
+    def run(*args):
+        with timed(job, JOB_SECONDS):
+            return fn(*args)
+    return run
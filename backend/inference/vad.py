@@ -0,0 +1,115 @@
+import collections
+import numpy as np
+from backend.config import VAD_FRAME_MS, VAD_START_MS, VAD_HANGOVER_MS, VAD_PREROLL_MS, VAD_MIN_SPEECH_MS
+from backend.config import VAD_START_SNR_DB, VAD_STOP_SNR_DB, VAD_MIN_ENERGY, VAD_FLOOR_INIT, VAD_FLOOR_RISE_S, VAD_FLOOR_WINDOW_S
+
+
+class VoiceActivityDetector:
+    """
+    Streaming, per-session speech detector over fixed sub-windows of the audio
+    stream (chunks of any size are split into VAD_FRAME_MS frames; leftovers
+    carry over to the next chunk).
+
+    A frame is voiced when its RMS clears both VAD_MIN_ENERGY and the adaptive
+    noise floor by VAD_START_SNR_DB. Speech starts after VAD_START_MS of voiced
+    frames and ends once no frame has cleared the lower stop threshold for
+    `hangover_ms`. The floor follows quiet frames quickly and louder rooms slowly
+    (VAD_FLOOR_RISE_S, ten times slower during speech), and never sits below the
+    quietest frame of the last VAD_FLOOR_WINDOW_S: speech always has dips, so a
+    steady hum that starts mid-segment becomes the floor and ends the segment.
+    """
+    def __init__(self, sr=16000, frame_ms=VAD_FRAME_MS, start_ms=VAD_START_MS, hangover_ms=VAD_HANGOVER_MS,
+                 preroll_ms=VAD_PREROLL_MS, min_speech_ms=VAD_MIN_SPEECH_MS, start_snr_db=VAD_START_SNR_DB,
+                 stop_snr_db=VAD_STOP_SNR_DB, min_energy=VAD_MIN_ENERGY, floor_init=VAD_FLOOR_INIT,
+                 floor_rise_s=VAD_FLOOR_RISE_S, floor_window_s=VAD_FLOOR_WINDOW_S):
+        self.frame_ms = frame_ms
+        self.frame = int(sr * frame_ms / 1000)
+        self.start_frames = max(1, int(round(start_ms / frame_ms)))
+        self.hangover_frames = int(round(hangover_ms / frame_ms))
+        self.min_speech_frames = int(round(min_speech_ms / frame_ms))
+        self.start_ratio = 10 ** (start_snr_db / 20)
+        self.stop_ratio = 10 ** (stop_snr_db / 20)
+        self.min_energy = min_energy
+        self.floor_init = floor_init
+        self.floor_rise = min(1.0, frame_ms / 1000 / floor_rise_s)
+        self.window = collections.deque(maxlen=max(1, int(round(floor_window_s * 1000 / frame_ms))))
+        self.recent = collections.deque(maxlen=int(round(preroll_ms / frame_ms)) + self.start_frames)
+        self.reset()
+
+    def reset(self):
+        self.noise_floor = self.floor_init
+        self.in_speech = False
+        self.voiced_run = 0 # Consecutive voiced frames (onset detection)
+        self.quiet_run = 0 # Consecutive frames under the stop threshold while in speech
+        self.voiced_frames = 0 # Voiced frames ever seen; differences give voiced time per segment
+        self.onset_voiced = 0 # voiced_frames when the current speech run began
+        self.remainder = np.zeros(0, dtype=np.float32)
+        self.recent.clear()
+        self.window.clear()
+
+    def process(self, samples):
+        """Feeds one chunk; returns its RMS (for level meters). Read in_speech afterwards."""
+        samples = np.asarray(samples, dtype=np.float32)
+        if len(samples) == 0:
+            return 0.0
+        energy = float(np.sqrt(np.mean(samples ** 2)))
+        if len(self.remainder):
+            samples = np.concatenate([self.remainder, samples])
+        n = len(samples) // self.frame
+        self.remainder = samples[n * self.frame:]
+        if n == 0:
+            return energy
+        frames = samples[:n * self.frame].reshape(n, self.frame)
+        for frame, rms in zip(frames, np.sqrt(np.mean(frames ** 2, axis=1))):
+            self._update(frame, float(rms))
+        return energy
+
+    def _update(self, frame, rms):
+        self.recent.append(frame)
+        start_threshold = max(self.min_energy, self.noise_floor * self.start_ratio)
+        stop_threshold = max(self.min_energy, self.noise_floor * self.stop_ratio)
+        voiced = rms > start_threshold
+
+        if voiced:
+            self.voiced_frames += 1
+            self.voiced_run += 1
+        else:
+            self.voiced_run = 0
+
+        if not self.in_speech:
+            if self.voiced_run >= self.start_frames:
+                self.in_speech, self.quiet_run = True, 0
+                self.onset_voiced = self.voiced_frames - self.voiced_run
+        elif rms > stop_threshold:
+            self.quiet_run = 0
+        else:
+            self.quiet_run += 1
+            if self.quiet_run > self.hangover_frames:
+                self.in_speech = False
+
+        # Quiet frames pull the floor down fast; louder ones raise it slowly
+        rate = 0.2 if rms < self.noise_floor else self.floor_rise * (0.1 if self.in_speech else 1.0)
+        self.noise_floor = max(1e-5, self.noise_floor + rate * (rms - self.noise_floor))
+        self.window.append(rms)
+        if len(self.window) == self.window.maxlen:
+            self.noise_floor = max(self.noise_floor, min(self.window))
+
+    def preroll_audio(self, skip_tail=0):
+        """
+        The last VAD_PREROLL_MS (plus the onset) of audio, including the unframed
+        tail; `skip_tail` drops that many of the newest samples (e.g. the chunk
+        the caller is about to append itself).
+        """
+        frames = list(self.recent)
+        if len(self.remainder):
+            frames.append(self.remainder)
+        audio = np.concatenate(frames) if frames else np.zeros(0, dtype=np.float32)
+        return audio[:len(audio) - skip_tail] if skip_tail else audio
+
+    def voiced_ms(self, since):
+        """Voiced audio (ms) since the `voiced_frames` value `since`."""
+        return (self.voiced_frames - since) * self.frame_ms
+
+    def is_phantom(self, since):
+        """True when a segment starting at `since` holds too little voiced audio to be speech."""
+        return self.voiced_frames - since < self.min_speech_frames
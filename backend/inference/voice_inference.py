@@ -1,41 +1,88 @@
 import cv2
 import numpy as np
-import os
 import threading
 import collections
+import copy
 import time 
-import tensorflow as tf
-import soundfile as sf 
-import tempfile 
-from backend.config import VOICENET_MODEL_PATH, VOICENET_CLASSES, VOICENET_SEQUENCE_LENGTH
-from backend.voice_tracking.mediapipe_face import FaceTracker
+from backend.config import VOICENET_MODEL_PATH, VOICENET_CLASSES, VOICENET_SEQUENCE_LENGTH, VOICENET_SEGMENT_MAX_FRAMES, CORRECTION_QUEUE_SIZE
+from backend.config import VOICENET_PARTIAL_STRIDE, VOICENET_PARTIAL_MIN_FRAMES, VOICENET_PARTIAL_REUSE_FRAMES
+from backend.config import TARGET_PHRASES, CTC_BEAM_WIDTH, VOICENET_PHRASE_CONFIDENCE
+from backend.voice_tracking.face_service import face_service
+from backend.preprocessing.landmark_array import landmark_bounds
 from backend.models.voicenet_arch import get_voicenet_model
 from backend.inference.nlp_manager import LLMProcessor
-from backend.inference.audio_processor import AudioProcessor
+from backend.inference.audio_processor import StreamingMFCC
+from backend.inference.telemetry import timed
+from backend.inference.finalize_pool import finalize_pool
+from backend.inference.ctc_decoder import CTCDecoder
+from backend.inference.phrase_matcher import phrase_matcher
+from backend.inference.llm_cache import audio_fingerprint
+from backend.inference.vad import VoiceActivityDetector
+
+MOUTH_CROP_SHAPE = (50, 100, 3) # VoiceNet frame: height, width, RGB
+
+# --- HELPER CLASSES ---
+
+class MouthFrameRing:
+    """
+    Fixed window of the last VOICENET_SEQUENCE_LENGTH uint8 mouth crops.
+    Crops are written straight into their slot; once full, the oldest is overwritten.
+    """
+    def __init__(self, length=VOICENET_SEQUENCE_LENGTH):
+        self.frames = np.zeros((length,) + MOUTH_CROP_SHAPE, dtype=np.uint8)
+        self.count = 0 # Frames written this segment (can exceed the window length)
+
+    def __len__(self):
+        return min(self.count, len(self.frames))
+
+    def next_slot(self):
+        slot = self.frames[self.count % len(self.frames)]
+        self.count += 1
+        return slot
+
+    def clear(self):
+        self.count = 0
+
+    def snapshot(self):
+        """Time-ordered copy of the window, left-padded with its first frame to full length."""
+        length, n = len(self.frames), len(self)
+        order = np.arange(self.count - n, self.count) % length
+        order = np.concatenate([np.full(length - n, order[0]), order])
+        return self.frames[order]
+
+_model_inputs = threading.local()
+
+def standardize_window(window):
+    """
+    (T, 50, 100, 3) uint8 -> (1, T, 50, 100, 3) float32, each frame scaled to [0, 1]
+    and standardized by its own mean/std. Written into a tensor reused per thread,
+    so the result is only valid until the next call on the same thread.
+    """
+    tensor = getattr(_model_inputs, "tensor", None)
+    if tensor is None or tensor.shape[1:] != window.shape:
+        tensor = _model_inputs.tensor = np.empty((1,) + window.shape, dtype=np.float32)
+    x = tensor[0]
+    np.multiply(window, np.float32(1.0 / 255.0), out=x)
+    mean = x.mean(axis=(1, 2, 3), keepdims=True)
+    std = x.std(axis=(1, 2, 3), keepdims=True)
+    std[std == 0] = 1 # Blank crops
+    x -= mean
+    x /= std
+    return tensor
+
+# --- MAIN INFERENCE CLASS ---
 
 class LipInference:
-    def __init__(self):
+    def __init__(self, clock=time.time):
+        """clock: time source for the finalize throttle (injectable for replay benchmarks)."""
         print("LipInference: Initializing...")
-        self.face_tracker = FaceTracker()
-        self.standardize = lambda x: (x - np.mean(x)) / np.std(x)
-        self.is_recording = False
-        self.buffer = []
-        self.audio_buffer = [] # Buffer for multimodal fusion
-        self.audio_processor = AudioProcessor()
+        self.clock = clock
         self.llm_processor = LLMProcessor()
         
         self.mouth_open_threshold = 0.08 # Lowered drastically from 0.20 to make it responsive
-        self.silence_counter = 0
-        self.last_prediction = ""
-        self.pred_throttle = 0
-        self.current_energy = 0
-        
-        # Async LLM handling
-        self.pending_corrections = collections.deque()
-        self.correction_lock = threading.Lock()
-        
-        # Performance tuning
-        self.last_final_time = 0
+        self.decoder = CTCDecoder(VOICENET_CLASSES, TARGET_PHRASES, beam_width=CTC_BEAM_WIDTH)
+        self.matcher = phrase_matcher
+        self._init_state(face_service.acquire())
 
         # Load VoiceNet model
         try:
@@ -51,285 +98,271 @@ class LipInference:
             self.model = None
             print(f"Error loading VoiceNet: {e}.")
 
-    def get_mouth_crop(self, image_rgb, landmarks, padding=12):
-        h, w = image_rgb.shape[:2]
-        xs = [int(lm.x * w) for lm in landmarks]
-        ys = [int(lm.y * w) for lm in landmarks] # Note: y is relative to width in some mediapipe versions, but usually height
-        # Re-calc ys to use height correctly
-        ys = [int(lm.y * h) for lm in landmarks]
+    def _init_state(self, face):
+        """Per-session recording state, buffers and result queue."""
+        self.face = face # FaceSession, shared with the audio engine for the same session id
+        self.is_recording = False
+        self.mouth_frames = MouthFrameRing() # Raw uint8 crops; standardized only at finalize
+        self.audio_buffer = [] # Buffer for multimodal fusion
+        self.silence_counter = 0
+        # No hangover: silence_counter below already waits out pauses for the combined mouth/audio signal
+        self.vad = VoiceActivityDetector(hangover_ms=0)
+        self.segment_voiced = 0 # vad.voiced_frames when the current recording began
+        self.audio_features = StreamingMFCC(sr=16000) # Only the frames each chunk completes are computed
+        self.segment_audio_frame = 0 # audio_features.count at the start of the current recording (pre-roll included)
+        self.last_prediction = ""
+        self.pred_throttle = 0
+        self.segment = 0 # Bumped per recording so late partials from an old segment are ignored
+        self.partial = None # (frames recorded, decoded) of the latest partial, see _decode_window
+        self.partial_lock = threading.Lock() # segment / partial / last_prediction vs. _apply_partial
+        self.current_energy = 0
+        
+        # Async LLM handling
+        self.pending_corrections = collections.deque(maxlen=CORRECTION_QUEUE_SIZE) # Oldest dropped if never collected
+        self.correction_lock = threading.Lock()
+        self.correction_listener = None # Called from worker threads when a result is queued
         
-        x1, y1 = max(0, min(xs) - padding), max(0, min(ys) - padding)
-        x2, y2 = min(w, max(xs) + padding), min(h, max(ys) + padding)
+        # Performance tuning
+        self.last_final_time = 0
+
+    def new_session(self, face):
+        """Returns an engine sharing this one's models but with its own recording state."""
+        session = copy.copy(self)
+        session._init_state(face)
+        return session
+
+    def release(self):
+        """Detaches and returns the face session so it can go back to the service."""
+        face, self.face = self.face, None
+        return face
+
+    def memory_usage(self):
+        """Approximate bytes held by this session's buffers."""
+        return self.mouth_frames.frames.nbytes + sum(a.nbytes for a in self.audio_buffer) + self.audio_features.nbytes()
+
+    def segment_audio_levels(self):
+        """(Time,) frame levels in dB of the current recording, read from the stream's MFCC ring."""
+        return self.audio_features.levels(since=self.segment_audio_frame)
+
+    def warmup(self):
+        """Traces the VoiceNet graph and builds the FaceMesh graph before the first client arrives."""
+        if self.face is not None:
+            self.face.warmup(np.zeros((240, 320, 3), dtype=np.uint8))
+        if self.model is not None:
+            self.model.predict(np.zeros((1, VOICENET_SEQUENCE_LENGTH, 50, 100, 3), dtype=np.float32), verbose=0)
+
+    def get_mouth_crop(self, frame, lips, out, padding=12):
+        """Writes the 100x50 RGB mouth crop of a BGR frame into `out` (a ring slot)."""
+        h, w = frame.shape[:2]
+        x1, y1, x2, y2 = landmark_bounds(lips, w, h, padding)
         
-        crop = image_rgb[y1:y2, x1:x2]
-        if crop.size == 0: return np.zeros((50, 100, 3), dtype='uint8')
-        return cv2.resize(crop, (100, 50))
+        crop = frame[y1:y2, x1:x2]
+        if crop.size == 0:
+            out[...] = 0
+            return out
+        return cv2.cvtColor(cv2.resize(crop, (100, 50)), cv2.COLOR_BGR2RGB, dst=out)
+
+    def _decode_window(self, window):
+        """
+        VoiceNet over a (T, 50, 100, 3) uint8 window. Returns (raw greedy text,
+        best vocabulary phrase, its confidence) from the constrained beam search.
+        """
+        with timed("voicenet_standardize"):
+            model_input = standardize_window(window)
+        with timed("voicenet_model"):
+            y_pred = self.model.predict(model_input, verbose=0)
+        with timed("ctc_decode"):
+            # Only compared against the threshold, so clear misses skip the unconstrained search
+            phrase, confidence, _ = self.decoder.decode_phrase(y_pred[0], min_confidence=VOICENET_PHRASE_CONFIDENCE)
+            return self.ctc_decode(y_pred), phrase, confidence
+
+    def _partial_job(self, window, segment, count):
+        return segment, count, self._decode_window(window)
+
+    def _apply_partial(self, segment, count, decoded):
+        raw_text, phrase, confidence = decoded
+        display = phrase if confidence >= VOICENET_PHRASE_CONFIDENCE else self.smart_correct(raw_text, is_final=False)
+        with self.partial_lock:
+            if segment != self.segment:
+                return
+            self.partial = (count, decoded)
+            self.last_prediction = display
 
     def ctc_decode(self, y_pred):
-        input_len = np.ones(y_pred.shape[0]) * y_pred.shape[1]
-        decode, _ = tf.keras.backend.ctc_decode(y_pred, input_length=input_len, greedy=True)
-        tokens = decode[0][0].numpy()
-        
-        chars = []
-        for t in tokens:
-            if 0 <= t < len(VOICENET_CLASSES):
-                chars.append(VOICENET_CLASSES[t])
-        return "".join(chars)
+        """Greedy CTC text for the first item of a (batch, T, classes + blank) prediction."""
+        return self.decoder.greedy(y_pred[0])
 
     def smart_correct(self, raw_text, is_final=True):
-        raw = raw_text.replace(" ", "").upper()
-        if not raw: return ""
-        
-        # STRIC TARGET DICTIONARY (Whitelist)
-        # STRIC TARGET DICTIONARY (Whitelist)
-        PHRASES = {
-            "HELLO": ["HELLO", "HALLO"],
-            "HI": ["HI"],
-            "GOOD MORNING": ["GOOD MORNING"],
-            "HOW ARE YOU": ["HOW ARE YOU"],
-            "WHAT IS YOUR NAME": ["WHAT IS YOUR NAME"],
-            "MY NAME IS": ["MY NAME IS"],
-            "THANK YOU": ["THANK YOU", "THANKS"],
-            "WELCOME": ["WELCOME"],
-            "YES": ["YES", "YEA", "YEP"],
-            "NO": ["NO", "NAH"],
-            "RAYYAN": ["RAYYAN"],
-            "ANGEL": ["ANGEL"],
-            "ARDRA": ["ARDRA"],
-            "NITHYA": ["NITHYA"],
-            "SUJITHRA": ["SUJITHRA"],
-            "RENJINI": ["RENJINI"]
-        }
-        
-        if is_final:
-            consonants = "BCDFGHJKLMNPQRSTVWXYZ"
-            vowels = "AEIOUY"
-            consonant_count = sum(1 for char in raw if char in consonants)
-            vowel_count = sum(1 for char in raw if char in vowels)
-            
-            # 1. Unified Dictionary Match (Equal Priority)
-            # Find the best match across ALL phrases without favoring greetings.
-            best_match = None
-            
-            # Check for exact matches across all items and variants
-            # We sort by length (descending) to favor longer phrase matches if they overlap
-            sorted_phrases = sorted(PHRASES.items(), key=lambda x: len(x[0]), reverse=True)
-            for correct, variants in sorted_phrases:
-                # Direct match
-                if raw == correct.replace(" ", ""): 
-                    best_match = correct
-                    break
-                # Variant match
-                for v in variants:
-                    if raw == v.replace(" ", ""):
-                        best_match = correct
-                        break
-                if best_match: break
-
-            if best_match:
-                # MATCH VALIDATION: 
-                # Allow a slightly larger gap (6 chars) to account for garbled phonetics in long phrases.
-                raw_len = len(raw)
-                match_len = len(best_match.replace(" ", ""))
-                if abs(raw_len - match_len) > 6: # Relaxed strictness to catch garbled words
-                    print(f"DEBUG: Rejecting '{best_match}' - gap too large ({raw_len} vs {match_len})")
-                    return self._clean_stutter(raw) # Pass-through literal if match is poor
-                
-                return best_match
-
-            # 1.5 Fuzzy Dictionary Match (For heavily garbled input)
-            # If the raw text is mostly gibberish but contains fragments of known words (e.g. "AIHALOON" -> "HELLO")
-            for correct, variants in sorted_phrases:
-                # Prevent picking up "NO" or "HI" randomly inside long garbled strings like "SLAIAIhxNOanow"
-                if len(correct.replace(" ", "")) > 3:
-                    # Basic substring check
-                    if correct.replace(" ", "") in raw:
-                        print(f"DEBUG: Fuzzy Substring Match: Recovered '{correct}' from '{raw}'")
-                        return correct
-                    for v in variants:
-                        if len(v.replace(" ", "")) > 3 and v.replace(" ", "") in raw:
-                             print(f"DEBUG: Fuzzy Variant Match: Recovered '{correct}' from '{raw}'")
-                             return correct
-
-            # 2. Strict Noise Clusters & Stutter Collapse
-            raw = self._clean_stutter(raw)
-            GIBBERISH_CLUSTERS = ["EBEB", "BUEB", "DEDBD", "QVLEB", "BTEN", "BUTEW", "WIAA", "AAAA", "SLA", "SLN", "AIAI", "NANA", "LALA"]
-            if any(cluster in raw for cluster in GIBBERISH_CLUSTERS) or len(raw) > 15:
-                print(f"DEBUG: Killing Gibberish Raw: '{raw}'")
-                return ""
-            
-            # If no perfect dictionary match, return the garbled string so the LLM can use the AUDIO to decipher it!
-            # The final Target Dictionary constraint is enforced in the LLM post-processing step.
-            return raw 
-
-        # Intermediate results: Only EXACT phrase matches or raw text
-        for correct, _ in PHRASES.items():
-            if raw == correct.replace(" ", ""): return correct
-        return self._clean_stutter(raw_text) 
-
-    def _clean_stutter(self, text):
-        """Collapses repeating phonetic clusters to stop 'LAYRAIANNANNA'"""
-        import re
-        # Collapse repeating characters (3 or more) -> 1
-        text = re.sub(r'(.)\1{2,}', r'\1', text.upper())
-        # Collapse repeating syllables (2 or more) -> 1 (e.g. NANANANA -> NA)
-        text = re.sub(r'(.{2,4})\1+', r'\1', text)
-        return text
-
-    def _get_mouth_distance(self, lms):
-        up, down = lms[13], lms[14]
-        left, right = lms[61], lms[291]
-        vertical_dist = abs(up.y - down.y)
-        horizontal_dist = abs(left.x - right.x)
-        if horizontal_dist == 0: return 0
-        return vertical_dist / horizontal_dist
-
-    def predict(self, frame, audio_bytes=None):
-        image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # 0. Check for background results to relay to frontend
+        """Snaps lip-reading text onto the phrase vocabulary (see PhraseMatcher.correct)."""
+        return self.matcher.correct(raw_text, is_final)
+
+    def _push_correction(self, raw_text, polished):
+        with self.correction_lock:
+            self.pending_corrections.append((self.clock(), raw_text, polished))
+        if self.correction_listener:
+            self.correction_listener()
+
+    def pop_correction(self):
+        """Returns the oldest finished background result, or None."""
         with self.correction_lock:
             if self.pending_corrections:
-                _, orig, polished = self.pending_corrections.popleft()
-                print(f"DEBUG: Relaying background correction: '{orig}' -> '{polished}'")
-                return polished, "Polished Result", [], {"visual_confidence": 1.0, "audio_confidence": 1.0, "is_hybrid": True}, True
+                return self.pending_corrections.popleft()
+        return None
+
+    def format_correction(self, correction, lms_display=None, visual_conf=1.0):
+        """Builds the predict() style response for a finished background result."""
+        _, orig, polished = correction
+        print(f"DEBUG: Relaying background correction: '{orig}' -> '{polished}'")
+        return polished, "Polished Result", lms_display or [], {"visual_confidence": visual_conf, "audio_confidence": 1.0, "is_hybrid": True}, True
+
+    def next_correction(self):
+        """pop_correction() + format_correction(), or None when nothing is queued."""
+        correction = self.pop_correction()
+        return self.format_correction(correction) if correction else None
+
+    def predict(self, frame, audio_bytes=None, frame_key=None):
+        # 0. Check for background results to relay to frontend
+        correction = self.pop_correction()
+        if correction:
+            return self.format_correction(correction)
 
         is_audio_active = False
         energy = 0
+        audio_data = None
         if audio_bytes is not None and len(audio_bytes) > 0:
             try:
                 audio_data = np.frombuffer(audio_bytes, dtype=np.float32)
-                energy = np.sqrt(np.mean(audio_data**2)) if len(audio_data) > 0 else 0
+                energy = self.vad.process(audio_data)
                 
-                # ABSOLUTE SILENCE GATE
-                # If energy is below 0.015, we consider it pure background noise (no speech)
-                is_audio_active = energy > 0.015
+                # Adaptive silence gate: voiced relative to this session's noise floor
+                is_audio_active = self.vad.in_speech
                 self.current_energy = energy
-                if is_audio_active: print(f"DEBUG: Audio Activity Detected! Energy: {energy:.4f}")
-                self.current_audio_features = self.audio_processor.extract_features(audio_data, sr=16000)
+                if is_audio_active: print(f"DEBUG: Audio Activity Detected! Energy: {energy:.4f} (floor {self.vad.noise_floor:.4f})")
+                with timed("audio_features"):
+                    self.audio_features.push(audio_data)
             except Exception as e:
                 print(f"DEBUG: Audio processing error: {e}")
                 pass
 
         noise_level = min(1.0, energy / 0.05) if energy > 0 else 0
 
-        mp_results = self.face_tracker.process(image_rgb)
-        if not mp_results.multi_face_landmarks or self.model is None:
-            self.buffer = []; self.is_recording = False; self.silence_counter = 0
+        face = self.face.track(frame, frame_key) # Cached if the audio engine already tracked this frame
+        if face is None or self.model is None:
+            self.mouth_frames.clear(); self.is_recording = False; self.silence_counter = 0
             msg = "VoiceNet Model Missing" if self.model is None else "Finding Face..."
             return "", msg, [], {"visual_confidence": 0, "audio_confidence": 0, "noise_level": noise_level, "is_hybrid": False}, False
 
-        LIPS = [61, 146, 91, 181, 84, 17, 314, 405, 321, 375, 291, 308, 324, 318, 402, 317, 14, 87, 178, 88, 95]
-        all_lms = mp_results.multi_face_landmarks[0].landmark
-        lms_raw = [all_lms[i] for i in LIPS]
-        lms_display = [{'x': lm.x, 'y': lm.y, 'z': lm.z} for lm in lms_raw]
+        lips = face.lips
+        lms_display = face.landmarks
 
-        mouth_dist = self._get_mouth_distance(all_lms)
+        mouth_dist = face.open_ratio
         is_speaking = (mouth_dist > self.mouth_open_threshold) or is_audio_active
         
         if not self.is_recording:
             if is_speaking:
-                self.is_recording = True; self.buffer = []; self.audio_buffer = []; self.silence_counter = 0
+                self.is_recording = True; self.mouth_frames.clear(); self.silence_counter = 0
+                with self.partial_lock:
+                    self.segment += 1; self.partial = None
+                # Audio from just before the onset (this chunk is appended below)
+                self.audio_buffer = [self.vad.preroll_audio(skip_tail=len(audio_data))] if audio_data is not None else []
+                self.segment_voiced = self.vad.onset_voiced if self.vad.in_speech else self.vad.voiced_frames
+                preroll = sum(len(a) for a in self.audio_buffer) + (len(audio_data) if audio_data is not None else 0)
+                self.segment_audio_frame = max(0, self.audio_features.count - preroll // self.audio_features.hop)
             else:
                 return "", "WAITING FOR SPEECH...", lms_display, {"visual_confidence": min(1.0, mouth_dist/0.15), "audio_confidence": min(1.0, energy/0.05) if audio_bytes else 0, "noise_level": noise_level, "is_hybrid": False}, False
 
-        mouth_crop = self.get_mouth_crop(image_rgb, lms_raw)
-        standardized = self.standardize(mouth_crop.astype('float32') / 255.0)
-        self.buffer.append(standardized)
-        if audio_bytes is not None:
-            self.audio_buffer.append(np.frombuffer(audio_bytes, dtype=np.float32))
-
-        if len(self.buffer) > VOICENET_SEQUENCE_LENGTH: self.buffer.pop(0)
+        with timed("mouth_crop"):
+            self.get_mouth_crop(frame, lips, out=self.mouth_frames.next_slot())
+        if audio_data is not None:
+            self.audio_buffer.append(audio_data)
         
         if not is_speaking: self.silence_counter += 1
         else: self.silence_counter = 0
 
-        # ... (intermediate prediction logic stays the same) ...
+        # Live partial: decode the sliding window every VOICENET_PARTIAL_STRIDE frames.
+        # Partials have their own lane, so a previous segment's finalize (LLM call)
+        # doesn't hold them back; skipped while the previous partial is still running.
+        count = self.mouth_frames.count
+        if VOICENET_PARTIAL_STRIDE and count >= VOICENET_PARTIAL_MIN_FRAMES and count % VOICENET_PARTIAL_STRIDE == 0:
+            finalize_pool.submit((self, "lip_partial"), "lip_partial", self._partial_job,
+                                 (self.mouth_frames.snapshot(), self.segment, count), self._apply_partial, if_idle=True)
 
         # STOP Recording (Requirement: At least 15 frames of intentional speech)
-        if (self.silence_counter > 8 or len(self.buffer) > 200) and (time.time() - self.last_final_time > 0.4): 
-            self.last_final_time = time.time()
-            if len(self.buffer) > 15: # Raised from 10 to block ghost transients
-                # Capture current state for processing
-                capture_buffer = list(self.buffer)
+        if (self.silence_counter > 8 or self.mouth_frames.count > VOICENET_SEGMENT_MAX_FRAMES) and (self.clock() - self.last_final_time > 0.4): 
+            self.last_final_time = self.clock()
+            # Audio present but hardly any of it voiced: a phantom trigger, not worth a VoiceNet pass
+            phantom = bool(self.audio_buffer) and self.vad.is_phantom(self.segment_voiced)
+            if phantom:
+                print(f"DEBUG: Killing segment - Phantom Trigger ({self.vad.voiced_ms(self.segment_voiced)} ms voiced)")
+            if len(self.mouth_frames) > 15 and not phantom: # Raised from 10 to block ghost transients
+                # Capture current state for processing (padded, time-ordered uint8 window)
+                capture_frames = self.mouth_frames.snapshot()
+                # The latest completed partial is the final decode when little but trailing silence came after it
+                with self.partial_lock:
+                    partial = self.partial
+                    self.segment += 1; self.partial = None
+                late_speech = self.mouth_frames.count - partial[0] - self.silence_counter if partial else None
+                capture_decoded = partial[1] if partial and late_speech <= VOICENET_PARTIAL_REUSE_FRAMES else None
                 capture_audio = list(self.audio_buffer)
+                # The LLM cache fingerprint comes from features already computed per chunk
+                capture_levels = self.segment_audio_levels() if capture_audio else None
                 
                 # Capture current prediction to keep it visible
                 processing_display = self.last_prediction or "..."
                 
                 # RESET IMMEDIATELY (Double Buffering)
                 self.is_recording = False
-                self.buffer = []
+                self.mouth_frames.clear()
                 self.audio_buffer = []
                 self.silence_counter = 0
                 self.last_prediction = ""
 
                 # Define processing logic
-                def process_capture(padded_list, audio_list):
-                    # ... (logic same as before, but ensure it pushes to pending_corrections)
+                def process_capture(window, audio_list, levels, decoded):
+                    # Returns (raw, polished) for pending_corrections, or None to drop the segment
                     try:
-                        if len(padded_list) < VOICENET_SEQUENCE_LENGTH:
-                            padded = [padded_list[0]] * (VOICENET_SEQUENCE_LENGTH - len(padded_list)) + padded_list
-                        else: padded = padded_list[-VOICENET_SEQUENCE_LENGTH:]
-                        
-                        y_pred = self.model.predict(np.expand_dims(np.array(padded), axis=0), verbose=0)
-                        raw_text = self.ctc_decode(y_pred)
-                        final_raw = self.smart_correct(raw_text, is_final=True).upper()
+                        if decoded is None:
+                            decoded = self._decode_window(window)
+                        raw_text, phrase, confidence = decoded
+                        if confidence >= VOICENET_PHRASE_CONFIDENCE:
+                            # The lexicon-constrained beam is confident: takes the target bypass below
+                            print(f"DEBUG: Beam phrase '{phrase}' ({confidence:.2f}) for raw '{raw_text}'")
+                            final_raw = phrase
+                        else:
+                            final_raw = self.smart_correct(raw_text, is_final=True).upper()
                         
                         if final_raw and self.llm_processor:
                             audio_flat = np.concatenate(audio_list) if audio_list else None
-                            
-                            # DEEP NOISE GATE: Check average volume over the WHOLE segment
-                            if audio_flat is not None:
-                                mean_energy = np.sqrt(np.mean(audio_flat**2))
-                                if mean_energy < 0.010: # Minimum energy required to parse segment at all
-                                    print(f"DEBUG: Killing segment - Phantom Trigger (Mean Energy: {mean_energy:.4f})")
-                                    return
 
                             # TARGET DICTIONARY BYPASS
                             raw_words = final_raw.split()
-                            TARGET_LIST = [
-                                "HELLO", "HI", "GOOD MORNING", "HOW ARE YOU", "WHAT IS YOUR NAME", "MY NAME IS", 
-                                "THANK YOU", "WELCOME", "YES", "NO", "RAYYAN", "ANGEL", 
-                                "ARDRA", "NITHYA", "SUJITHRA", "RENJINI"
-                            ]
-                            
-                            is_target_word = any(b == final_raw for b in TARGET_LIST)
+                            is_target_word = self.matcher.is_phrase(final_raw)
                             
                             if is_target_word:
                                 print(f"DEBUG: Target Bypass Triggered for '{final_raw}'. Skipping LLM context.")
                                 polished = final_raw
                             else:
-                                audio_path = None
-                                if audio_flat is not None:
-                                    tmp = os.path.join(tempfile.gettempdir(), f"bg_{time.time()}.wav")
-                                    sf.write(tmp, audio_flat, 16000)
-                                    audio_path = tmp
-                                
-                                # LLM Correction
-                                polished = self.llm_processor.correct_sentence(final_raw, audio_path)
+                                # LLM Correction (audio is sent inline, straight from memory)
+                                with timed("llm_correction"):
+                                    polished = self.llm_processor.correct_sentence(final_raw, audio_flat, audio_fingerprint(levels, self.audio_features.hop / 16000))
                                 
                                 # STRICT WHITELIST ENFORCEMENT
-                                if polished not in TARGET_LIST:
+                                if not self.matcher.is_phrase(polished):
                                     print(f"DEBUG: LLM returned non-targeted phrase ('{polished}'). Killing output.")
                                     polished = ""
-                                    
-                                if audio_path and os.path.exists(audio_path): os.remove(audio_path)
 
-                            with self.correction_lock:
-                                self.pending_corrections.append((time.time(), final_raw, polished))
+                            return final_raw, polished
                         elif final_raw:
-                             with self.correction_lock:
-                                self.pending_corrections.append((time.time(), final_raw, final_raw))
+                            return final_raw, final_raw
                     except Exception as e:
                         print(f"Error in background processing: {e}")
 
-                threading.Thread(target=process_capture, args=(capture_buffer, capture_audio), daemon=True).start()
+                finalize_pool.submit(self, "lip_finalize", process_capture, (capture_frames, capture_audio, capture_levels, capture_decoded), self._push_correction)
                 
                 return processing_display, "Processing...", lms_display, {"visual_confidence": 0.5, "audio_confidence": 0.5, "noise_level": noise_level, "is_hybrid": False}, False
 
             # Reset if buffer was too small
-            self.is_recording = False; self.buffer = []; self.audio_buffer = []; self.silence_counter = 0
+            self.is_recording = False; self.mouth_frames.clear(); self.audio_buffer = []; self.silence_counter = 0
             return "", "Waiting for speech...", lms_display, {"visual_confidence": 0, "audio_confidence": 0, "noise_level": noise_level, "is_hybrid": False}, False
 
         status_msg = "LISTENING" if self.is_recording else "READY"
@@ -1,6 +1,9 @@
-from fastapi import FastAPI, File, UploadFile, Form
+from fastapi import FastAPI, File, UploadFile, Form, WebSocket, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+import asyncio
 import time
 import os
+import uuid
 os.environ['CUDA_VISIBLE_DEVICES'] = '-1' 
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3' # Silence all TF logs except errors
 os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0' # Disable oneDNN to avoid potential threading conflicts
@@ -9,24 +12,25 @@ from dotenv import load_dotenv
 # Load environment variables (like GEMINI_API_KEY)
 load_dotenv()
 from fastapi.middleware.cors import CORSMiddleware
-import tensorflow as tf
-# Ensure TensorFlow only uses CPU to avoid CUDA-related Access Violations (0xC0000005)
-tf.config.set_visible_devices([], 'GPU')
 import uvicorn
-import cv2
-import numpy as np
-import io
-from PIL import Image
-from backend.inference.sign_inference import SignInference
-from backend.inference.audio_inference import AudioInference
+# TensorFlow, MediaPipe and speech_recognition are imported by the engines that need
+# them, when their mode loads. CUDA_VISIBLE_DEVICES above keeps TensorFlow on CPU.
+from backend.config import DEFAULT_SESSION_ID, SIGN_DECODE_MAX_DIM, CORRECTION_POLL_INTERVAL, CORRECTION_RETRY_DELAY, ENGINE_LOADING_POLL_INTERVAL
+from backend.preprocessing.frame_processor import decode_frame
+from backend.preprocessing.landmark_array import parse_hand_landmarks, decode_hand_packet
+from backend.inference.engine_registry import engines, EngineNotReady
+from backend.inference.dispatcher import InferenceDispatcher, DispatcherBusy
+from backend.inference.finalize_pool import finalize_pool
+from backend.inference.llm_client import llm_client
+from backend.inference.capture_controller import CaptureControllerTable
+from backend.inference.telemetry import REGISTRY, STAGE_SECONDS, FRAMES, timed
 
-print("Main: Initializing Sign Engine...")
-sign_engine = SignInference()
-print("Main: Sign Engine Initialized.")
+dispatcher = InferenceDispatcher()
+capture_controllers = CaptureControllerTable()
 
-print("Main: Initializing Audio Engine...")
-audio_engine = AudioInference()
-print("Main: Audio Engine Initialized.")
+REGISTRY.gauge("talkify_dispatcher_pending", "Inference calls queued or running on the dispatcher.", lambda: dispatcher.pending)
+REGISTRY.gauge("talkify_active_sessions", "Live sessions per mode.",
+               lambda: {mode: len(sessions) for mode, sessions in engines.loaded().items()}, label_name="mode")
 
 print("Main: Defining FastAPI App...")
 app = FastAPI()
@@ -36,6 +40,32 @@ print("Main: FastAPI App Defined.")
 async def root():
     return {"status": "Backend is running with CORS enabled"}
 
+@app.on_event("startup")
+def load_engines():
+    # Loads (and warms up) every enabled mode in the background; /ready reports progress
+    engines.start()
+
+@app.get("/ready")
+async def ready():
+    """Per-engine load state; 503 until every enabled mode is ready."""
+    content = {"ready": engines.ready(), "engines": engines.status()}
+    return JSONResponse(status_code=200 if content["ready"] else 503, content=content)
+
+@app.get("/metrics")
+async def metrics():
+    """Per-stage latency histograms, frame counters and queue gauges in Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats")
+async def stats():
+    loaded = engines.loaded()
+    sign_sessions = loaded.get("sign")
+    return {
+        "sign_batching": sign_sessions.engine.batcher.stats() if getattr(sign_sessions, "engine", None) and sign_sessions.engine.batcher else None,
+        "sessions": {mode: len(sessions) for mode, sessions in loaded.items()},
+        "dispatcher": dispatcher.stats()
+    }
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -44,14 +74,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.post("/predict/sign")
-async def predict_sign(file: UploadFile = File(...)):
-    contents = await file.read()
-    nparr = np.frombuffer(contents, np.uint8)
-    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    
-    text, status, landmarks, hand_rect = sign_engine.predict(frame)
-    
+# Binary message kinds for the /ws/{mode} stream (first byte of every message)
+FRAME_MESSAGE = 0x01  # JPEG-encoded camera frame
+AUDIO_MESSAGE = 0x02  # Raw float32 PCM @ 16kHz, attached to the next frame
+LANDMARKS_MESSAGE = 0x03  # Client-tracked hand packet (see decode_hand_packet), sign mode only
+
+# run_sign / run_voice block (decode + tracking + model) and are only called through the dispatcher.
+# Face engines get the encoded frame's hash as its key, so voice and lip streams of one session
+# sending the same frame share one FaceMesh pass.
+
+def run_sign(session_id, contents):
+    with timed("imdecode"):
+        frame, scale = decode_frame(contents, max_dim=SIGN_DECODE_MAX_DIM)
+    with engines.sessions("sign").use(session_id) as session:
+        text, status, landmarks, hand_rect = session.predict(frame, scale)
     return {
         "text": text,
         "status": status,
@@ -59,17 +95,22 @@ async def predict_sign(file: UploadFile = File(...)):
         "hand_rect": hand_rect
     }
 
+def run_sign_landmarks(session_id, points, hand_label, frame_size=None):
+    with engines.sessions("sign").use(session_id) as session:
+        text, status, landmarks, hand_rect = session.predict_landmarks(points, hand_label, frame_size)
+    return {
+        "text": text,
+        "status": status,
+        "landmarks": landmarks,
+        "hand_rect": hand_rect
+    }
 
-@app.post("/predict/voice")
-async def predict_voice(file: UploadFile = File(...), audio: UploadFile = File(None)):
-    contents = await file.read()
-    nparr = np.frombuffer(contents, np.uint8)
-    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    
-    audio_bytes = await audio.read() if audio else None
-    
-    text, status, landmarks, fusion_status, is_final = audio_engine.predict(frame, audio_bytes)
-    
+def run_voice(session_id, contents, audio_bytes, mode="voice"):
+    """Audio recognition ("voice") or lip reading ("lip"); both track the face."""
+    with timed("imdecode"):
+        frame, _ = decode_frame(contents)
+    with engines.sessions(mode).use(session_id) as session:
+        text, status, landmarks, fusion_status, is_final = session.predict(frame, audio_bytes, hash(contents))
     return {
         "text": text,
         "status": status,
@@ -78,6 +119,199 @@ async def predict_voice(file: UploadFile = File(...), audio: UploadFile = File(N
         "is_final": is_final
     }
 
+BUSY_STATUS = "Server busy, frame dropped"
+
+async def infer(mode, session_id, fn, *args):
+    """
+    Runs one frame through the dispatcher and attaches capture hints
+    (target fps, max frame dimension, JPEG quality) for the client.
+    Returns (result, busy).
+    """
+    controller = capture_controllers.get(mode, session_id)
+    start = time.perf_counter()
+    busy = False
+    try:
+        engines.sessions(mode) # Don't queue frames for an engine that can't take them
+        result = await dispatcher.run((mode, session_id), fn, session_id, *args)
+    except DispatcherBusy:
+        busy = True
+        result = {"text": "", "status": BUSY_STATUS, "landmarks": []}
+    except EngineNotReady as e:
+        busy = True
+        result = {"text": "", "status": str(e), "landmarks": []}
+    elapsed = time.perf_counter() - start
+    STAGE_SECONDS.observe(elapsed, f"{mode}_total") # Queueing + all stages
+    FRAMES.inc(mode, "dropped" if busy else "processed")
+    result["capture"] = controller.update(elapsed, dispatcher.load(), result["status"], busy)
+    return result, busy
+
+def respond(result, busy):
+    return JSONResponse(status_code=503, content=result) if busy else result
+
+@app.post("/predict/sign")
+async def predict_sign(file: UploadFile = File(...), session_id: str = Form(DEFAULT_SESSION_ID)):
+    with timed("request_read"):
+        contents = await file.read()
+    return respond(*await infer("sign", session_id, run_sign, contents))
+
+
+@app.post("/predict/sign/landmarks")
+async def predict_sign_landmarks(request: Request, session_id: str = DEFAULT_SESSION_ID):
+    """
+    Sign prediction from landmarks tracked on the client, skipping JPEG upload and
+    server-side tracking. Accepts either
+      - application/octet-stream: 63 little-endian float32 (21 x x,y,z) + 1 handedness byte
+        (0 = "Left", 1 = "Right", MediaPipe convention); an empty body means no hand.
+      - JSON: {"landmarks": [[x, y, z] x 21] or 63 numbers, "handedness": "Left"|"Right",
+               "width": px, "height": px, "session_id": ...}
+    """
+    frame_size = None
+    try:
+        if request.headers.get("content-type", "").startswith("application/json"):
+            body = await request.json()
+            session_id = body.get("session_id", session_id)
+            points, hand_label = parse_hand_landmarks(body.get("landmarks"), body.get("handedness"))
+            if body.get("width") and body.get("height"):
+                frame_size = (int(body["width"]), int(body["height"]))
+        else:
+            points, hand_label = decode_hand_packet(await request.body())
+    except (ValueError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return respond(*await infer("sign", session_id, run_sign_landmarks, points, hand_label, frame_size))
+
+@app.post("/predict/voice")
+async def predict_voice(file: UploadFile = File(...), audio: UploadFile = File(None), session_id: str = Form(DEFAULT_SESSION_ID)):
+    with timed("request_read"):
+        contents = await file.read()
+        audio_bytes = await audio.read() if audio else None
+    return respond(*await infer("voice", session_id, run_voice, contents, audio_bytes))
+
+@app.post("/predict/lip")
+async def predict_lip(file: UploadFile = File(...), audio: UploadFile = File(None), session_id: str = Form(DEFAULT_SESSION_ID)):
+    """Lip reading (VoiceNet); enable with ENABLED_MODES=...,lip."""
+    with timed("request_read"):
+        contents = await file.read()
+        audio_bytes = await audio.read() if audio else None
+    return respond(*await infer("lip", session_id, run_voice, contents, audio_bytes, "lip"))
+
+def next_correction(mode, session_id, listener):
+    """
+    Pops the next queued result of the session currently live under `session_id`,
+    attaching `listener` first so a session re-created after eviction wakes the pusher too.
+    """
+    with engines.sessions(mode).use(session_id) as session:
+        session.correction_listener = listener
+        return session.next_correction()
+
+async def push_corrections(websocket, mode, session_id, ready, listener):
+    """Sends background (final/polished) results as soon as the engine queues them."""
+    while True:
+        try:
+            await asyncio.wait_for(ready.wait(), CORRECTION_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        ready.clear()
+        while True:
+            try:
+                correction = await dispatcher.run((mode, session_id), next_correction, mode, session_id, listener)
+            except (DispatcherBusy, EngineNotReady):
+                await asyncio.sleep(CORRECTION_RETRY_DELAY)
+                continue
+            if correction is None:
+                break
+            text, status, landmarks, fusion_status, is_final = correction
+            await websocket.send_json({
+                "type": "final",
+                "text": text,
+                "status": status,
+                "landmarks": landmarks,
+                "fusion_status": fusion_status,
+                "is_final": is_final
+            })
+
+async def wait_for_engine(websocket, mode):
+    """Sends "loading" status messages until `mode`'s engine is ready; None if it failed to load."""
+    while True:
+        try:
+            return engines.sessions(mode)
+        except EngineNotReady as e:
+            if engines.status()[mode]["state"] == "failed":
+                return None
+            await websocket.send_json({"type": "status", "status": f"Server starting: {e}", "loading": True})
+            await asyncio.sleep(ENGINE_LOADING_POLL_INTERVAL)
+
+@app.websocket("/ws/{mode}")
+async def stream(websocket: WebSocket, mode: str, session_id: str = None):
+    """
+    Persistent per-client channel. The client sends binary messages prefixed
+    with FRAME_MESSAGE / AUDIO_MESSAGE and receives one JSON "result" per frame,
+    plus "final" messages pushed whenever a background job finishes. A stream
+    opened while the engine is still loading gets "status" messages until it is ready.
+    """
+    if mode not in ("sign", "voice", "lip") or not engines.enabled(mode):
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    try:
+        sessions = await wait_for_engine(websocket, mode)
+    except Exception as e:
+        print(f"WebSocket ({mode}) closed while loading: {e}")
+        return
+    if sessions is None:
+        await websocket.close(code=1011) # Engine failed to load
+        return
+    session_id = session_id or uuid.uuid4().hex
+
+    pusher = None
+    if mode in ("voice", "lip"):
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        listener = lambda: loop.call_soon_threadsafe(ready.set)
+        ready.set() # First pass attaches the listener right away
+        pusher = asyncio.create_task(push_corrections(websocket, mode, session_id, ready, listener))
+
+    audio_chunks = []
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            data = message.get("bytes")
+            if not data:
+                continue
+
+            kind, payload = data[0], memoryview(data)[1:]
+            if kind == AUDIO_MESSAGE:
+                audio_chunks.append(bytes(payload))
+                continue
+            if kind == LANDMARKS_MESSAGE and mode == "sign":
+                try:
+                    points, hand_label = decode_hand_packet(payload)
+                    result, _ = await infer("sign", session_id, run_sign_landmarks, points, hand_label)
+                except ValueError as e:
+                    result = {"text": "", "status": f"Bad landmarks: {e}", "landmarks": []}
+                await websocket.send_json({"type": "result", **result})
+                continue
+            if kind != FRAME_MESSAGE:
+                continue
+
+            if mode in ("voice", "lip"):
+                audio_bytes = b"".join(audio_chunks) or None
+                audio_chunks = []
+                result, _ = await infer(mode, session_id, run_voice, payload, audio_bytes, mode)
+            else:
+                result, _ = await infer("sign", session_id, run_sign, payload)
+            await websocket.send_json({"type": "result", **result})
+    except Exception as e:
+        print(f"WebSocket ({mode}) closed: {e}")
+    finally:
+        if pusher:
+            pusher.cancel()
+            session = sessions.peek(session_id)
+            if session is not None and session.correction_listener is listener:
+                session.correction_listener = None
+
 @app.post("/learn")
 async def learn_correction(raw: str = Form(...), corrected: str = Form(...)):
     """Saves user correction to a local JSON file for future training/LLM-tuning."""
@@ -106,6 +340,13 @@ async def predict_video(file: UploadFile = File(...)):
         "confidence": 0.95
     }
 
+@app.on_event("shutdown")
+def shutdown():
+    dispatcher.shutdown()
+    finalize_pool.shutdown()
+    llm_client.close()
+    engines.close()
+
 if __name__ == "__main__":
     print("Main: Starting Uvicorn on http://127.0.0.1:8005 ...")
     try:
@@ -13,3 +13,41 @@ def process_frame(frame, target_size=(224, 224)):
 def normalize_frame(frame):
     """Normalizes pixel values to [0, 1] range."""
     return frame.astype(np.float32) / 255.0
+
+# libjpeg can decode at 1/2, 1/4 or 1/8 scale directly from the DCT coefficients
+REDUCED_DECODE_FLAGS = [(8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2)]
+# Start-of-frame markers carrying the image size (baseline, extended, progressive)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2}
+
+def jpeg_size(data):
+    """Reads (width, height) from a JPEG header without decoding it. None if not a JPEG."""
+    data = memoryview(data)
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        length = (data[i + 2] << 8) | data[i + 3]
+        if marker in JPEG_SOF_MARKERS:
+            height = (data[i + 5] << 8) | data[i + 6]
+            width = (data[i + 7] << 8) | data[i + 8]
+            return width, height
+        i += 2 + length
+    return None
+
+def decode_frame(contents, max_dim=None):
+    """
+    Decodes an uploaded image to BGR. When `max_dim` is set and the JPEG is at
+    least twice that size, it is decoded at a reduced scale instead of full size.
+    Returns (frame, scale) where scale is the reduction factor (1, 2, 4 or 8).
+    """
+    nparr = np.frombuffer(contents, np.uint8)
+    if max_dim:
+        size = jpeg_size(contents)
+        if size:
+            for scale, flag in REDUCED_DECODE_FLAGS:
+                if max(size) / scale >= max_dim:
+                    return cv2.imdecode(nparr, flag), scale
+    return cv2.imdecode(nparr, cv2.IMREAD_COLOR), 1
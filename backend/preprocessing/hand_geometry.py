@@ -0,0 +1,41 @@
+import numpy as np
+from backend.preprocessing.landmark_array import X, Y
+
+# MediaPipe hand indices
+WRIST, THUMB_TIP = 0, 4
+FINGER_TIPS = [8, 12, 16, 20] # Index, middle, ring, pinky
+FINGER_PIPS = [6, 10, 14, 18]
+# Knuckles the thumb tip is compared against (index, middle, ring, pinky MCP)
+FINGER_MCPS = [5, 9, 13, 17]
+INDEX, MIDDLE, RING, PINKY = range(4)
+
+
+class HandGeometry:
+    """
+    Everything the sign heuristics look at, computed from a (21, 3) landmark
+    array in a few vectorized operations. Coordinates are MediaPipe's normalized
+    image space (y grows downwards).
+    """
+    __slots__ = ("tip_minus_pip", "thumb_gap", "palm_size", "index_middle_spread",
+                 "index_pinky_spread", "vertical", "pinky_above_mcp")
+
+    def __init__(self, lms):
+        # Per finger: tip.y - pip.y (< 0 extended, > 0 folded)
+        self.tip_minus_pip = (lms[FINGER_TIPS, Y] - lms[FINGER_PIPS, Y]).tolist()
+        # Per knuckle: horizontal distance from the thumb tip
+        self.thumb_gap = np.abs(lms[FINGER_MCPS, X] - lms[THUMB_TIP, X]).tolist()
+        self.palm_size = abs(float(lms[WRIST, Y] - lms[9, Y]))
+        self.index_middle_spread = abs(float(lms[8, X] - lms[12, X]))
+        self.index_pinky_spread = abs(float(lms[8, X] - lms[20, X]))
+        self.vertical = bool(lms[12, Y] < lms[WRIST, Y])
+        self.pinky_above_mcp = bool(lms[20, Y] < lms[17, Y])
+
+    @property
+    def fingers_up(self):
+        return all(d < 0 for d in self.tip_minus_pip)
+
+    def folded(self, *fingers):
+        return all(self.tip_minus_pip[f] > 0 for f in fingers)
+
+    def thumb_extended(self, threshold):
+        return self.thumb_gap[INDEX] > threshold
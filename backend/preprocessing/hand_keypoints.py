@@ -1,5 +1,19 @@
 import numpy as np
 
+def normalize_hand_array(points, out=None):
+    """
+    Array form of the training normalization: (21, 3) raw landmarks ->
+    (21, 3) float32, centered at the wrist and scaled into [-1, 1].
+    `out.reshape(-1)` is the 63-float model input.
+    """
+    # NORMALIZATION STEP 1: Translation (Center at Wrist)
+    out = np.subtract(points, points[0], out=out, dtype=np.float32)
+    # NORMALIZATION STEP 2: Scale (Make invariant to distance)
+    max_val = np.max(np.abs(out))
+    if max_val == 0: max_val = 1 # Prevent divide by zero
+    out /= max_val
+    return out
+
 def extract_hand_landmarks(mp_results):
     landmarks = []
     if mp_results.multi_hand_landmarks:
@@ -7,26 +21,8 @@ def extract_hand_landmarks(mp_results):
         hand_landmarks = mp_results.multi_hand_landmarks[0].landmark
         
         # NORMALIZATION STEP (Translation only - Must match original training)
-        # NORMALIZATION STEP 1: Translation (Center at Wrist)
-        base_x = hand_landmarks[0].x
-        base_y = hand_landmarks[0].y
-        base_z = hand_landmarks[0].z
-        
-        temp_landmarks = []
-        for lm in hand_landmarks:
-            temp_landmarks.append([
-                lm.x - base_x,
-                lm.y - base_y,
-                lm.z - base_z
-            ])
-            
-        # NORMALIZATION STEP 2: Scale (Make invariant to distance)
-        # Find max absolute distance to normalize to [-1, 1]
-        temp_np = np.array(temp_landmarks)
-        max_val = np.max(np.abs(temp_np))
-        if max_val == 0: max_val = 1 # Prevent divide by zero
-        
-        temp_normalized = temp_np / max_val
+        points = np.array([[lm.x, lm.y, lm.z] for lm in hand_landmarks])
+        temp_normalized = normalize_hand_array(points)
         
         # Convert back to list of dicts or flat list if preferred, 
         # but here we follow original struct for consistency
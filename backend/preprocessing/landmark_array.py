@@ -0,0 +1,60 @@
+import numpy as np
+
+# Column indices into (N, 3) landmark arrays
+X, Y, Z = 0, 1, 2
+
+
+def fill_landmarks(landmark_list, out, indices=None):
+    """
+    Copies MediaPipe landmarks (optionally only `indices`) into a preallocated
+    (N, 3) float32 array and returns it. Done once per frame; everything
+    downstream works on the array.
+    """
+    if indices is not None:
+        landmark_list = [landmark_list[i] for i in indices]
+    out[:] = [(lm.x, lm.y, lm.z) for lm in landmark_list]
+    return out
+
+
+def landmarks_to_dicts(points):
+    """(N, 3) array -> [{'x', 'y', 'z'}] for JSON responses."""
+    return [{'x': x, 'y': y, 'z': z} for x, y, z in points.tolist()]
+
+
+def landmark_bounds(points, width, height, padding=0):
+    """Pixel bounding box [x1, y1, x2, y2] of normalized landmarks, clipped to the frame."""
+    x1 = int(points[:, X].min() * width - padding)
+    x2 = int(points[:, X].max() * width + padding)
+    y1 = int(points[:, Y].min() * height - padding)
+    y2 = int(points[:, Y].max() * height + padding)
+    return [max(0, x1), max(0, y1), min(width, x2), min(height, y2)]
+
+
+# Compact hand packet sent by clients that track locally:
+# 21 x (x, y, z) little-endian float32 followed by one handedness byte.
+HAND_PACKET_FLOATS = 21 * 3
+HAND_PACKET_BYTES = HAND_PACKET_FLOATS * 4 + 1
+HANDEDNESS_CODES = {0: "Left", 1: "Right"} # MediaPipe labels; any other code means unknown
+
+
+def parse_hand_landmarks(points, handedness=None):
+    """
+    Validates client-supplied landmarks (21x3 nested or 63 flat numbers) into a
+    (21, 3) float32 array. Empty input means no hand. Raises ValueError on bad shape.
+    """
+    if points is None or len(points) == 0:
+        return None, None
+    array = np.asarray(points, dtype=np.float32)
+    if array.size != HAND_PACKET_FLOATS or not np.all(np.isfinite(array)):
+        raise ValueError(f"Expected {HAND_PACKET_FLOATS} finite landmark values, got {array.size}")
+    return array.reshape(21, 3), handedness
+
+
+def decode_hand_packet(data):
+    """Binary hand packet -> ((21, 3) float32, handedness label). Empty packet means no hand."""
+    if len(data) == 0:
+        return None, None
+    if len(data) != HAND_PACKET_BYTES:
+        raise ValueError(f"Hand packet must be {HAND_PACKET_BYTES} bytes, got {len(data)}")
+    points = np.frombuffer(data, dtype="<f4", count=HAND_PACKET_FLOATS).astype(np.float32)
+    return parse_hand_landmarks(points, HANDEDNESS_CODES.get(data[-1]))
@@ -0,0 +1,134 @@
+"""
+Enrolls keyword-spotting templates for AudioInference's local recognizer.
+
+Expects one folder per phrase with a few mono WAV recordings each (3-10 per
+phrase, different speakers if possible); underscores in folder names become
+spaces:
+
+    data/keywords/HELLO/01.wav
+    data/keywords/GOOD_MORNING/01.wav
+
+Writes KWS_TEMPLATES_PATH and prints leave-one-out accuracy plus the distance
+statistics for choosing KWS_MAX_DISTANCE and KWS_CONFIDENCE.
+
+Usage:
+    python backend/training/enroll_keywords.py --data backend/data/keywords
+"""
+
+import os
+import sys
+import wave
+import argparse
+import numpy as np
+
+# Ensure backend path is in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from backend.config import TARGET_PHRASES, KWS_TEMPLATES_PATH
+from backend.inference.keyword_spotter import KeywordSpotter, segment_features, AUDIO_RATE
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '../data/keywords')
+
+
+def read_wav(path):
+    """Mono float32 samples at AUDIO_RATE."""
+    with wave.open(path, 'rb') as wav_file:
+        sr = wav_file.getframerate()
+        width = wav_file.getsampwidth()
+        channels = wav_file.getnchannels()
+        data = wav_file.readframes(wav_file.getnframes())
+    dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[width]
+    samples = np.frombuffer(data, dtype=dtype).astype(np.float32)
+    if width == 1:
+        samples = (samples - 128) / 128.0
+    else:
+        samples /= float(np.iinfo(dtype).max)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if sr != AUDIO_RATE:
+        import librosa
+        samples = librosa.resample(samples, orig_sr=sr, target_sr=AUDIO_RATE)
+    return samples
+
+
+def load_recordings(data_path):
+    labels, paths = [], []
+    for folder in sorted(os.listdir(data_path)):
+        phrase = folder.replace("_", " ").upper()
+        folder_path = os.path.join(data_path, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        if phrase not in TARGET_PHRASES:
+            print(f"Skipping '{folder}': not in TARGET_PHRASES")
+            continue
+        for name in sorted(os.listdir(folder_path)):
+            if name.lower().endswith(".wav"):
+                labels.append(phrase)
+                paths.append(os.path.join(folder_path, name))
+    return labels, paths
+
+
+def leave_one_out(spotter_factory, labels, templates):
+    """Spots every template against all the others; returns [(label, predicted, distance, margin)]."""
+    results = []
+    for i in range(len(templates)):
+        rest = [k for k in range(len(templates)) if k != i]
+        if len({labels[k] for k in rest}) < 2:
+            continue
+        spotter = spotter_factory([labels[k] for k in rest], [templates[k] for k in rest])
+        distances = spotter.phrase_distances(templates[i])
+        order = np.argsort(distances)
+        best, runner_up = distances[order[0]], distances[order[1]]
+        results.append((labels[i], spotter.phrases[order[0]], best, (runner_up - best) / runner_up))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enroll keyword-spotting templates from WAV recordings.")
+    parser.add_argument("--data", default=DATA_PATH, help="Folder with one sub-folder of WAVs per phrase")
+    parser.add_argument("--output", default=KWS_TEMPLATES_PATH)
+    args = parser.parse_args()
+
+    labels, paths = load_recordings(args.data)
+    if not paths:
+        print(f"No recordings found under {args.data}")
+        return
+
+    kept_labels, templates = [], []
+    for label, path in zip(labels, paths):
+        features = segment_features(read_wav(path))
+        if features is None:
+            print(f"Skipping {path}: too short or silent")
+            continue
+        kept_labels.append(label)
+        templates.append(features)
+
+    for phrase in TARGET_PHRASES:
+        count = kept_labels.count(phrase)
+        print(f"{phrase:>20}: {count} template(s)" + ("" if count else "  <- not enrolled, always falls back to remote ASR"))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    KeywordSpotter.save(args.output, kept_labels, templates)
+    print(f"Saved {len(templates)} templates to {args.output}")
+
+    results = leave_one_out(KeywordSpotter, kept_labels, templates)
+    if not results:
+        return
+    correct = [r for r in results if r[0] == r[1]]
+    wrong = [r for r in results if r[0] != r[1]]
+    print(f"\nLeave-one-out accuracy: {len(correct)}/{len(results)}")
+    for name, group in (("correct", correct), ("wrong", wrong)):
+        if group:
+            distances = np.array([r[2] for r in group])
+            margins = np.array([r[3] for r in group])
+            print(f"  {name:>7}: distance p50={np.median(distances):.2f} p95={np.percentile(distances, 95):.2f}, "
+                  f"margin p5={np.percentile(margins, 5):.2f} p50={np.median(margins):.2f}")
+    if wrong:
+        # Margins above every mistake's keep false accepts out of the local path
+        print(f"  Suggested KWS_CONFIDENCE >= {max(r[3] for r in wrong):.2f}")
+        for label, predicted, distance, margin in wrong:
+            print(f"    {label} -> {predicted} (distance {distance:.2f}, margin {margin:.2f})")
+
+
+if __name__ == "__main__":
+    main()
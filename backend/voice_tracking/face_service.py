@@ -0,0 +1,92 @@
+import threading
+import cv2
+from backend.voice_tracking.mediapipe_face import FaceTracker, lip_points, mouth_open_ratio
+from backend.preprocessing.landmark_array import landmarks_to_dicts
+from backend.inference.session_manager import TrackerPool
+from backend.inference.telemetry import timed
+
+
+class FaceFrame:
+    """Mouth data for one tracked frame, shared by every engine that asks for it."""
+    __slots__ = ("mouth", "lips", "open_ratio", "landmarks")
+
+    def __init__(self, mouth):
+        self.mouth = mouth.copy() # The tracker's buffer is overwritten by the next frame
+        self.lips = lip_points(self.mouth)
+        self.open_ratio = mouth_open_ratio(self.mouth)
+        self.landmarks = landmarks_to_dicts(self.lips)
+
+
+class FaceSession:
+    """
+    One client's FaceMesh graph plus the result for the last frame it tracked.
+    Engines for the same session (lip reading and audio) share one of these, so
+    the 468-point mesh runs at most once per frame.
+    """
+    def __init__(self, tracker, session_id=None):
+        self.tracker = tracker
+        self.session_id = session_id
+        self.refs = 0
+        self.key = None
+        self.result = None
+        self.lock = threading.Lock()
+
+    def track(self, frame, frame_key=None):
+        """
+        Returns the FaceFrame for a BGR frame, or None when no face is found.
+        `frame_key` identifies the frame (main.py: hash of the encoded bytes); a
+        repeat key returns the cached result, None always tracks.
+        """
+        with self.lock:
+            if frame_key is None or frame_key != self.key:
+                with timed("cvtColor"):
+                    image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                with timed("face_tracking"):
+                    mouth = self.tracker.to_array(self.tracker.process(image_rgb))
+                self.key, self.result = frame_key, FaceFrame(mouth) if mouth is not None else None
+            return self.result
+
+    def warmup(self, frame):
+        self.tracker.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+
+class FaceTrackingService:
+    """
+    Hands out FaceSessions keyed by session id, backed by a pool of FaceMesh graphs.
+    Has the same acquire/release surface as TrackerPool so SessionManager can use
+    it directly; a session's graph goes back to the pool once no engine holds it.
+    """
+    def __init__(self):
+        self.pool = TrackerPool(FaceTracker)
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, session_id=None):
+        with self.lock:
+            face = self.sessions.get(session_id) if session_id is not None else None
+            if face is not None:
+                face.refs += 1
+                return face
+        # Building a FaceMesh graph is slow: don't hold up other sessions meanwhile
+        built = FaceSession(self.pool.acquire(), session_id)
+        with self.lock:
+            face = self.sessions.setdefault(session_id, built) if session_id is not None else built
+            face.refs += 1
+        if face is not built:
+            self.pool.release(built.tracker) # Another engine registered this session first
+        return face
+
+    def release(self, face):
+        if face is None:
+            return
+        with self.lock:
+            face.refs -= 1
+            if face.refs > 0:
+                return
+            if self.sessions.get(face.session_id) is face:
+                del self.sessions[face.session_id]
+        self.pool.release(face.tracker)
+
+
+# One per process, shared by LipInference and AudioInference
+face_service = FaceTrackingService()
@@ -1,6 +1,15 @@
 import mediapipe as mp
 import mediapipe.python.solutions.face_mesh as mp_face_mesh
-from backend.config import FACE_CONFIDENCE, MAX_FACES
+import numpy as np
+from backend.config import FACE_CONFIDENCE, MAX_FACES, LIP_LANDMARKS
+from backend.preprocessing.landmark_array import fill_landmarks, X, Y
+
+# Rows of the mouth array: the 21 lip points followed by the upper inner lip (13),
+# which _get_mouth_distance needs but the lip contour does not include.
+MOUTH_LANDMARKS = LIP_LANDMARKS + [13]
+LIP_ROWS = slice(0, len(LIP_LANDMARKS))
+UPPER_LIP, LOWER_LIP = MOUTH_LANDMARKS.index(13), MOUTH_LANDMARKS.index(14)
+LEFT_CORNER, RIGHT_CORNER = MOUTH_LANDMARKS.index(61), MOUTH_LANDMARKS.index(291)
 
 class FaceTracker:
     def __init__(self):
@@ -9,6 +18,32 @@ class FaceTracker:
             max_num_faces=MAX_FACES, 
             min_detection_confidence=FACE_CONFIDENCE
         )
+        # Reused every frame: callers must copy if they keep points past the next process()
+        self.mouth = np.zeros((len(MOUTH_LANDMARKS), 3), dtype=np.float32)
 
     def process(self, image_rgb):
         return self.face_mesh.process(image_rgb)
+
+    def to_array(self, results):
+        """
+        Returns the (22, 3) float32 mouth array for the first face, or None.
+        Only the mouth points are read out of the 468-point mesh.
+        """
+        if not results.multi_face_landmarks:
+            return None
+        return fill_landmarks(results.multi_face_landmarks[0].landmark, self.mouth, MOUTH_LANDMARKS)
+
+    def reset(self):
+        """Drops tracking state so a pooled graph can serve a new session."""
+        self.face_mesh.reset()
+
+def lip_points(mouth):
+    """The 21 VoiceNet lip points of a mouth array (view, no copy)."""
+    return mouth[LIP_ROWS]
+
+def mouth_open_ratio(mouth):
+    """Vertical lip gap over mouth width (0 when the width collapses)."""
+    vertical_dist = abs(mouth[UPPER_LIP, Y] - mouth[LOWER_LIP, Y])
+    horizontal_dist = abs(mouth[LEFT_CORNER, X] - mouth[RIGHT_CORNER, X])
+    if horizontal_dist == 0: return 0
+    return float(vertical_dist / horizontal_dist)
@@ -0,0 +1,2 @@
+# Lets tests import the backend package the way the app does (`from backend.x import ...`)
+# when pytest is run from the repository root.
@@ -1,6 +1,16 @@
 import { useRef, useState, useEffect } from "react";
 import { Camera, VideoOff, Eye, EyeOff, ShieldCheck, RefreshCw, Mic, MicOff } from "lucide-react";
 
+const WS_URL = "ws://127.0.0.1:8005";
+// First byte of every binary message sent on the stream (see backend/main.py)
+const FRAME_MESSAGE = 0x01;
+const AUDIO_MESSAGE = 0x02;
+// Reconnect backoff after the stream drops (server restart, network blip)
+const RECONNECT_MIN_MS = 500;
+const RECONNECT_MAX_MS = 10000;
+// Close codes not worth retrying: the mode is not served by this backend
+const NO_RETRY_CODES = [1008];
+
 export default function CameraFeed({ mode, setOutputText, setDraftText, status, setStatus, setFusionData, fusionData }) {
     const videoRef = useRef(null);
     const canvasRef = useRef(null);
@@ -16,6 +26,12 @@ export default function CameraFeed({ mode, setOutputText, setDraftText, status,
     const audioContextRef = useRef(null);
     const pcmBufferRef = useRef([]);
 
+    // Server-side temporal state (stabilizer, buffers, trackers) is keyed by this id
+    const sessionIdRef = useRef(crypto.randomUUID());
+
+    // Capture hints returned by the server with every result (fps, max frame side, JPEG quality)
+    const captureRef = useRef({ fps: 25, max_dim: null, quality: 0.8 });
+
     // Sign Language specific refs
     const lastDetectedChar = useRef("");
     const framesHeld = useRef(0);
@@ -91,35 +107,189 @@ export default function CameraFeed({ mode, setOutputText, setDraftText, status,
     useEffect(() => {
         let isMounted = true;
         let animationFrameId;
+        let awaitingResult = false;
 
-        const FPS = 25;
-        const frameInterval = 1000 / FPS;
         let lastFrameTime = 0;
 
+        // One persistent channel per session: frames/audio go up as binary, results come back as JSON.
+        // Reconnects carry the same session_id, so the server picks up the same session.
+        let socket = null;
+        let reconnectTimer = null;
+        let reconnectDelay = RECONNECT_MIN_MS;
+
+        const handleResult = (data) => {
+            if (data.capture) {
+                captureRef.current = data.capture;
+            }
+
+            if (data.status && typeof setStatus === 'function') {
+                setStatus(data.status);
+            }
+
+            if (data.fusion_status) {
+                if (setFusionData) setFusionData(data.fusion_status);
+                if (data.fusion_status.noise_level !== undefined) {
+                    setNoiseLevel(data.fusion_status.noise_level);
+                }
+            }
+
+            if (data.text) {
+                if (mode === 'sign') {
+                    const charToAdd = data.text === "_" ? " " : data.text;
+                    if (charToAdd !== lastDetectedChar.current) {
+                        setOutputText(prev => (prev === "Waiting for recognition..." ? "" : prev) + charToAdd);
+                        lastDetectedChar.current = charToAdd;
+                        framesHeld.current = 1;
+                    } else {
+                        framesHeld.current++;
+                        if (framesHeld.current >= 25) {
+                            setOutputText(prev => prev + charToAdd);
+                            framesHeld.current = 1;
+                        }
+                    }
+                } else {
+                    // Voice Recognition Mode Processing
+                    if (data.is_final && data.text) {
+                        // Append phrases clearly separated by a newline
+                        setOutputText(prev => {
+                            if (prev === "Waiting for recognition..." || prev === "Recognition complete") return data.text;
+                            const current = prev.trim();
+                            if (current === "") return data.text;
+                            return `${current}\n${data.text}`;
+                        });
+                    } else {
+                        // Drafting
+                        if (typeof setDraftText === 'function') setDraftText(data.text);
+                    }
+                }
+            } else if (data.status && (data.status.includes("Finding Face") || data.status.includes("Waiting"))) {
+                lastDetectedChar.current = "";
+                framesHeld.current = 0;
+                if (mode === 'voice') {
+                    if (typeof setDraftText === 'function') setDraftText("");
+                    setNoiseLevel(0);
+                }
+            }
+
+            // Pushed finals carry no landmarks; keep the last overlay
+            if (data.type === "final") return;
+
+            if (canvasRef.current && videoRef.current && showGuides) {
+                const overlayCtx = canvasRef.current.getContext('2d');
+                overlayCtx.clearRect(0, 0, canvasRef.current.width, canvasRef.current.height);
+
+                if (data.landmarks && data.landmarks.length > 0) {
+                    const width = canvasRef.current.width;
+                    const height = canvasRef.current.height;
+
+                    // 1. Draw "Sleek Voice Contour" (Dynamic Colors)
+                    overlayCtx.globalAlpha = 0.8;
+
+                    // Status-based coloring
+                    let statusColor = "#6366f1"; // Default Indigo
+                    if (data.status === "READY") statusColor = "#10b981";    // Emerald Green
+                    if (data.status === "LISTENING") statusColor = "#3b82f6"; // Bright Blue
+                    if (data.status === "Processing...") statusColor = "#94a3b8"; // Slate Gray
+
+                    if (mode === 'sign') {
+                        overlayCtx.strokeStyle = statusColor;
+                        const palmConnections = [[0, 1], [1, 2], [2, 3], [3, 4], [0, 5], [5, 6], [6, 7], [7, 8], [5, 9], [9, 10], [10, 11], [11, 12], [9, 13], [13, 14], [14, 15], [15, 16], [13, 17], [17, 18], [18, 19], [19, 20], [0, 17]];
+                        palmConnections.forEach(([i, j]) => {
+                            const lm1 = data.landmarks[i];
+                            const lm2 = data.landmarks[j];
+                            if (lm1 && lm2) {
+                                overlayCtx.beginPath();
+                                overlayCtx.moveTo(lm1.x * width, lm1.y * height);
+                                overlayCtx.lineTo(lm2.x * width, lm2.y * height);
+                                overlayCtx.stroke();
+                            }
+                        });
+                    } else if (mode === 'voice') {
+                        // Draw outer voice loop
+                        overlayCtx.beginPath();
+                        overlayCtx.lineWidth = 2.0;
+                        overlayCtx.strokeStyle = statusColor;
+                        overlayCtx.moveTo(data.landmarks[0].x * width, data.landmarks[0].y * height);
+                        for (let i = 1; i <= 11; i++) {
+                            overlayCtx.lineTo(data.landmarks[i].x * width, data.landmarks[i].y * height);
+                        }
+                        overlayCtx.closePath();
+                        overlayCtx.stroke();
+
+                        // Draw inner voice loop
+                        overlayCtx.beginPath();
+                        overlayCtx.lineWidth = 1.0;
+                        overlayCtx.strokeStyle = statusColor;
+                        overlayCtx.setLineDash([2, 2]); // Dotted inner for professional look
+                        overlayCtx.moveTo(data.landmarks[12].x * width, data.landmarks[12].y * height);
+                        for (let i = 13; i < data.landmarks.length; i++) {
+                            overlayCtx.lineTo(data.landmarks[i].x * width, data.landmarks[i].y * height);
+                        }
+                        overlayCtx.closePath();
+                        overlayCtx.stroke();
+                        overlayCtx.setLineDash([]); // Reset dash
+                    }
+
+                    overlayCtx.globalAlpha = 1.0;
+
+                    // Reset shadow for next frame
+                    overlayCtx.shadowBlur = 0;
+                }
+            }
+        };
+
+        const connect = () => {
+            socket = new WebSocket(`${WS_URL}/ws/${mode}?session_id=${sessionIdRef.current}`);
+            socket.binaryType = "arraybuffer";
+            socket.onopen = () => { reconnectDelay = RECONNECT_MIN_MS; };
+            socket.onmessage = (event) => {
+                if (!isMounted) return;
+                const data = JSON.parse(event.data);
+                if (data.type === "result") awaitingResult = false;
+                handleResult(data);
+            };
+            socket.onclose = (event) => {
+                awaitingResult = false;
+                if (!isMounted || NO_RETRY_CODES.includes(event.code)) return;
+                if (typeof setStatus === 'function') setStatus("Reconnecting...");
+                reconnectTimer = setTimeout(connect, reconnectDelay);
+                reconnectDelay = Math.min(reconnectDelay * 2, RECONNECT_MAX_MS);
+            };
+        };
+
+        const sendMessage = (kind, buffer) => {
+            const message = new Uint8Array(buffer.byteLength + 1);
+            message[0] = kind;
+            message.set(new Uint8Array(buffer), 1);
+            socket.send(message);
+        };
+
         const processFrame = async (timestamp) => {
-            if (!isMounted || !isProcessing || !videoRef.current || !stream || videoRef.current.videoWidth === 0) {
+            if (!isMounted || !isProcessing || !videoRef.current || !stream || videoRef.current.videoWidth === 0 || !socket || socket.readyState !== WebSocket.OPEN || awaitingResult) {
                 if (isMounted && isProcessing) {
                     animationFrameId = requestAnimationFrame(processFrame);
                 }
                 return;
             }
 
-            if (timestamp - lastFrameTime < frameInterval) {
+            const { fps, max_dim: maxDim, quality } = captureRef.current;
+            if (timestamp - lastFrameTime < 1000 / fps) {
                 animationFrameId = requestAnimationFrame(processFrame);
                 return;
             }
             lastFrameTime = timestamp;
 
+            // Only send as many pixels as the server says the pipeline will use
+            const { videoWidth, videoHeight } = videoRef.current;
+            const scale = maxDim ? Math.min(1, maxDim / Math.max(videoWidth, videoHeight)) : 1;
             const canvas = document.createElement("canvas");
-            canvas.width = videoRef.current.videoWidth;
-            canvas.height = videoRef.current.videoHeight;
+            canvas.width = Math.round(videoWidth * scale);
+            canvas.height = Math.round(videoHeight * scale);
             const ctx = canvas.getContext("2d");
-            ctx.drawImage(videoRef.current, 0, 0);
+            ctx.drawImage(videoRef.current, 0, 0, canvas.width, canvas.height);
 
             try {
-                const blob = await new Promise((resolve) => canvas.toBlob(resolve, "image/jpeg", 0.8));
-                const formData = new FormData();
-                formData.append("file", blob, "frame.jpg");
+                const blob = await new Promise((resolve) => canvas.toBlob(resolve, "image/jpeg", quality));
 
                 if (mode === 'voice' && pcmBufferRef.current.length > 0) {
                     const chunksToProcess = [...pcmBufferRef.current];
@@ -132,128 +302,14 @@ export default function CameraFeed({ mode, setOutputText, setDraftText, status,
                         combined.set(b, offset);
                         offset += b.length;
                     }
-                    formData.append("audio", new Blob([combined.buffer], { type: "application/octet-stream" }));
-                }
-
-                const url = mode === 'voice' ? "http://127.0.0.1:8005/predict/voice" : "http://127.0.0.1:8005/predict/sign";
-                const res = await fetch(url, { method: "POST", body: formData });
-
-                if (!isMounted) return;
-                const data = await res.json();
-
-                if (data.status && typeof setStatus === 'function') {
-                    setStatus(data.status);
-                }
-
-                if (data.fusion_status) {
-                    if (setFusionData) setFusionData(data.fusion_status);
-                    if (data.fusion_status.noise_level !== undefined) {
-                        setNoiseLevel(data.fusion_status.noise_level);
-                    }
+                    sendMessage(AUDIO_MESSAGE, combined.buffer);
                 }
 
-                if (data.text) {
-                    if (mode === 'sign') {
-                        const charToAdd = data.text === "_" ? " " : data.text;
-                        if (charToAdd !== lastDetectedChar.current) {
-                            setOutputText(prev => (prev === "Waiting for recognition..." ? "" : prev) + charToAdd);
-                            lastDetectedChar.current = charToAdd;
-                            framesHeld.current = 1;
-                        } else {
-                            framesHeld.current++;
-                            if (framesHeld.current >= 25) {
-                                setOutputText(prev => prev + charToAdd);
-                                framesHeld.current = 1;
-                            }
-                        }
-                    } else {
-                        // Voice Recognition Mode Processing
-                        if (data.is_final && data.text) {
-                            // Append phrases clearly separated by a newline
-                            setOutputText(prev => {
-                                if (prev === "Waiting for recognition..." || prev === "Recognition complete") return data.text;
-                                const current = prev.trim();
-                                if (current === "") return data.text;
-                                return `${current}\n${data.text}`;
-                            });
-                        } else {
-                            // Drafting
-                            if (typeof setDraftText === 'function') setDraftText(data.text);
-                        }
-                    }
-                } else if (data.status && (data.status.includes("Finding Face") || data.status.includes("Waiting"))) {
-                    lastDetectedChar.current = "";
-                    framesHeld.current = 0;
-                    if (mode === 'voice') {
-                        if (typeof setDraftText === 'function') setDraftText("");
-                        setNoiseLevel(0);
-                    }
-                }
-
-                if (canvasRef.current && videoRef.current && showGuides) {
-                    const overlayCtx = canvasRef.current.getContext('2d');
-                    overlayCtx.clearRect(0, 0, canvasRef.current.width, canvasRef.current.height);
-
-                    if (data.landmarks && data.landmarks.length > 0) {
-                        const width = canvasRef.current.width;
-                        const height = canvasRef.current.height;
-
-                        // 1. Draw "Sleek Voice Contour" (Dynamic Colors)
-                        overlayCtx.globalAlpha = 0.8;
-
-                        // Status-based coloring
-                        let statusColor = "#6366f1"; // Default Indigo
-                        if (data.status === "READY") statusColor = "#10b981";    // Emerald Green
-                        if (data.status === "LISTENING") statusColor = "#3b82f6"; // Bright Blue
-                        if (data.status === "Processing...") statusColor = "#94a3b8"; // Slate Gray
-
-                        if (mode === 'sign') {
-                            overlayCtx.strokeStyle = statusColor;
-                            const palmConnections = [[0, 1], [1, 2], [2, 3], [3, 4], [0, 5], [5, 6], [6, 7], [7, 8], [5, 9], [9, 10], [10, 11], [11, 12], [9, 13], [13, 14], [14, 15], [15, 16], [13, 17], [17, 18], [18, 19], [19, 20], [0, 17]];
-                            palmConnections.forEach(([i, j]) => {
-                                const lm1 = data.landmarks[i];
-                                const lm2 = data.landmarks[j];
-                                if (lm1 && lm2) {
-                                    overlayCtx.beginPath();
-                                    overlayCtx.moveTo(lm1.x * width, lm1.y * height);
-                                    overlayCtx.lineTo(lm2.x * width, lm2.y * height);
-                                    overlayCtx.stroke();
-                                }
-                            });
-                        } else if (mode === 'voice') {
-                            // Draw outer voice loop
-                            overlayCtx.beginPath();
-                            overlayCtx.lineWidth = 2.0;
-                            overlayCtx.strokeStyle = statusColor;
-                            overlayCtx.moveTo(data.landmarks[0].x * width, data.landmarks[0].y * height);
-                            for (let i = 1; i <= 11; i++) {
-                                overlayCtx.lineTo(data.landmarks[i].x * width, data.landmarks[i].y * height);
-                            }
-                            overlayCtx.closePath();
-                            overlayCtx.stroke();
-
-                            // Draw inner voice loop
-                            overlayCtx.beginPath();
-                            overlayCtx.lineWidth = 1.0;
-                            overlayCtx.strokeStyle = statusColor;
-                            overlayCtx.setLineDash([2, 2]); // Dotted inner for professional look
-                            overlayCtx.moveTo(data.landmarks[12].x * width, data.landmarks[12].y * height);
-                            for (let i = 13; i < data.landmarks.length; i++) {
-                                overlayCtx.lineTo(data.landmarks[i].x * width, data.landmarks[i].y * height);
-                            }
-                            overlayCtx.closePath();
-                            overlayCtx.stroke();
-                            overlayCtx.setLineDash([]); // Reset dash
-                        }
-
-                        overlayCtx.globalAlpha = 1.0;
-
-                        // Reset shadow for next frame
-                        overlayCtx.shadowBlur = 0;
-                    }
-                }
+                awaitingResult = true;
+                sendMessage(FRAME_MESSAGE, await blob.arrayBuffer());
             } catch (err) {
                 console.error("Frame processing error:", err);
+                awaitingResult = false;
             }
 
             if (isMounted && isProcessing) {
@@ -262,12 +318,15 @@ export default function CameraFeed({ mode, setOutputText, setDraftText, status,
         };
 
         if (stream && isProcessing) {
-            processFrame();
+            connect();
+            animationFrameId = requestAnimationFrame(processFrame);
         }
 
         return () => {
             isMounted = false;
             if (animationFrameId) cancelAnimationFrame(animationFrameId);
+            if (reconnectTimer) clearTimeout(reconnectTimer);
+            if (socket) socket.close();
         };
     }, [stream, isProcessing, mode, showGuides, setOutputText, setDraftText, setStatus]);
 
@@ -0,0 +1,9 @@
+from backend.inference.phrase_matcher import phrase_matcher
+
+
+def test_fuzzy_edits_follow_raw_length():
+    # floor(len(raw) * PHRASE_FUZZY_RATIO): 4+ chars allow one edit, shorter raws none
+    assert phrase_matcher.correct("HELO") == "HELLO"
+    assert phrase_matcher.correct("YESS") == "YES"
+    assert phrase_matcher.correct("NOO") == "NOO"
+    assert phrase_matcher.correct("HII") == "HII"
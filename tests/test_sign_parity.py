@@ -0,0 +1,37 @@
+import os
+import numpy as np
+import pytest
+
+from backend.config import SIGN_MODEL_PATH
+from backend.inference.numpy_mlp import NumpyMLP
+
+TOLERANCE = 1e-5 # Same bar as backend/evaluation/check_sign_parity.py
+
+pytestmark = pytest.mark.skipif(not os.path.exists(SIGN_MODEL_PATH), reason=f"no sign model at {SIGN_MODEL_PATH}")
+
+
+@pytest.fixture(scope="module")
+def models():
+    tf = pytest.importorskip("tensorflow")
+    return tf.keras.models.load_model(SIGN_MODEL_PATH), NumpyMLP.from_h5(SIGN_MODEL_PATH)
+
+
+@pytest.fixture(scope="module")
+def inputs(models):
+    # Normalized landmarks live in [-1, 1] (see normalize_hand_array)
+    rng = np.random.default_rng(0)
+    return rng.uniform(-1.0, 1.0, size=(256, models[1].input_dim)).astype(np.float32)
+
+
+def test_batch_matches_keras(models, inputs):
+    keras_model, numpy_model = models
+    expected = keras_model.predict(inputs, verbose=0)
+    actual = numpy_model.predict_on_batch(inputs)
+    np.testing.assert_allclose(actual, expected, atol=TOLERANCE)
+    np.testing.assert_array_equal(np.argmax(actual, axis=1), np.argmax(expected, axis=1))
+
+
+def test_single_row_matches_keras(models, inputs):
+    keras_model, numpy_model = models
+    row = inputs[:1]
+    np.testing.assert_allclose(numpy_model.predict_on_batch(row), keras_model.predict(row, verbose=0), atol=TOLERANCE)